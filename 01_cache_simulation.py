@@ -1,8 +1,17 @@
-import csv
+import argparse
 import concurrent.futures
+import os
+import heapq
+import sys
+from array import array
 from collections import OrderedDict
 import numpy as np  # Added import for NaN handling
 import time  # Added import for measuring execution time
+import zlib
+from contextlib import ExitStack, nullcontext
+
+from result_io import VERBOSITY_PER_OP, VERBOSITY_SILENT, VERBOSITY_SUMMARY, open_result_writer
+from trace_io import OP_COMPUTE, OP_GET, OP_PUT, CompiledTrace, TraceFile, iter_chunks, share_trace
 
 class LRUCache:
     def __init__(self, capacity):
@@ -17,42 +26,102 @@ class LRUCache:
         return -1
 
     def put(self, key, value):
+        # Returns the (key, value) it evicted, if any, so a cache hierarchy can pass victims on
+        evicted = None
         if key in self.cache:
             # Move the existing key to the end
             self.cache.move_to_end(key)
         elif len(self.cache) >= self.capacity:
             # Remove the first (least recently used) item
-            self.cache.popitem(last=False)
+            evicted = self.cache.popitem(last=False)
         self.cache[key] = value
+        return evicted
+
+    def remove(self, key):
+        return self.cache.pop(key, -1)
 
 class LFUCache:
     def __init__(self, capacity):
         self.capacity = capacity
         self.cache = {}
         self.frequency = {}
+        # Keys grouped by frequency; each bucket is a heap so ties still break on the smallest key
+        self.buckets = {}
+        self.bucket_sizes = {}
+        self.min_frequency = 0
 
     def get(self, key):
         if key in self.cache:
-            # Increment frequency and move to the correct heap
-            self.frequency[key] += 1
+            # Increment frequency and move to the next bucket
+            self._touch(key)
             return self.cache[key]
         return -1
 
     def put(self, key, value):
+        evicted = None
         if self.capacity > 0:
             if key in self.cache:
                 # Update value and increment frequency
                 self.cache[key] = value
-                self.frequency[key] += 1
+                self._touch(key)
             else:
                 # Check and remove the least frequently used item if at capacity
                 if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
+                    evicted = self._evict()
                 # Add new item
                 self.cache[key] = value
                 self.frequency[key] = 1
+                self._add_to_bucket(key, 1)
+                self.min_frequency = 1
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        freq = self.frequency.pop(key)
+        # Its heap entry goes stale and is skipped like any other
+        if self._remove_from_bucket(freq) and self.min_frequency == freq:
+            self.min_frequency = min(self.bucket_sizes, default=0)
+        return self.cache.pop(key)
+
+    def _add_to_bucket(self, key, freq):
+        bucket = self.buckets.get(freq)
+        if bucket is None:
+            bucket = self.buckets[freq] = []
+            self.bucket_sizes[freq] = 0
+        heapq.heappush(bucket, key)
+        self.bucket_sizes[freq] += 1
+        # Stale entries are skipped lazily; compact once they outnumber the live ones
+        if len(bucket) > 2 * self.bucket_sizes[freq] + 8:
+            live = {k for k in bucket if self.frequency.get(k) == freq}
+            bucket[:] = live
+            heapq.heapify(bucket)
+
+    def _remove_from_bucket(self, freq):
+        self.bucket_sizes[freq] -= 1
+        if self.bucket_sizes[freq] == 0:
+            del self.buckets[freq]
+            del self.bucket_sizes[freq]
+            return True
+        return False
+
+    def _touch(self, key):
+        freq = self.frequency[key]
+        if self._remove_from_bucket(freq) and self.min_frequency == freq:
+            self.min_frequency = freq + 1
+        self.frequency[key] = freq + 1
+        self._add_to_bucket(key, freq + 1)
+
+    def _evict(self):
+        freq = self.min_frequency
+        bucket = self.buckets[freq]
+        while True:
+            min_key = heapq.heappop(bucket)
+            if self.frequency.get(min_key) == freq:
+                break
+        self._remove_from_bucket(freq)
+        del self.frequency[min_key]
+        return min_key, self.cache.pop(min_key)
 
 class FIFOCache:
     def __init__(self, capacity):
@@ -63,30 +132,851 @@ class FIFOCache:
         return self.cache.get(key, -1)
 
     def put(self, key, value):
+        evicted = None
         if key in self.cache:
             # Update value
             self.cache[key] = value
         elif len(self.cache) >= self.capacity:
             # Remove the first (oldest) item
-            self.cache.popitem(last=False)
+            evicted = self.cache.popitem(last=False)
+        self.cache[key] = value
+        return evicted
+
+    def remove(self, key):
+        return self.cache.pop(key, -1)
+
+class ARCCache:
+    # Adaptive Replacement Cache: resident keys are split between a recency list (seen once) and a frequency
+    # list (seen again), each backed by a ghost list of keys it recently evicted. A ghost hit means that side
+    # was too small, so the target size of the recency list moves towards it. Every step is an OrderedDict
+    # operation, so the bookkeeping is O(1) per access.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.cache = {}
+        self.recent = OrderedDict()
+        self.frequent = OrderedDict()
+        self.recent_ghosts = OrderedDict()
+        self.frequent_ghosts = OrderedDict()
+        # Target size of the recency list
+        self.target = 0
+
+    def get(self, key):
+        if key in self.cache:
+            self._hit(key)
+            return self.cache[key]
+        return -1
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        if key in self.cache:
+            self.cache[key] = value
+            self._hit(key)
+            return None
+
+        if key in self.recent_ghosts:
+            # Evicted from the recency list too early: grow its target
+            self.target = min(self.capacity,
+                              self.target + max(len(self.frequent_ghosts) // len(self.recent_ghosts), 1))
+            del self.recent_ghosts[key]
+            evicted = self._replace(False)
+            self.frequent[key] = None
+        elif key in self.frequent_ghosts:
+            # Evicted from the frequency list too early: shrink the recency target
+            self.target = max(0, self.target - max(len(self.recent_ghosts) // len(self.frequent_ghosts), 1))
+            del self.frequent_ghosts[key]
+            evicted = self._replace(True)
+            self.frequent[key] = None
+        else:
+            recent_size = len(self.recent) + len(self.recent_ghosts)
+            if recent_size >= self.capacity:
+                if len(self.recent) < self.capacity:
+                    self.recent_ghosts.popitem(last=False)
+                    evicted = self._replace(False)
+                else:
+                    # The recency list fills the cache on its own; its oldest key leaves without a ghost
+                    oldest, _ = self.recent.popitem(last=False)
+                    evicted = oldest, self.cache.pop(oldest)
+            else:
+                total_size = recent_size + len(self.frequent) + len(self.frequent_ghosts)
+                if total_size >= 2 * self.capacity:
+                    self.frequent_ghosts.popitem(last=False)
+                evicted = self._replace(False)
+            self.recent[key] = None
+        self.cache[key] = value
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        if key in self.recent:
+            del self.recent[key]
+        else:
+            del self.frequent[key]
+        return self.cache.pop(key)
+
+    def _hit(self, key):
+        if key in self.recent:
+            del self.recent[key]
+            self.frequent[key] = None
+        else:
+            self.frequent.move_to_end(key)
+
+    def _replace(self, frequent_ghost_hit):
+        # Makes room for one key, turning the evicted key into a ghost on its own side
+        if len(self.cache) < self.capacity:
+            return None
+        if self.recent and (len(self.recent) > self.target or not self.frequent
+                            or (frequent_ghost_hit and len(self.recent) == self.target)):
+            oldest, _ = self.recent.popitem(last=False)
+            self.recent_ghosts[oldest] = None
+        else:
+            oldest, _ = self.frequent.popitem(last=False)
+            self.frequent_ghosts[oldest] = None
+        return oldest, self.cache.pop(oldest)
+
+class TwoQueueCache:
+    # 2Q: new keys wait in a small FIFO; only keys requested again after leaving it, while still remembered
+    # in a ghost FIFO, are admitted to the main LRU list. A one-off scan passes through the FIFO without
+    # displacing the main list.
+    IN_FRACTION = 0.25
+    GHOST_FRACTION = 0.5
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.cache = {}
+        self.incoming = OrderedDict()
+        self.main = OrderedDict()
+        self.ghosts = OrderedDict()
+        self.incoming_capacity = max(int(capacity * self.IN_FRACTION), 1)
+        self.ghost_capacity = max(int(capacity * self.GHOST_FRACTION), 1)
+
+    def get(self, key):
+        if key in self.cache:
+            # A hit in the incoming FIFO does not reorder it; that is what keeps scans out of the main list
+            if key in self.main:
+                self.main.move_to_end(key)
+            return self.cache[key]
+        return -1
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        evicted = None
+        if key in self.cache:
+            if key in self.main:
+                self.main.move_to_end(key)
+        elif key in self.ghosts:
+            del self.ghosts[key]
+            evicted = self._reclaim()
+            self.main[key] = None
+        else:
+            evicted = self._reclaim()
+            self.incoming[key] = None
+        self.cache[key] = value
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        if key in self.main:
+            del self.main[key]
+        else:
+            del self.incoming[key]
+        return self.cache.pop(key)
+
+    def _reclaim(self):
+        if len(self.cache) < self.capacity:
+            return None
+        if len(self.incoming) > self.incoming_capacity or not self.main:
+            oldest, _ = self.incoming.popitem(last=False)
+            self.ghosts[oldest] = None
+            if len(self.ghosts) > self.ghost_capacity:
+                self.ghosts.popitem(last=False)
+        else:
+            oldest, _ = self.main.popitem(last=False)
+        return oldest, self.cache.pop(oldest)
+
+class FrequencySketch:
+    # Count-min sketch of 4-bit counters, two to a byte, fronted by a Bloom-filter doorkeeper that absorbs
+    # each key's first access. Every sample_size recorded accesses all counters are halved and the doorkeeper
+    # is cleared, so old popularity fades. Memory is fixed by the width, however many keys pass through.
+    DEPTH = 4
+    SAMPLE_FACTOR = 10
+    # Byte translation that halves both 4-bit counters of a byte at once
+    HALVE = bytes((value >> 1) & 0x77 for value in range(256))
+
+    def __init__(self, capacity, key_names=None):
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self.width_mask = width - 1
+        self.row_offsets = tuple(row * width for row in range(self.DEPTH))
+        self.table = bytearray(self.DEPTH * width // 2)
+        self.doorkeeper_mask = 8 * width - 1
+        self.doorkeeper = bytearray(width)
+        self.sample_size = self.SAMPLE_FACTOR * max(capacity, 1)
+        self.additions = 0
+        # A replay on compiled key ids hashes the original keys instead, each once, so it admits exactly
+        # what a replay of the text trace would
+        self.key_hashes = None if key_names is None else [self.hash_key(key) for key in key_names]
+
+    @staticmethod
+    def hash_key(key):
+        # hash() of a str changes between processes, which would make hit ratios vary from run to run.
+        # Integers go through str as well, so a key read as 7 from a binary trace and as '7' from a text
+        # trace land on the same counters.
+        key_hash = zlib.crc32(str(key).encode())
+        key_hash = (key_hash * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return key_hash ^ (key_hash >> 29)
+
+    def key_hash(self, key):
+        if self.key_hashes is not None:
+            return self.key_hashes[key]
+        return self.hash_key(key)
+
+    def _doorkeeper_bits(self, key_hash):
+        # Three bit positions by double hashing
+        mask = self.doorkeeper_mask
+        step = (key_hash >> 32) | 1
+        return key_hash & mask, (key_hash + step) & mask, (key_hash + 2 * step) & mask
+
+    def increment(self, key):
+        key_hash = self.key_hash(key)
+        doorkeeper = self.doorkeeper
+        bit0, bit1, bit2 = self._doorkeeper_bits(key_hash)
+        if (doorkeeper[bit0 >> 3] >> (bit0 & 7)) & (doorkeeper[bit1 >> 3] >> (bit1 & 7)) \
+                & (doorkeeper[bit2 >> 3] >> (bit2 & 7)) & 1:
+            table = self.table
+            width_mask = self.width_mask
+            step = (key_hash >> 24) | 1
+            for offset in self.row_offsets:
+                counter = offset + (key_hash & width_mask)
+                key_hash += step
+                shift = (counter & 1) << 2
+                if (table[counter >> 1] >> shift) & 15 != 15:
+                    table[counter >> 1] += 1 << shift
+        else:
+            doorkeeper[bit0 >> 3] |= 1 << (bit0 & 7)
+            doorkeeper[bit1 >> 3] |= 1 << (bit1 & 7)
+            doorkeeper[bit2 >> 3] |= 1 << (bit2 & 7)
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._reset()
+
+    def estimate(self, key):
+        key_hash = self.key_hash(key)
+        doorkeeper = self.doorkeeper
+        bit0, bit1, bit2 = self._doorkeeper_bits(key_hash)
+        if not ((doorkeeper[bit0 >> 3] >> (bit0 & 7)) & (doorkeeper[bit1 >> 3] >> (bit1 & 7))
+                & (doorkeeper[bit2 >> 3] >> (bit2 & 7)) & 1):
+            return 0
+        # A key only reaches the counters once the doorkeeper holds it, which counts as one more access
+        table = self.table
+        width_mask = self.width_mask
+        step = (key_hash >> 24) | 1
+        count = 15
+        for offset in self.row_offsets:
+            counter = offset + (key_hash & width_mask)
+            key_hash += step
+            count = min(count, (table[counter >> 1] >> ((counter & 1) << 2)) & 15)
+        return count + 1
+
+    def _reset(self):
+        self.table = self.table.translate(self.HALVE)
+        self.doorkeeper = bytearray(len(self.doorkeeper))
+        self.additions //= 2
+
+    def nbytes(self):
+        return len(self.table) + len(self.doorkeeper)
+
+class WTinyLFUCache:
+    # W-TinyLFU: new keys enter a small LRU window; a key leaving the window only displaces the main area's
+    # eviction candidate if the frequency sketch has seen it more often. The main area is a segmented LRU:
+    # keys hit while on probation move up to the protected segment.
+    WINDOW_FRACTION = 0.01
+    PROTECTED_FRACTION = 0.8
+
+    def __init__(self, capacity, key_names=None):
+        self.capacity = capacity
+        self.cache = {}
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.window_capacity = max(int(capacity * self.WINDOW_FRACTION), 1)
+        self.main_capacity = max(capacity - self.window_capacity, 0)
+        self.protected_capacity = int(self.main_capacity * self.PROTECTED_FRACTION)
+        self.sketch = FrequencySketch(capacity, key_names)
+
+    def get(self, key):
+        self.sketch.increment(key)
+        if key in self.cache:
+            self._hit(key)
+            return self.cache[key]
+        return -1
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        self.sketch.increment(key)
+        if key in self.cache:
+            self.cache[key] = value
+            self._hit(key)
+            return None
+        self.window[key] = None
+        evicted = self._evict_window() if len(self.window) > self.window_capacity else None
         self.cache[key] = value
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                break
+        return self.cache.pop(key)
+
+    def _hit(self, key):
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_capacity:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+        else:
+            self.protected.move_to_end(key)
+
+    def _evict_window(self):
+        candidate, _ = self.window.popitem(last=False)
+        if len(self.probation) + len(self.protected) < self.main_capacity:
+            self.probation[candidate] = None
+            return None
+        if not self.main_capacity:
+            return candidate, self.cache.pop(candidate)
+        victims = self.probation if self.probation else self.protected
+        victim = next(iter(victims))
+        # Admission: ties go to the incumbent, so a one-off key cannot push out one seen as often
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            del victims[victim]
+            self.probation[candidate] = None
+            return victim, self.cache.pop(victim)
+        return candidate, self.cache.pop(candidate)
+
+class ArraySlotIndex:
+    # key -> slot for the array-backed caches: a dict for arbitrary keys, or a flat array when the keys are
+    # dense integer ids below key_space (as in a compiled trace), which costs 8 bytes per key and no objects.
+    # The dict dominates the footprint: with it ArrayLRU takes about 98 bytes/entry against LRUCache's 91, so
+    # the memory saving only holds for compiled traces, where _simulate_with_metrics passes key_space.
+    def __init__(self, key_space=None):
+        self.slots = {} if key_space is None else array('q', [-1]) * key_space
+        self.direct = key_space is not None
+
+    def get(self, key):
+        if self.direct:
+            return self.slots[key]
+        return self.slots.get(key, -1)
+
+    def set(self, key, slot):
+        self.slots[key] = slot
+
+    def remove(self, key):
+        if self.direct:
+            self.slots[key] = -1
+        else:
+            del self.slots[key]
+
+    def nbytes(self):
+        if self.direct:
+            return self.slots.itemsize * len(self.slots)
+        return sys.getsizeof(self.slots)
+
+class ArrayCacheView:
+    # Stands in for the OrderedDict the loops read as cache.cache: len, membership and the printed contents
+    def __init__(self, cache):
+        self.owner = cache
+
+    def __len__(self):
+        return self.owner.size
+
+    def __contains__(self, key):
+        return self.owner.index.get(key) >= 0
+
+    def __iter__(self):
+        return (key for key, _ in self.items())
+
+    def items(self):
+        return self.owner.items()
+
+    def __repr__(self):
+        return repr(OrderedDict(self.items()))
+
+def slot_array(length, fill=0):
+    # 4-byte slot numbers while they fit, so prev/next cost 8 bytes per entry together
+    return array('i' if length < 2 ** 31 else 'q', [fill]) * length
+
+class ArrayLRUCache:
+    # Same policy as LRUCache, but the recency list is two preallocated int arrays of slot numbers.
+    # Slot `capacity` is the sentinel: its next is the least recently used slot, its prev the most recent.
+    def __init__(self, capacity, key_space=None):
+        self.capacity = capacity
+        self.sentinel = max(capacity, 0)
+        self.prev = slot_array(self.sentinel + 1, self.sentinel)
+        self.next = slot_array(self.sentinel + 1, self.sentinel)
+        self.keys = [None] * self.sentinel if key_space is None else array('q', [0]) * self.sentinel
+        self.values = [None] * self.sentinel
+        self.index = ArraySlotIndex(key_space)
+        self.size = 0
+        self.cache = ArrayCacheView(self)
+
+    def get(self, key):
+        slot = self.index.get(key)
+        if slot < 0:
+            return -1
+        self._move_to_end(slot)
+        return self.values[slot]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        slot = self.index.get(key)
+        if slot >= 0:
+            self.values[slot] = value
+            self._move_to_end(slot)
+            return None
+        evicted = None
+        if self.size >= self.capacity:
+            # Reuse the least recently used slot
+            slot = self.next[self.sentinel]
+            self._unlink(slot)
+            evicted = self.keys[slot], self.values[slot]
+            self.index.remove(self.keys[slot])
+        else:
+            slot = self.size
+            self.size += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.index.set(key, slot)
+        self._link_last(slot)
+        return evicted
+
+    def remove(self, key):
+        slot = self.index.get(key)
+        if slot < 0:
+            return -1
+        value = self.values[slot]
+        self._unlink(slot)
+        self.index.remove(key)
+        # Slots stay packed below size: the last one moves into the hole, keeping its place in the list
+        last = self.size - 1
+        if slot != last:
+            before = self.prev[last]
+            after = self.next[last]
+            self.prev[slot] = before
+            self.next[slot] = after
+            self.next[before] = slot
+            self.prev[after] = slot
+            self.keys[slot] = self.keys[last]
+            self.values[slot] = self.values[last]
+            self.index.set(self.keys[slot], slot)
+        self.values[last] = None
+        self.size = last
+        return value
+
+    def _unlink(self, slot):
+        before = self.prev[slot]
+        after = self.next[slot]
+        self.next[before] = after
+        self.prev[after] = before
+
+    def _link_last(self, slot):
+        sentinel = self.sentinel
+        last = self.prev[sentinel]
+        self.prev[slot] = last
+        self.next[slot] = sentinel
+        self.next[last] = slot
+        self.prev[sentinel] = slot
+
+    def _move_to_end(self, slot):
+        if self.prev[self.sentinel] != slot:
+            self._unlink(slot)
+            self._link_last(slot)
+
+    def items(self):
+        # Least recently used first, the same order as LRUCache's OrderedDict
+        slot = self.next[self.sentinel]
+        while slot != self.sentinel:
+            yield self.keys[slot], self.values[slot]
+            slot = self.next[slot]
+
+    def nbytes(self):
+        keys_bytes = sys.getsizeof(self.keys) if isinstance(self.keys, list) else self.keys.itemsize * len(self.keys)
+        return (self.prev.itemsize * len(self.prev) + self.next.itemsize * len(self.next) + keys_bytes
+                + sys.getsizeof(self.values) + self.index.nbytes())
+
+class ArrayFIFOCache:
+    # Same policy as FIFOCache. Eviction order never changes after insertion, so the queue is a ring:
+    # once full, the n-th insertion reuses slot n % capacity and no links are needed at all.
+    def __init__(self, capacity, key_space=None):
+        self.capacity = capacity
+        slots = max(capacity, 0)
+        self.keys = [None] * slots if key_space is None else array('q', [0]) * slots
+        self.values = [None] * slots
+        self.index = ArraySlotIndex(key_space)
+        self.size = 0
+        self.head = 0
+        self.cache = ArrayCacheView(self)
+
+    def get(self, key):
+        slot = self.index.get(key)
+        if slot < 0:
+            return -1
+        return self.values[slot]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        slot = self.index.get(key)
+        if slot >= 0:
+            self.values[slot] = value
+            return None
+        evicted = None
+        if self.size >= self.capacity:
+            # The oldest entry sits at the head of the ring
+            slot = self.head
+            self.head = (slot + 1) % self.capacity
+            evicted = self.keys[slot], self.values[slot]
+            self.index.remove(self.keys[slot])
+        else:
+            slot = self.size
+            self.size += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.index.set(key, slot)
+        return evicted
+
+    def items(self):
+        # Oldest first, the same order as FIFOCache's OrderedDict
+        for offset in range(self.size):
+            slot = (self.head + offset) % self.capacity
+            yield self.keys[slot], self.values[slot]
+
+    def nbytes(self):
+        keys_bytes = sys.getsizeof(self.keys) if isinstance(self.keys, list) else self.keys.itemsize * len(self.keys)
+        return keys_bytes + sys.getsizeof(self.values) + self.index.nbytes()
+
+class ClockCache:
+    # CLOCK (second chance): FIFOCache's ring plus one reference bit per slot. A hit only sets the bit; the
+    # hand clears set bits as it sweeps past and evicts the first slot whose bit is already clear.
+    def __init__(self, capacity, key_space=None):
+        self.capacity = capacity
+        slots = max(capacity, 0)
+        self.keys = [None] * slots if key_space is None else array('q', [0]) * slots
+        self.values = [None] * slots
+        self.referenced = bytearray(slots)
+        self.index = ArraySlotIndex(key_space)
+        self.size = 0
+        self.hand = 0
+        self.cache = ArrayCacheView(self)
+
+    def get(self, key):
+        slot = self.index.get(key)
+        if slot < 0:
+            return -1
+        self.referenced[slot] = 1
+        return self.values[slot]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        slot = self.index.get(key)
+        if slot >= 0:
+            self.values[slot] = value
+            self.referenced[slot] = 1
+            return None
+        evicted = None
+        if self.size >= self.capacity:
+            referenced = self.referenced
+            hand = self.hand
+            while referenced[hand]:
+                referenced[hand] = 0
+                hand = (hand + 1) % self.capacity
+            slot = hand
+            self.hand = (hand + 1) % self.capacity
+            evicted = self.keys[slot], self.values[slot]
+            self.index.remove(self.keys[slot])
+        else:
+            slot = self.size
+            self.size += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.referenced[slot] = 0
+        self.index.set(key, slot)
+        return evicted
+
+    def items(self):
+        # In the order the hand will reach them
+        for offset in range(self.size):
+            slot = (self.hand + offset) % self.capacity
+            yield self.keys[slot], self.values[slot]
+
+    def nbytes(self):
+        keys_bytes = sys.getsizeof(self.keys) if isinstance(self.keys, list) else self.keys.itemsize * len(self.keys)
+        return keys_bytes + sys.getsizeof(self.values) + len(self.referenced) + self.index.nbytes()
+
+class S3FIFOCache:
+    # S3-FIFO: new keys go to a small FIFO ring (10% of the slots). Keys hit while there move on to the main
+    # ring, the rest leave through a ghost ring of keys only; a key found in the ghost ring goes straight to
+    # the main ring, which is a CLOCK with 2-bit access counters. A hit only bumps its slot's counter.
+    # Slots [0, small_capacity) are the small ring, the rest the main ring.
+    SMALL_FRACTION = 0.1
+    MAX_FREQUENCY = 3
+
+    def __init__(self, capacity, key_space=None):
+        self.capacity = capacity
+        slots = max(capacity, 0)
+        self.small_capacity = min(max(int(slots * self.SMALL_FRACTION), 1), slots)
+        self.main_capacity = slots - self.small_capacity
+        self.keys = [None] * slots if key_space is None else array('q', [0]) * slots
+        self.values = [None] * slots
+        self.frequency = bytearray(slots)
+        self.index = ArraySlotIndex(key_space)
+        self.small_head = 0
+        self.small_size = 0
+        self.main_hand = 0
+        self.main_size = 0
+        # The ghost ring remembers as many keys as the main ring holds
+        ghost_slots = self.main_capacity
+        self.ghost_keys = [None] * ghost_slots if key_space is None else array('q', [0]) * ghost_slots
+        self.ghost_index = ArraySlotIndex(key_space)
+        self.ghost_head = 0
+        self.cache = ArrayCacheView(self)
+
+    @property
+    def size(self):
+        return self.small_size + self.main_size
+
+    def get(self, key):
+        slot = self.index.get(key)
+        if slot < 0:
+            return -1
+        if self.frequency[slot] < self.MAX_FREQUENCY:
+            self.frequency[slot] += 1
+        return self.values[slot]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return None
+        slot = self.index.get(key)
+        if slot >= 0:
+            self.values[slot] = value
+            if self.frequency[slot] < self.MAX_FREQUENCY:
+                self.frequency[slot] += 1
+            return None
+        if self.main_capacity > 0 and self.ghost_index.get(key) >= 0:
+            self.ghost_index.remove(key)
+            slot, evicted = self._main_slot()
+        else:
+            slot, evicted = self._small_slot()
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.frequency[slot] = 0
+        self.index.set(key, slot)
+        return evicted
+
+    def _small_slot(self):
+        evicted = self._evict_small() if self.small_size >= self.small_capacity else None
+        slot = (self.small_head + self.small_size) % self.small_capacity
+        self.small_size += 1
+        return slot, evicted
 
-def simulate(cpu_operations, cache_type, cache_capacity, output_filename):
+    def _evict_small(self):
+        slot = self.small_head
+        self.small_head = (slot + 1) % self.small_capacity
+        self.small_size -= 1
+        key = self.keys[slot]
+        # Until the main ring fills, every key moves on, so nothing is evicted before the cache is full
+        if self.main_capacity > 0 and (self.frequency[slot] or self.main_size < self.main_capacity):
+            target, evicted = self._main_slot()
+            self.keys[target] = key
+            self.values[target] = self.values[slot]
+            self.frequency[target] = 0
+            self.index.set(key, target)
+        else:
+            evicted = key, self.values[slot]
+            self.index.remove(key)
+            self._add_ghost(key)
+        self.values[slot] = None
+        return evicted
+
+    def _main_slot(self):
+        if self.main_size < self.main_capacity:
+            self.main_size += 1
+            return self.small_capacity + self.main_size - 1, None
+        frequency = self.frequency
+        hand = self.main_hand
+        while frequency[self.small_capacity + hand]:
+            frequency[self.small_capacity + hand] -= 1
+            hand = (hand + 1) % self.main_capacity
+        slot = self.small_capacity + hand
+        self.main_hand = (hand + 1) % self.main_capacity
+        evicted = self.keys[slot], self.values[slot]
+        self.index.remove(self.keys[slot])
+        return slot, evicted
+
+    def _add_ghost(self, key):
+        if not self.ghost_keys:
+            return
+        position = self.ghost_head
+        # A ghost that was promoted, or remembered again at a newer position, no longer owns this slot
+        old_key = self.ghost_keys[position]
+        if self.ghost_index.get(old_key) == position:
+            self.ghost_index.remove(old_key)
+        self.ghost_keys[position] = key
+        self.ghost_index.set(key, position)
+        self.ghost_head = (position + 1) % len(self.ghost_keys)
+
+    def items(self):
+        # Small ring oldest first, then the main ring in the order its hand will reach them
+        for offset in range(self.small_size):
+            slot = (self.small_head + offset) % self.small_capacity
+            yield self.keys[slot], self.values[slot]
+        for offset in range(self.main_size):
+            slot = self.small_capacity + (self.main_hand + offset) % self.main_capacity
+            yield self.keys[slot], self.values[slot]
+
+    def nbytes(self):
+        keys_bytes = sys.getsizeof(self.keys) if isinstance(self.keys, list) else self.keys.itemsize * len(self.keys)
+        ghost_bytes = (sys.getsizeof(self.ghost_keys) if isinstance(self.ghost_keys, list)
+                       else self.ghost_keys.itemsize * len(self.ghost_keys))
+        return (keys_bytes + sys.getsizeof(self.values) + len(self.frequency) + self.index.nbytes() + ghost_bytes
+                + self.ghost_index.nbytes())
+
+def next_use_index(cpu_operations):
+    # One reverse pass over the gets and puts. next_uses[i] is the position of the next get of access i's key,
+    # or len(next_uses) (never) if the key is put again first: that put reinstalls it, so keeping the key until
+    # then gains nothing.
+    if isinstance(cpu_operations, CompiledTrace):
+        accesses = [(op == OP_GET, key) for op, key in zip(cpu_operations.ops, cpu_operations.keys)
+                    if op == OP_GET or op == OP_PUT]
+    else:
+        accesses = [(operation[0] == 'get', operation[1]) for chunk in iter_chunks(cpu_operations)
+                    for operation in chunk if operation[0] == 'get' or operation[0] == 'put']
+    never = len(accesses)
+    next_uses = array('q', [never]) * never
+    upcoming = {}
+    for position in range(never - 1, -1, -1):
+        is_get, key = accesses[position]
+        next_uses[position] = upcoming.get(key, never)
+        upcoming[key] = position if is_get else never
+    return next_uses
+
+class BeladyCache:
+    # Belady's MIN as an offline reference: evict the resident key whose next get is furthest away, and skip
+    # storing a put whose own next get comes later still. It needs the future, so it is built from the
+    # next-use index of the trace it replays and counts gets and puts to know where it is. MIN is optimal when
+    # every miss installs the key; here a get miss does not, so an evicted key loses all its gets up to its
+    # next put, and an online policy can beat it on some traces. It is not an upper bound on the hit rate.
+    def __init__(self, capacity, next_uses):
+        self.capacity = capacity
+        self.cache = {}
+        self.next_uses = next_uses
+        self.position = 0
+        # Resident key -> position of its next get, and a max-heap of the same (stale entries skipped lazily)
+        self.next_use = {}
+        self.heap = []
+
+    def get(self, key):
+        position = self.position
+        self.position += 1
+        if key in self.cache:
+            self._schedule(key, self.next_uses[position])
+            return self.cache[key]
+        return -1
+
+    def put(self, key, value):
+        position = self.position
+        self.position += 1
+        if self.capacity <= 0:
+            return None
+        next_use = self.next_uses[position]
+        if key in self.cache:
+            self.cache[key] = value
+            self._schedule(key, next_use)
+            return None
+        evicted = None
+        if len(self.cache) >= self.capacity:
+            victim = self._furthest()
+            if next_use >= self.next_use[victim]:
+                # The new key would be the first to go, so it is not stored at all
+                return key, value
+            heapq.heappop(self.heap)
+            del self.next_use[victim]
+            evicted = victim, self.cache.pop(victim)
+        self.cache[key] = value
+        self._schedule(key, next_use)
+        return evicted
+
+    def _schedule(self, key, next_use):
+        self.next_use[key] = next_use
+        heapq.heappush(self.heap, (-next_use, key))
+        # Compact once stale entries outnumber the live ones, as the LFU buckets do
+        if len(self.heap) > 2 * len(self.next_use) + 8:
+            self.heap = [(-use, resident) for resident, use in self.next_use.items()]
+            heapq.heapify(self.heap)
+
+    def _furthest(self):
+        heap = self.heap
+        while True:
+            negative_use, key = heap[0]
+            if self.next_use.get(key) == -negative_use:
+                return key
+            heapq.heappop(heap)
+
+def create_cache(cache_type, cache_capacity, key_space=None, trace=None, key_names=None):
+    # key_space only matters to the array-backed caches (see ArraySlotIndex); trace only to OPT, which has to
+    # know the operations it is about to replay; key_names only to WTinyLFU, when it is replayed on the key
+    # ids of a compiled trace
     if cache_type == 'LRU':
-        cache = LRUCache(cache_capacity)
+        return LRUCache(cache_capacity)
     elif cache_type == 'LFU':
-        cache = LFUCache(cache_capacity)
+        return LFUCache(cache_capacity)
     elif cache_type == 'FIFO':
-        cache = FIFOCache(cache_capacity)
+        return FIFOCache(cache_capacity)
+    elif cache_type == 'ArrayLRU':
+        return ArrayLRUCache(cache_capacity, key_space)
+    elif cache_type == 'ArrayFIFO':
+        return ArrayFIFOCache(cache_capacity, key_space)
+    elif cache_type == 'ARC':
+        return ARCCache(cache_capacity)
+    elif cache_type == '2Q':
+        return TwoQueueCache(cache_capacity)
+    elif cache_type == 'WTinyLFU':
+        return WTinyLFUCache(cache_capacity, key_names)
+    elif cache_type == 'CLOCK':
+        return ClockCache(cache_capacity, key_space)
+    elif cache_type == 'S3FIFO':
+        return S3FIFOCache(cache_capacity, key_space)
+    elif cache_type == 'OPT':
+        if trace is None:
+            raise ValueError("OPT is an offline policy: create it with the trace it will replay.")
+        if iter(trace) is trace:
+            # Building the index would exhaust it, leaving nothing for the replay
+            raise ValueError("OPT reads its trace twice: pass a list, TraceFile or compiled trace, not an iterator.")
+        return BeladyCache(cache_capacity, next_use_index(trace))
     else:
-        raise ValueError("Invalid cache type. Choose from 'LRU', 'LFU', or 'FIFO'.")
+        raise ValueError("Invalid cache type. Choose from 'LRU', 'LFU', 'FIFO', 'ArrayLRU', 'ArrayFIFO', 'ARC', "
+                         "'2Q', 'WTinyLFU', 'CLOCK', 'S3FIFO', or 'OPT'.")
 
-    results = []
+def simulate(cpu_operations, cache_type, cache_capacity, output_filename, verbosity=VERBOSITY_PER_OP):
+    cache = create_cache(cache_type, cache_capacity, trace=cpu_operations)
+    per_op = verbosity >= VERBOSITY_PER_OP
 
-    with open(output_filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
+    results = []
 
+    with open_result_writer(output_filename) as writer:
         for i, operation in enumerate(cpu_operations):
             op_type, *op_args = operation
 
@@ -95,152 +985,368 @@ def simulate(cpu_operations, cache_type, cache_capacity, output_filename):
                 result = cache.get(key)
                 results.append(result)
                 cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, result])
+                if per_op:
+                    print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
+                if writer is not None:
+                    writer.add(i + 1, cache_size, result)
 
             elif op_type == 'put':
                 key, value = op_args
                 cache.put(key, value)
                 cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, 'N/A'])
+                if per_op:
+                    print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
+                if writer is not None:
+                    writer.add(i + 1, cache_size, 'N/A')
 
             elif op_type == 'compute':
                 # Simulate a CPU compute operation (no effect on cache in this example)
-                print(f"Operation {i + 1}: Compute Task Executed")
+                if per_op:
+                    print(f"Operation {i + 1}: Compute Task Executed")
 
-            else:
+            elif per_op:
                 print(f"Operation {i + 1}: Unknown Operation")
 
     return results
 
-def simulate_sequential(cpu_operations, cache_types, cache_capacity, output_filenames):
+def simulate_sequential(cpu_operations, cache_types, cache_capacity, output_filenames, verbosity=VERBOSITY_PER_OP):
     for cache_type, output_filename in zip(cache_types, output_filenames):
-        simulate(cpu_operations, cache_type, cache_capacity, output_filename)
+        simulate(cpu_operations, cache_type, cache_capacity, output_filename, verbosity)
+
+def parallel_backend(cpu_operations, backend, max_workers=None):
+    # Threads share the trace object directly; processes map one shared-memory copy of it
+    if backend == 'thread':
+        return nullcontext(cpu_operations), concurrent.futures.ThreadPoolExecutor(max_workers)
+    elif backend == 'process':
+        return share_trace(cpu_operations), concurrent.futures.ProcessPoolExecutor(max_workers)
+    else:
+        raise ValueError("Invalid backend. Choose from 'thread' or 'process'.")
 
-def simulate_parallel(cpu_operations, cache_types, cache_capacity, output_filenames):
-    with concurrent.futures.ThreadPoolExecutor() as executor:  # Change to ProcessPoolExecutor for parallel processes
-        futures = [executor.submit(simulate, cpu_operations, cache_type, cache_capacity, output_filename)
+def simulate_parallel(cpu_operations, cache_types, cache_capacity, output_filenames, verbosity=VERBOSITY_PER_OP,
+                      backend='thread', max_workers=None):
+    trace_context, executor = parallel_backend(cpu_operations, backend, max_workers)
+    with trace_context as trace, executor:
+        futures = [executor.submit(simulate, trace, cache_type, cache_capacity, output_filename, verbosity)
                    for cache_type, output_filename in zip(cache_types, output_filenames)]
         concurrent.futures.wait(futures)
 
-def simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename):
+def count_operations(cache, operations):
+    # Metrics-only fast path: no output, no per-op formatting, no cache size lookups
     cache_hits = 0
     cache_misses = 0
+    get = cache.get
+    put = cache.put
 
-    if cache_type == 'LRU':
-        cache = LRUCache(cache_capacity)
-    elif cache_type == 'LFU':
-        cache = LFUCache(cache_capacity)
-    elif cache_type == 'FIFO':
-        cache = FIFOCache(cache_capacity)
-    else:
-        raise ValueError("Invalid cache type. Choose from 'LRU', 'LFU', or 'FIFO'.")
+    for op_type, *op_args in operations:
+        if op_type == 'get':
+            if get(op_args[0]) != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
+        elif op_type == 'put':
+            key, value = op_args
+            put(key, value)
 
-    with open(output_filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
+    return cache_hits, cache_misses
 
-        for i, operation in enumerate(cpu_operations):
-            op_type, *op_args = operation
+def run_operations(cache, operations, start, writer=None, verbosity=VERBOSITY_PER_OP, recorder=None):
+    if recorder is not None:
+        return recorder.run_operations(cache, operations, start, writer, verbosity, run_operations)
+    if writer is None and verbosity < VERBOSITY_PER_OP:
+        return count_operations(cache, operations)
 
-            if op_type == 'get':
-                key = op_args[0]
-                result = cache.get(key)
-                cache_size = len(cache.cache)
-                if result != -1:
-                    cache_hits += 1
-                else:
-                    cache_misses += 1
+    per_op = verbosity >= VERBOSITY_PER_OP
+    cache_hits = 0
+    cache_misses = 0
+
+    for i, operation in enumerate(operations, start):
+        op_type, *op_args = operation
 
+        if op_type == 'get':
+            key = op_args[0]
+            result = cache.get(key)
+            cache_size = len(cache.cache)
+            if result != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
+
+            if per_op:
                 print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, result])
+            if writer is not None:
+                writer.add(i + 1, cache_size, result)
 
-            elif op_type == 'put':
-                key, value = op_args
-                cache.put(key, value)
-                cache_size = len(cache.cache)
+        elif op_type == 'put':
+            key, value = op_args
+            cache.put(key, value)
+            cache_size = len(cache.cache)
+            if per_op:
                 print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, 'N/A'])
+            if writer is not None:
+                writer.add(i + 1, cache_size, 'N/A')
 
-            elif op_type == 'compute':
-                # Simulate a CPU compute operation (no effect on cache in this example)
+        elif op_type == 'compute':
+            # Simulate a CPU compute operation (no effect on cache in this example)
+            if per_op:
                 print(f"Operation {i + 1}: Compute Task Executed")
 
+        elif per_op:
+            print(f"Operation {i + 1}: Unknown Operation")
+
+    return cache_hits, cache_misses
+
+def count_compiled_operations(cache, ops, keys, values):
+    # Same as count_operations, on integer opcodes and key ids
+    cache_hits = 0
+    cache_misses = 0
+    get = cache.get
+    put = cache.put
+
+    for op, key, value in zip(ops, keys, values):
+        if op == OP_GET:
+            if get(key) != -1:
+                cache_hits += 1
             else:
-                print(f"Operation {i + 1}: Unknown Operation")
+                cache_misses += 1
+        elif op == OP_PUT:
+            put(key, value)
+
+    return cache_hits, cache_misses
 
-    total_operations = len(cpu_operations)
+def run_compiled_operations(cache, trace, start, ops, keys, values, writer=None, verbosity=VERBOSITY_PER_OP):
+    if writer is None and verbosity < VERBOSITY_PER_OP:
+        return count_compiled_operations(cache, ops, keys, values)
+
+    per_op = verbosity >= VERBOSITY_PER_OP
+    cache_hits = 0
+    cache_misses = 0
+
+    for i, (op, key, value) in enumerate(zip(ops, keys, values), start):
+        if op == OP_GET:
+            result = cache.get(key)
+            cache_size = len(cache.cache)
+            if result != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
+
+            if per_op:
+                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
+            if writer is not None:
+                writer.add(i + 1, cache_size, result)
+
+        elif op == OP_PUT:
+            cache.put(key, value)
+            cache_size = len(cache.cache)
+            if per_op:
+                print(f"Operation {i + 1}: Cache Size: {cache_size}, "
+                      f"Cache Updated: {trace.decode_cache(cache.cache)}")
+            if writer is not None:
+                writer.add(i + 1, cache_size, 'N/A')
+
+        elif op == OP_COMPUTE:
+            # Simulate a CPU compute operation (no effect on cache in this example)
+            if per_op:
+                print(f"Operation {i + 1}: Compute Task Executed")
+
+        elif per_op:
+            print(f"Operation {i + 1}: Unknown Operation")
+
+    return cache_hits, cache_misses
+
+def print_metrics(cache_hits, cache_misses, total_operations, verbosity=VERBOSITY_PER_OP):
     miss_rate = cache_misses / total_operations if total_operations > 0 else 0.0
     hit_rate = cache_hits / total_operations if total_operations > 0 else 0.0
 
+    if verbosity < VERBOSITY_SUMMARY:
+        return miss_rate
+
     print("\nCache Simulation Metrics:")
     print(f"Total Hits: {cache_hits}")
     print(f"Total Misses: {cache_misses}")
     print(f"Miss Rate: {miss_rate * 100:.2f}%")
     print(f"Hit Rate: {hit_rate * 100:.2f}%")
 
+    return miss_rate
+
+def _simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename,
+                           verbosity=VERBOSITY_PER_OP, result_cache=None, recorder=None):
+    # Identical runs are served from the on-disk result cache, including their CSV output; an
+    # instrumented run always replays, since the latencies are what it is after
+    if result_cache is not None and recorder is None:
+        cached = result_cache.lookup(cpu_operations, cache_type, cache_capacity, {}, output_filename)
+        if cached is not None:
+            cache_hits, cache_misses, total_operations = cached
+            miss_rate = print_metrics(cache_hits, cache_misses, total_operations, verbosity)
+            return cache_hits, cache_misses, miss_rate, total_operations
+
+    compiled = isinstance(cpu_operations, CompiledTrace) and recorder is None
+    # Compiled key ids are dense, so the array-backed caches can index them directly
+    key_space = len(cpu_operations.key_names) if compiled else None
+    key_names = cpu_operations.key_names if compiled else None
+    cache = create_cache(cache_type, cache_capacity, key_space, cpu_operations, key_names)
+    cache_hits = 0
+    cache_misses = 0
+    total_operations = 0
+
+    with open_result_writer(output_filename) as writer:
+        if compiled:
+            # A compiled trace replays on integer opcodes and key ids, without touching the operation tuples
+            for start, ops, keys, values in cpu_operations.chunks():
+                hits, misses = run_compiled_operations(cache, cpu_operations, start, ops, keys, values, writer,
+                                                       verbosity)
+                cache_hits += hits
+                cache_misses += misses
+                total_operations += len(ops)
+        else:
+            # Operations are pulled a chunk at a time, so a streamed trace is never fully materialized
+            for chunk in iter_chunks(cpu_operations):
+                hits, misses = run_operations(cache, chunk, total_operations, writer, verbosity, recorder)
+                cache_hits += hits
+                cache_misses += misses
+                total_operations += len(chunk)
+
+    if result_cache is not None:
+        result_cache.store(cpu_operations, cache_type, cache_capacity, {}, output_filename, cache_hits,
+                           cache_misses, total_operations)
+
+    miss_rate = print_metrics(cache_hits, cache_misses, total_operations, verbosity)
+
+    return cache_hits, cache_misses, miss_rate, total_operations
+
+def simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename, verbosity=VERBOSITY_PER_OP,
+                          result_cache=None, recorder=None):
+    cache_hits, cache_misses, miss_rate, _ = _simulate_with_metrics(cpu_operations, cache_type, cache_capacity,
+                                                                     output_filename, verbosity,
+                                                                     result_cache=result_cache, recorder=recorder)
     return cache_hits, cache_misses, miss_rate
 
-def simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames):
+def simulate_shared_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames,
+                                 verbosity=VERBOSITY_PER_OP):
+    # Every policy consumes the same chunk before the next one is read, so the trace is read only once
+    caches = [create_cache(cache_type, cache_capacity, trace=cpu_operations) for cache_type in cache_types]
+    cache_hits = [0] * len(caches)
+    cache_misses = [0] * len(caches)
+    total_operations = 0
+
+    with ExitStack() as stack:
+        writers = [stack.enter_context(open_result_writer(output_filename)) for output_filename in output_filenames]
+
+        for chunk in iter_chunks(cpu_operations):
+            for index, (cache, writer) in enumerate(zip(caches, writers)):
+                hits, misses = run_operations(cache, chunk, total_operations, writer, verbosity)
+                cache_hits[index] += hits
+                cache_misses[index] += misses
+            total_operations += len(chunk)
+
+    results = []
+    for cache_type, hits, misses in zip(cache_types, cache_hits, cache_misses):
+        if verbosity >= VERBOSITY_SUMMARY:
+            print(f"\n{cache_type}:")
+        miss_rate = print_metrics(hits, misses, total_operations, verbosity)
+        results.append((hits, misses, miss_rate))
+
+    return results
+
+def print_total_metrics(label, total_hits, total_misses, total_operations, total_execution_time,
+                        verbosity=VERBOSITY_PER_OP):
+    if verbosity < VERBOSITY_SUMMARY:
+        return
+    print(f"\nTotal Metrics ({label}):")
+    print(f"Total Hits: {total_hits}")
+    print(f"Total Misses: {total_misses}")
+    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
+    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
+    print(f"Miss Rate: {miss_rate * 100:.2f}%")
+    print(f"Hit Rate: {hit_rate * 100:.2f}%")
+    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+
+def simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames,
+                                     verbosity=VERBOSITY_PER_OP, result_cache=None):
     total_hits = 0
     total_misses = 0
+    total_operations = 0
 
     start_time = time.time()
 
+    # cpu_operations must be re-iterable here (a list or a TraceFile), since each policy replays it
     for cache_type, output_filename in zip(cache_types, output_filenames):
-        cache_hits, cache_misses, _ = simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename)
+        cache_hits, cache_misses, _, operations = _simulate_with_metrics(cpu_operations, cache_type, cache_capacity,
+                                                                         output_filename, verbosity,
+                                                                         result_cache=result_cache)
         total_hits += cache_hits
         total_misses += cache_misses
+        total_operations += operations
 
     end_time = time.time()
     total_execution_time = end_time - start_time
 
-    print("\nTotal Metrics (Sequential):")
-    print(f"Total Hits: {total_hits}")
-    print(f"Total Misses: {total_misses}")
-    total_operations = len(cpu_operations) * len(cache_types)
-    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+    print_total_metrics("Sequential", total_hits, total_misses, total_operations, total_execution_time,
+                        verbosity)
 
-def simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames):
+    return total_hits, total_misses, total_execution_time
+
+def simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames,
+                                   verbosity=VERBOSITY_PER_OP, backend='thread', max_workers=None,
+                                   result_cache=None):
     total_hits = 0
     total_misses = 0
+    total_operations = 0
 
     start_time = time.time()
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(simulate_with_metrics, cpu_operations, cache_type, cache_capacity, output_filename)
+    trace_context, executor = parallel_backend(cpu_operations, backend, max_workers)
+    with trace_context as trace, executor:
+        if result_cache is not None and trace is not cpu_operations:
+            # Workers reuse the parent's fingerprint instead of rehashing the shared copy
+            trace.fingerprint = result_cache.trace_fingerprint(cpu_operations)
+        futures = [executor.submit(_simulate_with_metrics, trace, cache_type, cache_capacity, output_filename,
+                                   verbosity, result_cache=result_cache)
                    for cache_type, output_filename in zip(cache_types, output_filenames)]
         concurrent.futures.wait(futures)
 
         for future in futures:
-            cache_hits, cache_misses, _ = future.result()
+            cache_hits, cache_misses, _, operations = future.result()
             total_hits += cache_hits
             total_misses += cache_misses
+            total_operations += operations
 
     end_time = time.time()
     total_execution_time = end_time - start_time
 
-    print("\nTotal Metrics (Parallel):")
-    print(f"Total Hits: {total_hits}")
-    print(f"Total Misses: {total_misses}")
-    total_operations = len(cpu_operations) * len(cache_types)
-    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+    print_total_metrics("Parallel", total_hits, total_misses, total_operations, total_execution_time,
+                        verbosity)
+
+    return total_hits, total_misses, total_execution_time
+
+def measure_parallel_scaling(cpu_operations, cache_types, cache_capacity, worker_counts=None, backend='process'):
+    # Metrics-only runs, so the timings measure the policies rather than printing and CSV output
+    if worker_counts is None:
+        worker_counts = range(1, min(len(cache_types), os.cpu_count() or 1) + 1)
+
+    scaling = []
+    for workers in worker_counts:
+        _, _, execution_time = simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity,
+                                                              [None] * len(cache_types), VERBOSITY_SILENT,
+                                                              backend, workers)
+        speedup = scaling[0][1] / execution_time if scaling and execution_time > 0 else 1.0
+        scaling.append((workers, execution_time, speedup))
+        print(f"Workers: {workers}, Time: {execution_time:.2f} seconds, Speedup: {speedup:.2f}x")
+
+    return scaling
 
 # ... (existing code)
 
 def main():
-    # Read CPU operations from a text file
-    with open("00_cpu_operations.txt", "r") as file:
-        cpu_operations = [tuple(line.strip().split()) for line in file]
+    parser = argparse.ArgumentParser(description="Simulate LRU, LFU and FIFO caches on 00_cpu_operations.txt")
+    parser.add_argument('--shared', action='store_true',
+                        help="also replay every policy in a single pass over the trace")
+    parser.add_argument('--scaling', action='store_true',
+                        help="also time the process backend at each worker count and report the speedup")
+    args = parser.parse_args()
+
+    # Stream CPU operations from a text file instead of loading them into a list
+    cpu_operations = TraceFile("00_cpu_operations.txt")
 
     # Set cache types and output filenames
     cache_types = ['LRU', 'LFU', 'FIFO']
@@ -254,7 +1360,15 @@ def main():
 
     # Parallel execution with metrics
     output_filenames_parallel = [f'{cache_type}_parallel_results.csv' for cache_type in cache_types]
-    simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_parallel)
+    simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_parallel,
+                                   backend='process')
+
+    if args.shared:
+        simulate_shared_with_metrics(cpu_operations, cache_types, cache_capacity, [None] * len(cache_types),
+                                     VERBOSITY_SUMMARY)
+    if args.scaling:
+        print("\nParallel scaling (process backend):")
+        measure_parallel_scaling(cpu_operations, cache_types, cache_capacity)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
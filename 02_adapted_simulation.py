@@ -1,19 +1,327 @@
-import csv
+import argparse
 import concurrent.futures
+import math
+import os
+import sys
 from collections import OrderedDict
 import time
+from contextlib import ExitStack, nullcontext
+
+from result_io import VERBOSITY_PER_OP, VERBOSITY_SILENT, VERBOSITY_SUMMARY, open_result_writer
+from trace_io import OP_COMPUTE, OP_GET, OP_PUT, CompiledTrace, TraceFile, iter_chunks, share_trace
+
+class IndexedMinHeap:
+    def __init__(self):
+        self.heap = []
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, key, priority):
+        self.heap.append((priority, key))
+        self.positions[key] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def update(self, key, priority):
+        index = self.positions[key]
+        old_priority = self.heap[index][0]
+        self.heap[index] = (priority, key)
+        if priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def remove(self, key):
+        index = self.positions.pop(key)
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.positions[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(self.positions[last[1]])
+
+    def pop(self):
+        # Ties on priority break on the smallest key, like min(..., key=lambda k: (freq[k], k))
+        key = self.heap[0][1]
+        self.remove(key)
+        return key
+
+    def rebuild(self, priorities):
+        self.heap = sorted((priority, key) for key, priority in priorities.items())
+        self.positions = {key: i for i, (_, key) in enumerate(self.heap)}
+
+    def keys_below(self, limit):
+        # Every key with priority <= limit; subtrees whose root is above the limit are skipped
+        heap = self.heap
+        keys = []
+        stack = [0] if heap else []
+        while stack:
+            index = stack.pop()
+            if index < len(heap) and heap[index][0] <= limit:
+                keys.append(heap[index][1])
+                stack.append(2 * index + 1)
+                stack.append(2 * index + 2)
+        return keys
+
+    def _sift_up(self, index):
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not entry < heap[parent]:
+                break
+            heap[index] = heap[parent]
+            self.positions[heap[index][1]] = index
+            index = parent
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+    def _sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[index] = heap[child]
+            self.positions[heap[index][1]] = index
+            index = child
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+class UnderflowCounts:
+    # Counts that have decayed below the normal float range. The old per-key multiply rounded them at every
+    # step, which can tie neighbouring counts, until they reached 0.0 or a value the factor no longer changes;
+    # so they are decayed here one step at a time, exactly as it did. At decay_factor 0.5 a count settles
+    # within about 53 steps.
+    def __init__(self):
+        self.counts = {}
+        self.changing = set()
+        self.queue = IndexedMinHeap()
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def push(self, key, count):
+        self.counts[key] = count
+        self.queue.push(key, count)
+        if count:
+            self.changing.add(key)
+
+    def remove(self, key):
+        self.queue.remove(key)
+        self.changing.discard(key)
+        return self.counts.pop(key)
+
+    def pop(self):
+        key = self.queue.pop()
+        self.changing.discard(key)
+        del self.counts[key]
+        return key
+
+    def decay_except(self, current_key, decay_factor):
+        for key in list(self.changing):
+            if key == current_key:
+                continue
+            count = self.counts[key]
+            decayed = count * decay_factor
+            if decayed == count:
+                self.changing.discard(key)
+            else:
+                self.counts[key] = decayed
+                self.queue.update(key, decayed)
+
+class DecayOrbit:
+    # Exact counts as the per-step loop computes them: one rounded multiply per decay, which is not the same
+    # float as count * decay_factor ** n, and the ties it leaves decide evictions. The scaled counts below
+    # only approximate them, so a key also keeps the exact count it had at some decay epoch, and this
+    # replays the decays since then on demand. Counts that start at 1 (every insert, every FIFO count) are
+    # read from one shared table.
+    TABLE_LIMIT = 1 << 16
+
+    def __init__(self, decay_factor):
+        self.decay_factor = decay_factor
+        # Decays applied so far
+        self.epoch = 0
+        self.ones = [1.0]
+        self.ones_settled = False
+        # A scaled count and the exact one each round once per decay since the key was last anchored, and a
+        # count leaves the scaled heap for UnderflowCounts within about `steps` decays, so they never drift
+        # further apart than this; counts closer than it are compared exactly
+        steps = 1100 / -math.log2(decay_factor) if 0 < decay_factor < 1 else 1100
+        self.slack = 1 + (steps + 8) * 2.0 ** -50
+
+    def value(self, count, steps):
+        # count after `steps` more decays
+        decay_factor = self.decay_factor
+        if count == 1:
+            ones = self.ones
+            while len(ones) <= steps and not self.ones_settled and len(ones) < self.TABLE_LIMIT:
+                decayed = ones[-1] * decay_factor
+                if decayed == ones[-1]:
+                    self.ones_settled = True
+                else:
+                    ones.append(decayed)
+            if steps < len(ones):
+                return ones[steps]
+            if self.ones_settled:
+                return ones[-1]
+            count = ones[-1]
+            steps -= len(ones) - 1
+        for _ in range(steps):
+            decayed = count * decay_factor
+            if decayed == count:
+                break
+            count = decayed
+        return count
+
+class DecayingFrequencies:
+    # Bounds on the global scale before the stored counts are folded back in
+    SCALE_MIN = 2.0 ** -512
+    SCALE_MAX = 2.0 ** 512
+    # Smallest normal float; below it a count moves to UnderflowCounts
+    NORMAL_MIN = sys.float_info.min
+
+    def __init__(self, decay_factor):
+        self.decay_factor = decay_factor
+        self.orbit = DecayOrbit(decay_factor)
+        # Stored counts are relative to one global scale, so decaying every other key is a single multiply.
+        # They order the heap; near-ties are settled on the exact counts in `bases`.
+        self.scale = 1.0
+        self.counts = {}
+        # key -> (exact count, decay epoch it was taken at)
+        self.bases = {}
+        self.queue = IndexedMinHeap()
+        self.underflow = UnderflowCounts()
+
+    def __getitem__(self, key):
+        if key in self.underflow:
+            return self.underflow.counts[key]
+        return self._exact(key)
+
+    def __contains__(self, key):
+        return key in self.counts or key in self.underflow
+
+    def __len__(self):
+        return len(self.counts) + len(self.underflow)
+
+    def add(self, key):
+        self.bases[key] = (1.0, self.orbit.epoch)
+        self.counts[key] = 1 / self.scale
+        self.queue.push(key, self.counts[key])
+
+    def increment(self, key):
+        if key in self.underflow:
+            count = self.underflow.remove(key) + 1
+        else:
+            # The exact count lies within slack of the scaled one; when both ends of that range add 1 to the
+            # same float, so does the exact count, and it need not be replayed
+            count = self.counts[key] * self.scale
+            high = count * self.orbit.slack + 1
+            count = count / self.orbit.slack + 1
+            if count != high:
+                count = self._exact(key) + 1
+        self._anchor(key, count)
+
+    def decay_except(self, current_key):
+        if self.underflow.changing:
+            self.underflow.decay_except(current_key, self.decay_factor)
+        self.orbit.epoch += 1
+        scale = self.scale * self.decay_factor
+        if not self.SCALE_MIN <= scale <= self.SCALE_MAX:
+            # Also the path for decay_factor 0, which cannot be divided back out of the current key
+            self._normalize(current_key)
+        else:
+            self.scale = scale
+        if current_key in self.counts:
+            # The current key skips this decay, so its stored count moves opposite to the scale
+            count, epoch = self.bases[current_key]
+            self.bases[current_key] = (count, epoch + 1)
+            self._rescale(current_key, self._exact(current_key))
+        self._move_underflowed()
+
+    def pop_min(self):
+        # Underflowed counts are below every normal one
+        if self.underflow:
+            return self.underflow.pop()
+        queue = self.queue
+        keys = queue.keys_below(queue.heap[0][0] * self.orbit.slack)
+        key = keys[0] if len(keys) == 1 else min(keys, key=lambda k: (self._exact(k), k))
+        self.remove(key)
+        return key
+
+    def remove(self, key):
+        if key in self.underflow:
+            self.underflow.remove(key)
+            return
+        del self.counts[key]
+        del self.bases[key]
+        self.queue.remove(key)
+
+    def _exact(self, key):
+        base, epoch = self.bases[key]
+        steps = self.orbit.epoch - epoch
+        if not steps:
+            return base
+        count = self.orbit.value(base, steps)
+        # A base of 1 is kept while the shared table covers it, so FIFO counts never replay a step
+        if base != 1 or steps >= DecayOrbit.TABLE_LIMIT:
+            self.bases[key] = (count, self.orbit.epoch)
+        return count
+
+    def _anchor(self, key, count):
+        self.bases[key] = (count, self.orbit.epoch)
+        self._rescale(key, count)
+
+    def _rescale(self, key, count):
+        # Re-derive the stored count from the exact one, so rounding in the scale does not pile up
+        self.counts[key] = count / self.scale
+        if key in self.queue.positions:
+            self.queue.update(key, self.counts[key])
+        else:
+            self.queue.push(key, self.counts[key])
+
+    def _move_underflowed(self):
+        queue = self.queue
+        limit = self.NORMAL_MIN * self.orbit.slack / self.scale
+        if not queue.heap or queue.heap[0][0] >= limit:
+            return
+        for key in queue.keys_below(limit):
+            count = self._exact(key)
+            if count < self.NORMAL_MIN:
+                self.remove(key)
+                self.underflow.push(key, count)
+
+    def _normalize(self, current_key):
+        # Fold the scale into the counts and apply this step's decay directly, as the old loop would have
+        for key in self.counts:
+            count = self.counts[key] * self.scale
+            self.counts[key] = count if key == current_key else count * self.decay_factor
+        self.scale = 1.0
+        self.queue.rebuild(self.counts)
 
 class AdaptiveFIFOCache:
     def __init__(self, capacity, decay_factor=0.5):
         self.capacity = capacity
         self.cache = OrderedDict()
-        self.frequency = {}
+        self.frequency = DecayingFrequencies(decay_factor)
         self.decay_factor = decay_factor
 
     def get(self, key):
         return self.cache.get(key, -1)
 
     def put(self, key, value):
+        # Returns the (key, value) it evicted, if any, like the caches in 01_cache_simulation
+        evicted = None
         if self.capacity > 0:
             if key in self.cache:
                 # Update value and decay frequencies
@@ -22,115 +330,477 @@ class AdaptiveFIFOCache:
             else:
                 # Check and remove the least frequently used item if at capacity
                 if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
+                    min_key = self.frequency.pop_min()
+                    evicted = min_key, self.cache.pop(min_key)
                 # Add new item and set initial frequency to 1
                 self.cache[key] = value
-                self.frequency[key] = 1
+                self.frequency.add(key)
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        self.frequency.remove(key)
+        return self.cache.pop(key)
 
     def decay_frequencies(self, current_key):
         # Decay frequencies of all items except the current key
-        for key in self.frequency:
-            if key != current_key:
-                self.frequency[key] *= self.decay_factor
+        self.frequency.decay_except(current_key)
 
 class AdaptiveLRUCache:
     def __init__(self, capacity, decay_factor=0.5):
         self.capacity = capacity
         self.cache = OrderedDict()
-        self.frequency = {}
+        self.frequency = DecayingFrequencies(decay_factor)
         self.decay_factor = decay_factor
 
     def get(self, key):
         if key in self.cache:
             # Increment frequency and move the accessed key to the end
-            self.frequency[key] += 1
+            self.frequency.increment(key)
             self.cache.move_to_end(key)
             return self.cache[key]
         return -1
 
     def put(self, key, value):
+        # Returns the (key, value) it evicted, if any, like the caches in 01_cache_simulation
+        evicted = None
         if self.capacity > 0:
             if key in self.cache:
                 # Update value, increment frequency, and decay frequencies
                 self.cache[key] = value
-                self.frequency[key] += 1
+                self.frequency.increment(key)
                 self.cache.move_to_end(key)
                 self.decay_frequencies(key)
             else:
                 # Check and remove the least frequently used item if at capacity
                 if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
+                    min_key = self.frequency.pop_min()
+                    evicted = min_key, self.cache.pop(min_key)
                 # Add new item and set initial frequency to 1
                 self.cache[key] = value
-                self.frequency[key] = 1
+                self.frequency.add(key)
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        self.frequency.remove(key)
+        return self.cache.pop(key)
 
     def decay_frequencies(self, current_key):
         # Decay frequencies of all items except the current key
-        for key in self.frequency:
-            if key != current_key:
-                self.frequency[key] *= self.decay_factor
+        self.frequency.decay_except(current_key)
 
 class AdaptiveLFUCache:
     def __init__(self, capacity, decay_factor=0.5):
         self.capacity = capacity
         self.cache = OrderedDict()
-        self.frequency = {}
+        self.frequency = DecayingFrequencies(decay_factor)
         self.decay_factor = decay_factor
 
     def get(self, key):
         if key in self.cache:
             # Increment frequency and move the accessed key to the end
-            self.frequency[key] += 1
+            self.frequency.increment(key)
             self.cache.move_to_end(key)
             return self.cache[key]
         return -1
 
     def put(self, key, value):
+        # Returns the (key, value) it evicted, if any, like the caches in 01_cache_simulation
+        evicted = None
         if self.capacity > 0:
             if key in self.cache:
                 # Update value, increment frequency, and decay frequencies
                 self.cache[key] = value
-                self.frequency[key] += 1
+                self.frequency.increment(key)
                 self.cache.move_to_end(key)
                 self.decay_frequencies(key)
             else:
                 # Check and remove the least frequently used item if at capacity
                 if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
+                    min_key = self.frequency.pop_min()
+                    evicted = min_key, self.cache.pop(min_key)
                 # Add new item and set initial frequency to 1
                 self.cache[key] = value
-                self.frequency[key] = 1
+                self.frequency.add(key)
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        self.frequency.remove(key)
+        return self.cache.pop(key)
 
     def decay_frequencies(self, current_key):
         # Decay frequencies of all items except the current key
-        for key in self.frequency:
-            if key != current_key:
-                self.frequency[key] *= self.decay_factor
+        self.frequency.decay_except(current_key)
+
+class AdaptiveEntry:
+    # Everything the adaptive caches keep about one key, stored once: the Adaptive*Cache classes spread it
+    # over an OrderedDict, counts and bases dicts, a heap tuple and a positions dict
+    __slots__ = ('key', 'value', 'count', 'base', 'epoch', 'position')
+
+    def __init__(self, key, value, count, base, epoch):
+        self.key = key
+        self.value = value
+        self.count = count
+        self.base = base
+        self.epoch = epoch
+        self.position = 0
+
+class DecayingEntries:
+    # DecayingFrequencies over AdaptiveEntry records: one dict, in recency order, and a heap of the records
+    # themselves ordered by (count, key). The count arithmetic is the same, so evictions are identical.
+    # A record whose count has underflowed leaves the heap (position -1) for UnderflowCounts.
+    def __init__(self, decay_factor):
+        self.decay_factor = decay_factor
+        self.orbit = DecayOrbit(decay_factor)
+        self.scale = 1.0
+        self.entries = {}
+        self.heap = []
+        self.underflow = UnderflowCounts()
+
+    def __getitem__(self, key):
+        if key in self.underflow:
+            return self.underflow.counts[key]
+        return self._exact(self.entries[key])
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, value):
+        entry = self.entries[key] = AdaptiveEntry(key, value, 1 / self.scale, 1.0, self.orbit.epoch)
+        self._push(entry)
+
+    def increment(self, entry):
+        if entry.position < 0:
+            count = self.underflow.remove(entry.key) + 1
+        else:
+            count = entry.count * self.scale
+            high = count * self.orbit.slack + 1
+            count = count / self.orbit.slack + 1
+            if count != high:
+                count = self._exact(entry) + 1
+        self._anchor(entry, count)
+
+    def move_to_end(self, entry):
+        # A plain dict keeps insertion order, so re-inserting is OrderedDict.move_to_end
+        del self.entries[entry.key]
+        self.entries[entry.key] = entry
+
+    def decay_except(self, current_key):
+        if self.underflow.changing:
+            self.underflow.decay_except(current_key, self.decay_factor)
+        self.orbit.epoch += 1
+        scale = self.scale * self.decay_factor
+        if not DecayingFrequencies.SCALE_MIN <= scale <= DecayingFrequencies.SCALE_MAX:
+            self._normalize(current_key)
+        else:
+            self.scale = scale
+        entry = self.entries[current_key]
+        if entry.position >= 0:
+            entry.epoch += 1
+            self._rescale(entry, self._exact(entry))
+        self._move_underflowed()
 
-def simulate(cpu_operations, cache_type, cache_capacity, output_filename):
+    def pop_min(self):
+        if self.underflow:
+            return self.entries.pop(self.underflow.pop())
+        candidates = self._entries_below(self.heap[0].count * self.orbit.slack)
+        if len(candidates) == 1:
+            entry = candidates[0]
+        else:
+            entry = min(candidates, key=lambda entry: (self._exact(entry), entry.key))
+        self._remove_heap(entry)
+        del self.entries[entry.key]
+        return entry
+
+    def remove(self, key):
+        entry = self.entries.pop(key)
+        if entry.position < 0:
+            self.underflow.remove(key)
+        else:
+            self._remove_heap(entry)
+        return entry.value
+
+    def _exact(self, entry):
+        steps = self.orbit.epoch - entry.epoch
+        if not steps:
+            return entry.base
+        count = self.orbit.value(entry.base, steps)
+        if entry.base != 1 or steps >= DecayOrbit.TABLE_LIMIT:
+            entry.base = count
+            entry.epoch = self.orbit.epoch
+        return count
+
+    def _anchor(self, entry, count):
+        entry.base = count
+        entry.epoch = self.orbit.epoch
+        self._rescale(entry, count)
+
+    def _rescale(self, entry, count):
+        old_count = entry.count
+        entry.count = count / self.scale
+        if entry.position < 0:
+            self._push(entry)
+        elif entry.count < old_count:
+            self._sift_up(entry.position)
+        else:
+            self._sift_down(entry.position)
+
+    def _move_underflowed(self):
+        limit = DecayingFrequencies.NORMAL_MIN * self.orbit.slack / self.scale
+        if not self.heap or self.heap[0].count >= limit:
+            return
+        for entry in self._entries_below(limit):
+            count = self._exact(entry)
+            if count < DecayingFrequencies.NORMAL_MIN:
+                self._remove_heap(entry)
+                entry.position = -1
+                self.underflow.push(entry.key, count)
+
+    def _entries_below(self, limit):
+        heap = self.heap
+        entries = []
+        stack = [0]
+        while stack:
+            index = stack.pop()
+            if index < len(heap) and heap[index].count <= limit:
+                entries.append(heap[index])
+                stack.append(2 * index + 1)
+                stack.append(2 * index + 2)
+        return entries
+
+    def _push(self, entry):
+        entry.position = len(self.heap)
+        self.heap.append(entry)
+        self._sift_up(entry.position)
+
+    def _remove_heap(self, entry):
+        heap = self.heap
+        last = heap.pop()
+        if last is not entry:
+            heap[entry.position] = last
+            last.position = entry.position
+            self._sift_up(last.position)
+            self._sift_down(last.position)
+
+    def _normalize(self, current_key):
+        for entry in self.heap:
+            entry.count *= self.scale
+            if entry.key != current_key:
+                entry.count *= self.decay_factor
+        self.scale = 1.0
+        self.heap.sort(key=lambda entry: (entry.count, entry.key))
+        for position, entry in enumerate(self.heap):
+            entry.position = position
+
+    def _sift_up(self, index):
+        heap = self.heap
+        entry = heap[index]
+        count = entry.count
+        key = entry.key
+        while index > 0:
+            parent = (index - 1) >> 1
+            other = heap[parent]
+            if not (count < other.count or count == other.count and key < other.key):
+                break
+            heap[index] = other
+            other.position = index
+            index = parent
+        heap[index] = entry
+        entry.position = index
+
+    def _sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        count = entry.count
+        key = entry.key
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            smaller = heap[child]
+            if child + 1 < size:
+                right = heap[child + 1]
+                if right.count < smaller.count or right.count == smaller.count and right.key < smaller.key:
+                    child += 1
+                    smaller = right
+            if not (smaller.count < count or smaller.count == count and smaller.key < key):
+                break
+            heap[index] = smaller
+            smaller.position = index
+            index = child
+        heap[index] = entry
+        entry.position = index
+
+class EntryView:
+    # Stands in for the OrderedDict the loops read as cache.cache: len, membership and the printed contents
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def items(self):
+        return ((key, entry.value) for key, entry in self.entries.items())
+
+    def __repr__(self):
+        return repr(OrderedDict(self.items()))
+
+class CompactAdaptiveFIFOCache:
+    # AdaptiveFIFOCache on merged per-key records
+    def __init__(self, capacity, decay_factor=0.5):
+        self.capacity = capacity
+        self.frequency = DecayingEntries(decay_factor)
+        self.cache = EntryView(self.frequency.entries)
+        self.decay_factor = decay_factor
+
+    def get(self, key):
+        entry = self.frequency.entries.get(key)
+        return -1 if entry is None else entry.value
+
+    def put(self, key, value):
+        evicted = None
+        if self.capacity > 0:
+            entry = self.frequency.entries.get(key)
+            if entry is not None:
+                entry.value = value
+                self.decay_frequencies(key)
+            else:
+                if len(self.frequency) >= self.capacity:
+                    victim = self.frequency.pop_min()
+                    evicted = victim.key, victim.value
+                self.frequency.add(key, value)
+        return evicted
+
+    def remove(self, key):
+        if key not in self.frequency:
+            return -1
+        return self.frequency.remove(key)
+
+    def decay_frequencies(self, current_key):
+        self.frequency.decay_except(current_key)
+
+class CompactAdaptiveLRUCache:
+    # AdaptiveLRUCache on merged per-key records
+    def __init__(self, capacity, decay_factor=0.5):
+        self.capacity = capacity
+        self.frequency = DecayingEntries(decay_factor)
+        self.cache = EntryView(self.frequency.entries)
+        self.decay_factor = decay_factor
+
+    def get(self, key):
+        entry = self.frequency.entries.get(key)
+        if entry is None:
+            return -1
+        self.frequency.increment(entry)
+        self.frequency.move_to_end(entry)
+        return entry.value
+
+    def put(self, key, value):
+        evicted = None
+        if self.capacity > 0:
+            entry = self.frequency.entries.get(key)
+            if entry is not None:
+                entry.value = value
+                self.frequency.increment(entry)
+                self.frequency.move_to_end(entry)
+                self.decay_frequencies(key)
+            else:
+                if len(self.frequency) >= self.capacity:
+                    victim = self.frequency.pop_min()
+                    evicted = victim.key, victim.value
+                self.frequency.add(key, value)
+        return evicted
+
+    def remove(self, key):
+        if key not in self.frequency:
+            return -1
+        return self.frequency.remove(key)
+
+    def decay_frequencies(self, current_key):
+        self.frequency.decay_except(current_key)
+
+class CompactAdaptiveLFUCache:
+    # AdaptiveLFUCache on merged per-key records
+    def __init__(self, capacity, decay_factor=0.5):
+        self.capacity = capacity
+        self.frequency = DecayingEntries(decay_factor)
+        self.cache = EntryView(self.frequency.entries)
+        self.decay_factor = decay_factor
+
+    def get(self, key):
+        entry = self.frequency.entries.get(key)
+        if entry is None:
+            return -1
+        self.frequency.increment(entry)
+        self.frequency.move_to_end(entry)
+        return entry.value
+
+    def put(self, key, value):
+        evicted = None
+        if self.capacity > 0:
+            entry = self.frequency.entries.get(key)
+            if entry is not None:
+                entry.value = value
+                self.frequency.increment(entry)
+                self.frequency.move_to_end(entry)
+                self.decay_frequencies(key)
+            else:
+                if len(self.frequency) >= self.capacity:
+                    victim = self.frequency.pop_min()
+                    evicted = victim.key, victim.value
+                self.frequency.add(key, value)
+        return evicted
+
+    def remove(self, key):
+        if key not in self.frequency:
+            return -1
+        return self.frequency.remove(key)
+
+    def decay_frequencies(self, current_key):
+        self.frequency.decay_except(current_key)
+
+def create_cache(cache_type, cache_capacity, decay_factor=0.5):
     if cache_type == 'AdaptiveFIFO':
-        cache = AdaptiveFIFOCache(cache_capacity, decay_factor=0.5)
+        return AdaptiveFIFOCache(cache_capacity, decay_factor=decay_factor)
     elif cache_type == 'AdaptiveLRU':
-        cache = AdaptiveLRUCache(cache_capacity, decay_factor=0.5)
+        return AdaptiveLRUCache(cache_capacity, decay_factor=decay_factor)
     elif cache_type == 'AdaptiveLFU':
-        cache = AdaptiveLFUCache(cache_capacity, decay_factor=0.5)
+        return AdaptiveLFUCache(cache_capacity, decay_factor=decay_factor)
+    elif cache_type == 'CompactAdaptiveFIFO':
+        return CompactAdaptiveFIFOCache(cache_capacity, decay_factor=decay_factor)
+    elif cache_type == 'CompactAdaptiveLRU':
+        return CompactAdaptiveLRUCache(cache_capacity, decay_factor=decay_factor)
+    elif cache_type == 'CompactAdaptiveLFU':
+        return CompactAdaptiveLFUCache(cache_capacity, decay_factor=decay_factor)
     else:
-        raise ValueError("Invalid cache type. Choose from 'AdaptiveFIFO', 'AdaptiveLRU', or 'AdaptiveLFU'.")
+        raise ValueError("Invalid cache type. Choose from 'AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU', "
+                         "'CompactAdaptiveFIFO', 'CompactAdaptiveLRU', or 'CompactAdaptiveLFU'.")
+
+def simulate(cpu_operations, cache_type, cache_capacity, output_filename, verbosity=VERBOSITY_PER_OP,
+             decay_factor=0.5):
+    cache = create_cache(cache_type, cache_capacity, decay_factor)
+    per_op = verbosity >= VERBOSITY_PER_OP
 
     results = []
 
     start_time = time.time()
 
-    with open(output_filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
-
+    with open_result_writer(output_filename) as writer:
         for i, operation in enumerate(cpu_operations):
             op_type, *op_args = operation
 
@@ -139,164 +809,387 @@ def simulate(cpu_operations, cache_type, cache_capacity, output_filename):
                 result = cache.get(key)
                 results.append(result)
                 cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, result])
+                if per_op:
+                    print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
+                if writer is not None:
+                    writer.add(i + 1, cache_size, result)
 
             elif op_type == 'put':
                 key, value = op_args
                 cache.put(key, value)
                 cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, 'N/A'])
+                if per_op:
+                    print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
+                if writer is not None:
+                    writer.add(i + 1, cache_size, 'N/A')
 
             elif op_type == 'compute':
                 # Simulate a CPU compute operation (no effect on cache in this example)
-                print(f"Operation {i + 1}: Compute Task Executed")
+                if per_op:
+                    print(f"Operation {i + 1}: Compute Task Executed")
 
-            else:
+            elif per_op:
                 print(f"Operation {i + 1}: Unknown Operation")
 
     end_time = time.time()
     total_execution_time = end_time - start_time
 
-    print("\nCache Simulation Metrics:")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+    if verbosity >= VERBOSITY_SUMMARY:
+        print("\nCache Simulation Metrics:")
+        print(f"Total Execution Time: {total_execution_time:.2f} seconds")
 
     return results
 
-def simulate_sequential(cpu_operations, cache_types, cache_capacity, output_filenames):
+def simulate_sequential(cpu_operations, cache_types, cache_capacity, output_filenames, verbosity=VERBOSITY_PER_OP,
+                        decay_factor=0.5):
     for cache_type, output_filename in zip(cache_types, output_filenames):
-        simulate(cpu_operations, cache_type, cache_capacity, output_filename)
+        simulate(cpu_operations, cache_type, cache_capacity, output_filename, verbosity, decay_factor)
+
+def parallel_backend(cpu_operations, backend, max_workers=None):
+    # Threads share the trace object directly; processes map one shared-memory copy of it
+    if backend == 'thread':
+        return nullcontext(cpu_operations), concurrent.futures.ThreadPoolExecutor(max_workers)
+    elif backend == 'process':
+        return share_trace(cpu_operations), concurrent.futures.ProcessPoolExecutor(max_workers)
+    else:
+        raise ValueError("Invalid backend. Choose from 'thread' or 'process'.")
 
-def simulate_parallel(cpu_operations, cache_types, cache_capacity, output_filenames):
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(simulate, cpu_operations, cache_type, cache_capacity, output_filename)
+def simulate_parallel(cpu_operations, cache_types, cache_capacity, output_filenames, verbosity=VERBOSITY_PER_OP,
+                      backend='thread', max_workers=None, decay_factor=0.5):
+    trace_context, executor = parallel_backend(cpu_operations, backend, max_workers)
+    with trace_context as trace, executor:
+        futures = [executor.submit(simulate, trace, cache_type, cache_capacity, output_filename, verbosity,
+                                   decay_factor)
                    for cache_type, output_filename in zip(cache_types, output_filenames)]
         concurrent.futures.wait(futures)
 
-def simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename):
+def count_operations(cache, operations):
+    # Metrics-only fast path: no output, no per-op formatting, no cache size lookups
     cache_hits = 0
     cache_misses = 0
+    get = cache.get
+    put = cache.put
 
-    if cache_type == 'AdaptiveFIFO':
-        cache = AdaptiveFIFOCache(cache_capacity, decay_factor=0.5)
-    elif cache_type == 'AdaptiveLRU':
-        cache = AdaptiveLRUCache(cache_capacity, decay_factor=0.5)
-    elif cache_type == 'AdaptiveLFU':
-        cache = AdaptiveLFUCache(cache_capacity, decay_factor=0.5)
-    else:
-        raise ValueError("Invalid cache type. Choose from 'AdaptiveFIFO', 'AdaptiveLRU', or 'AdaptiveLFU'.")
+    for op_type, *op_args in operations:
+        if op_type == 'get':
+            if get(op_args[0]) != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
+        elif op_type == 'put':
+            key, value = op_args
+            put(key, value)
 
-    with open(output_filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
+    return cache_hits, cache_misses
 
-        for i, operation in enumerate(cpu_operations):
-            op_type, *op_args = operation
+def run_operations(cache, operations, start, writer=None, verbosity=VERBOSITY_PER_OP, recorder=None):
+    if recorder is not None:
+        return recorder.run_operations(cache, operations, start, writer, verbosity, run_operations)
+    if writer is None and verbosity < VERBOSITY_PER_OP:
+        return count_operations(cache, operations)
 
-            if op_type == 'get':
-                key = op_args[0]
-                result = cache.get(key)
-                cache_size = len(cache.cache)
-                if result != -1:
-                    cache_hits += 1
-                else:
-                    cache_misses += 1
+    per_op = verbosity >= VERBOSITY_PER_OP
+    cache_hits = 0
+    cache_misses = 0
+
+    for i, operation in enumerate(operations, start):
+        op_type, *op_args = operation
+
+        if op_type == 'get':
+            key = op_args[0]
+            result = cache.get(key)
+            cache_size = len(cache.cache)
+            if result != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
 
+            if per_op:
                 print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, result])
+            if writer is not None:
+                writer.add(i + 1, cache_size, result)
 
-            elif op_type == 'put':
-                key, value = op_args
-                cache.put(key, value)
-                cache_size = len(cache.cache)
+        elif op_type == 'put':
+            key, value = op_args
+            cache.put(key, value)
+            cache_size = len(cache.cache)
+            if per_op:
                 print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, 'N/A'])
+            if writer is not None:
+                writer.add(i + 1, cache_size, 'N/A')
 
-            elif op_type == 'compute':
-                # Simulate a CPU compute operation (no effect on cache in this example)
+        elif op_type == 'compute':
+            # Simulate a CPU compute operation (no effect on cache in this example)
+            if per_op:
                 print(f"Operation {i + 1}: Compute Task Executed")
 
+        elif per_op:
+            print(f"Operation {i + 1}: Unknown Operation")
+
+    return cache_hits, cache_misses
+
+def count_compiled_operations(cache, ops, keys, values):
+    # Same as count_operations, on integer opcodes and key ids
+    cache_hits = 0
+    cache_misses = 0
+    get = cache.get
+    put = cache.put
+
+    for op, key, value in zip(ops, keys, values):
+        if op == OP_GET:
+            if get(key) != -1:
+                cache_hits += 1
             else:
-                print(f"Operation {i + 1}: Unknown Operation")
+                cache_misses += 1
+        elif op == OP_PUT:
+            put(key, value)
+
+    return cache_hits, cache_misses
+
+def run_compiled_operations(cache, trace, start, ops, keys, values, writer=None, verbosity=VERBOSITY_PER_OP):
+    if writer is None and verbosity < VERBOSITY_PER_OP:
+        return count_compiled_operations(cache, ops, keys, values)
+
+    per_op = verbosity >= VERBOSITY_PER_OP
+    cache_hits = 0
+    cache_misses = 0
+
+    for i, (op, key, value) in enumerate(zip(ops, keys, values), start):
+        if op == OP_GET:
+            result = cache.get(key)
+            cache_size = len(cache.cache)
+            if result != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
 
-    total_operations = len(cpu_operations)
+            if per_op:
+                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
+            if writer is not None:
+                writer.add(i + 1, cache_size, result)
+
+        elif op == OP_PUT:
+            cache.put(key, value)
+            cache_size = len(cache.cache)
+            if per_op:
+                print(f"Operation {i + 1}: Cache Size: {cache_size}, "
+                      f"Cache Updated: {trace.decode_cache(cache.cache)}")
+            if writer is not None:
+                writer.add(i + 1, cache_size, 'N/A')
+
+        elif op == OP_COMPUTE:
+            # Simulate a CPU compute operation (no effect on cache in this example)
+            if per_op:
+                print(f"Operation {i + 1}: Compute Task Executed")
+
+        elif per_op:
+            print(f"Operation {i + 1}: Unknown Operation")
+
+    return cache_hits, cache_misses
+
+def print_metrics(cache_hits, cache_misses, total_operations, verbosity=VERBOSITY_PER_OP):
     miss_rate = cache_misses / total_operations if total_operations > 0 else 0.0
     hit_rate = cache_hits / total_operations if total_operations > 0 else 0.0
 
+    if verbosity < VERBOSITY_SUMMARY:
+        return miss_rate
+
     print("\nCache Simulation Metrics:")
     print(f"Total Hits: {cache_hits}")
     print(f"Total Misses: {cache_misses}")
     print(f"Miss Rate: {miss_rate * 100:.2f}%")
     print(f"Hit Rate: {hit_rate * 100:.2f}%")
 
+    return miss_rate
+
+def _simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename,
+                           verbosity=VERBOSITY_PER_OP, decay_factor=0.5, result_cache=None, recorder=None):
+    params = {'decay_factor': decay_factor}
+    if result_cache is not None and recorder is None:
+        cached = result_cache.lookup(cpu_operations, cache_type, cache_capacity, params, output_filename)
+        if cached is not None:
+            cache_hits, cache_misses, total_operations = cached
+            miss_rate = print_metrics(cache_hits, cache_misses, total_operations, verbosity)
+            return cache_hits, cache_misses, miss_rate, total_operations
+
+    cache = create_cache(cache_type, cache_capacity, decay_factor)
+    cache_hits = 0
+    cache_misses = 0
+    total_operations = 0
+
+    with open_result_writer(output_filename) as writer:
+        if isinstance(cpu_operations, CompiledTrace) and recorder is None:
+            # A compiled trace replays on integer opcodes and key ids, without touching the operation tuples
+            for start, ops, keys, values in cpu_operations.chunks():
+                hits, misses = run_compiled_operations(cache, cpu_operations, start, ops, keys, values, writer,
+                                                       verbosity)
+                cache_hits += hits
+                cache_misses += misses
+                total_operations += len(ops)
+        else:
+            # Operations are pulled a chunk at a time, so a streamed trace is never fully materialized
+            for chunk in iter_chunks(cpu_operations):
+                hits, misses = run_operations(cache, chunk, total_operations, writer, verbosity, recorder)
+                cache_hits += hits
+                cache_misses += misses
+                total_operations += len(chunk)
+
+    if result_cache is not None:
+        result_cache.store(cpu_operations, cache_type, cache_capacity, params, output_filename, cache_hits,
+                           cache_misses, total_operations)
+
+    miss_rate = print_metrics(cache_hits, cache_misses, total_operations, verbosity)
+
+    return cache_hits, cache_misses, miss_rate, total_operations
+
+def simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename, verbosity=VERBOSITY_PER_OP,
+                          decay_factor=0.5, result_cache=None, recorder=None):
+    cache_hits, cache_misses, miss_rate, _ = _simulate_with_metrics(cpu_operations, cache_type, cache_capacity,
+                                                                     output_filename, verbosity, decay_factor,
+                                                                     result_cache, recorder)
     return cache_hits, cache_misses, miss_rate
 
-def simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames):
+def simulate_shared_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames,
+                                 verbosity=VERBOSITY_PER_OP, decay_factor=0.5):
+    caches = [create_cache(cache_type, cache_capacity, decay_factor) for cache_type in cache_types]
+    cache_hits = [0] * len(caches)
+    cache_misses = [0] * len(caches)
+    total_operations = 0
+
+    with ExitStack() as stack:
+        writers = [stack.enter_context(open_result_writer(output_filename)) for output_filename in output_filenames]
+
+        for chunk in iter_chunks(cpu_operations):
+            for index, (cache, writer) in enumerate(zip(caches, writers)):
+                hits, misses = run_operations(cache, chunk, total_operations, writer, verbosity)
+                cache_hits[index] += hits
+                cache_misses[index] += misses
+            total_operations += len(chunk)
+
+    results = []
+    for cache_type, hits, misses in zip(cache_types, cache_hits, cache_misses):
+        if verbosity >= VERBOSITY_SUMMARY:
+            print(f"\n{cache_type}:")
+        miss_rate = print_metrics(hits, misses, total_operations, verbosity)
+        results.append((hits, misses, miss_rate))
+
+    return results
+
+def print_total_metrics(label, total_hits, total_misses, total_operations, total_execution_time,
+                        verbosity=VERBOSITY_PER_OP):
+    if verbosity < VERBOSITY_SUMMARY:
+        return
+    print(f"\nTotal Metrics ({label}):")
+    print(f"Total Hits: {total_hits}")
+    print(f"Total Misses: {total_misses}")
+    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
+    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
+    print(f"Miss Rate: {miss_rate * 100:.2f}%")
+    print(f"Hit Rate: {hit_rate * 100:.2f}%")
+    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+
+def simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames,
+                                     verbosity=VERBOSITY_PER_OP, result_cache=None, decay_factor=0.5):
     total_hits = 0
     total_misses = 0
+    total_operations = 0
 
     start_time = time.time()
 
     for cache_type, output_filename in zip(cache_types, output_filenames):
-        cache_hits, cache_misses, _ = simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename)
+        cache_hits, cache_misses, _, operations = _simulate_with_metrics(cpu_operations, cache_type, cache_capacity,
+                                                                         output_filename, verbosity, decay_factor,
+                                                                         result_cache)
         total_hits += cache_hits
         total_misses += cache_misses
+        total_operations += operations
 
     end_time = time.time()
     total_execution_time = end_time - start_time
 
-    print("\nTotal Metrics (Sequential):")
-    print(f"Total Hits: {total_hits}")
-    print(f"Total Misses: {total_misses}")
-    total_operations = len(cpu_operations) * len(cache_types)
-    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+    print_total_metrics("Sequential", total_hits, total_misses, total_operations, total_execution_time,
+                        verbosity)
+
+    return total_hits, total_misses, total_execution_time
 
-def simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames):
+def simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames,
+                                   verbosity=VERBOSITY_PER_OP, backend='thread', max_workers=None,
+                                   result_cache=None, decay_factor=0.5):
     total_hits = 0
     total_misses = 0
+    total_operations = 0
 
     start_time = time.time()
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(simulate_with_metrics, cpu_operations, cache_type, cache_capacity, output_filename)
+    trace_context, executor = parallel_backend(cpu_operations, backend, max_workers)
+    with trace_context as trace, executor:
+        if result_cache is not None and trace is not cpu_operations:
+            # Workers reuse the parent's fingerprint instead of rehashing the shared copy
+            trace.fingerprint = result_cache.trace_fingerprint(cpu_operations)
+        futures = [executor.submit(_simulate_with_metrics, trace, cache_type, cache_capacity, output_filename,
+                                   verbosity, decay_factor, result_cache)
                    for cache_type, output_filename in zip(cache_types, output_filenames)]
         concurrent.futures.wait(futures)
 
         for future in futures:
-            cache_hits, cache_misses, _ = future.result()
+            cache_hits, cache_misses, _, operations = future.result()
             total_hits += cache_hits
             total_misses += cache_misses
+            total_operations += operations
 
     end_time = time.time()
     total_execution_time = end_time - start_time
 
-    print("\nTotal Metrics (Parallel):")
-    print(f"Total Hits: {total_hits}")
-    print(f"Total Misses: {total_misses}")
-    total_operations = len(cpu_operations) * len(cache_types)
-    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+    print_total_metrics("Parallel", total_hits, total_misses, total_operations, total_execution_time,
+                        verbosity)
+
+    return total_hits, total_misses, total_execution_time
+
+def measure_parallel_scaling(cpu_operations, cache_types, cache_capacity, worker_counts=None, backend='process',
+                             decay_factor=0.5):
+    # Metrics-only runs, so the timings measure the policies rather than printing and CSV output
+    if worker_counts is None:
+        worker_counts = range(1, min(len(cache_types), os.cpu_count() or 1) + 1)
+
+    scaling = []
+    for workers in worker_counts:
+        _, _, execution_time = simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity,
+                                                              [None] * len(cache_types), VERBOSITY_SILENT,
+                                                              backend, workers, decay_factor=decay_factor)
+        speedup = scaling[0][1] / execution_time if scaling and execution_time > 0 else 1.0
+        scaling.append((workers, execution_time, speedup))
+        print(f"Workers: {workers}, Time: {execution_time:.2f} seconds, Speedup: {speedup:.2f}x")
+
+    return scaling
 
 def main():
-    with open("00_cpu_operations.txt", "r") as file:
-        cpu_operations = [tuple(line.strip().split()) for line in file]
+    parser = argparse.ArgumentParser(description="Simulate the adaptive caches on 00_cpu_operations.txt")
+    parser.add_argument('--decay-factor', type=float, default=0.5)
+    parser.add_argument('--shared', action='store_true',
+                        help="also replay every policy in a single pass over the trace")
+    parser.add_argument('--scaling', action='store_true',
+                        help="also time the process backend at each worker count and report the speedup")
+    args = parser.parse_args()
+
+    cpu_operations = TraceFile("00_cpu_operations.txt")
 
     cache_types = ['AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU']
     cache_capacity = int(input("Enter cache size: "))
 
     output_filenames_sequential = [f'{cache_type}_sequential_results.csv' for cache_type in cache_types]
-    simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_sequential)
+    simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_sequential,
+                                     decay_factor=args.decay_factor)
 
     output_filenames_parallel = [f'{cache_type}_parallel_results.csv' for cache_type in cache_types]
-    simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_parallel)
+    simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_parallel,
+                                   backend='process', decay_factor=args.decay_factor)
+
+    if args.shared:
+        simulate_shared_with_metrics(cpu_operations, cache_types, cache_capacity, [None] * len(cache_types),
+                                     VERBOSITY_SUMMARY, args.decay_factor)
+    if args.scaling:
+        print("\nParallel scaling (process backend):")
+        measure_parallel_scaling(cpu_operations, cache_types, cache_capacity, decay_factor=args.decay_factor)
 
 if __name__ == "__main__":
     main()
@@ -1,290 +1,163 @@
 import csv
-import concurrent.futures
-import cupy as cp
-from collections import OrderedDict
+import importlib
+import sys
 import time
 
-class AdaptiveFIFOCache:
-    def _init_(self, capacity, decay_factor=0.5):
-        self.capacity = capacity
-        self.cache = OrderedDict()
-        self.frequency = {}
-        self.decay_factor = decay_factor
-
-    def get(self, key):
-        return self.cache.get(key, -1)
-
-    def put(self, key, value):
-        if self.capacity > 0:
-            if key in self.cache:
-                # Update value and decay frequencies
-                self.cache[key] = value
-                self.decay_frequencies(key)
-            else:
-                # Check and remove the least frequently used item if at capacity
-                if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
-                # Add new item and set initial frequency to 1
-                self.cache[key] = value
-                self.frequency[key] = 1
-
-    def decay_frequencies(self, current_key):
-        for key in self.frequency:
-            if key != current_key:
-                self.frequency[key] *= self.decay_factor
-
-class AdaptiveLRUCache:
-    def _init_(self, capacity, decay_factor=0.5):
-        self.capacity = capacity
-        self.cache = OrderedDict()
-        self.frequency = {}
-        self.decay_factor = decay_factor
-
-    def get(self, key):
-        if key in self.cache:
-            self.frequency[key] += 1
-            self.cache.move_to_end(key)
-            return self.cache[key]
-        return -1
-
-    def put(self, key, value):
-        if self.capacity > 0:
-            if key in self.cache:
-                self.cache[key] = value
-                self.frequency[key] += 1
-                self.cache.move_to_end(key)
-                self.decay_frequencies(key)
-            else:
-                if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
-                self.cache[key] = value
-                self.frequency[key] = 1
-
-    def decay_frequencies(self, current_key):
-        for key in self.frequency:
-            if key != current_key:
-                self.frequency[key] *= self.decay_factor
-
-class AdaptiveLFUCache:
-    def _init_(self, capacity, decay_factor=0.5):
-        self.capacity = capacity
-        self.cache = OrderedDict()
-        self.frequency = {}
-        self.decay_factor = decay_factor
-
-    def get(self, key):
-        if key in self.cache:
-            self.frequency[key] += 1
-            self.cache.move_to_end(key)
-            return self.cache[key]
-        return -1
-
-    def put(self, key, value):
-        if self.capacity > 0:
-            if key in self.cache:
-                self.cache[key] = value
-                self.frequency[key] += 1
-                self.cache.move_to_end(key)
-                self.decay_frequencies(key)
-            else:
-                if len(self.cache) >= self.capacity:
-                    min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
-                    del self.cache[min_key]
-                    del self.frequency[min_key]
-                self.cache[key] = value
-                self.frequency[key] = 1
-
-    def decay_frequencies(self, current_key):
-        for key in self.frequency:
-            if key != current_key:
-                self.frequency[key] *= self.decay_factor
-
-def simulate(cpu_operations, cache_type, cache_capacity, output_filename):
-    if cache_type == 'AdaptiveFIFO':
-        cache = AdaptiveFIFOCache(cache_capacity, decay_factor=0.5)
-    elif cache_type == 'AdaptiveLRU':
-        cache = AdaptiveLRUCache(cache_capacity, decay_factor=0.5)
-    elif cache_type == 'AdaptiveLFU':
-        cache = AdaptiveLFUCache(cache_capacity, decay_factor=0.5)
-    else:
-        raise ValueError("Invalid cache type. Choose from 'AdaptiveFIFO', 'AdaptiveLRU', or 'AdaptiveLFU'.")
-
+import numpy as np
+
+from result_io import VERBOSITY_SILENT
+from trace_io import OP_GET, OP_PUT, TraceFile, compile_trace
+
+POLICY_FIFO = 0
+POLICY_LRU = 1
+POLICY_CODES = {'FIFO': POLICY_FIFO, 'LRU': POLICY_LRU}
+# Trace positions inspected per vectorized step when looking for eviction victims
+VICTIM_SCAN_WINDOW = 64
+# Upper bound on the stamps array; configurations beyond it are replayed in further batches
+BATCH_MEMORY_BYTES = 256 << 20
+
+def compile_operations(cpu_operations):
+    # Dense key ids let per-config state live in [config, key] arrays; non-key operations get -1
+    trace = compile_trace(cpu_operations)
+    return np.array(trace.ops, dtype=np.uint8), np.array(trace.keys, dtype=np.int64), len(trace.key_names)
+
+class BatchedCacheEngine:
+    # One trace replayed against many FIFO/LRU configurations in lockstep. Every configuration is a row;
+    # stamps[c, k] is the trace position that last ordered key k in configuration c (insertion for FIFO,
+    # last use for LRU) or -1 when k is not resident. The victim of a configuration is its resident key with
+    # the smallest stamp, found by scanning forward from a per-configuration head over the trace itself.
+    # The stamps take configs * key_count * 4 or 8 bytes (e.g. 100 configurations over 4M keys is 1.6 GB),
+    # which simulate_batched keeps under BATCH_MEMORY_BYTES. The per-operation loop still runs in Python:
+    # only the work across configurations is vectorized, so the speedup over the cache classes grows with
+    # the number of configurations and a single configuration is slower than its class.
+    def __init__(self, policies, capacities, key_count, trace_keys):
+        self.policies = np.array([POLICY_CODES[policy] for policy in policies], dtype=np.int8)
+        self.capacities = np.array(capacities, dtype=np.int64)
+        if np.any(self.capacities < 1):
+            raise ValueError("Batched simulation needs capacities of at least 1.")
+        configs = len(self.capacities)
+        self.is_lru = self.policies == POLICY_LRU
+        self.trace_keys = trace_keys
+        self.stamps = np.full((configs, max(key_count, 1)), -1, dtype=stamp_dtype(len(trace_keys)))
+        self.sizes = np.zeros(configs, dtype=np.int64)
+        self.heads = np.zeros(configs, dtype=np.int64)
+        self.hits = np.zeros(configs, dtype=np.int64)
+        self.misses = np.zeros(configs, dtype=np.int64)
+        self.rows = np.arange(configs)
+
+    def get(self, position, key):
+        present = self.stamps[:, key] >= 0
+        self.hits += present
+        self.misses += ~present
+        self.stamps[present & self.is_lru, key] = position
+
+    def put(self, position, key):
+        present = self.stamps[:, key] >= 0
+        self.stamps[present & self.is_lru, key] = position
+        absent = ~present
+        evicting = self.rows[absent & (self.sizes >= self.capacities)]
+        if evicting.size:
+            self._evict(evicting, position)
+        self.sizes += absent & (self.sizes < self.capacities)
+        self.stamps[absent, key] = position
+
+    def _evict(self, rows, position):
+        offsets = np.arange(VICTIM_SCAN_WINDOW)
+        while rows.size:
+            window = self.heads[rows, None] + offsets
+            in_range = window < position
+            window = np.minimum(window, position - 1)
+            keys = self.trace_keys[window]
+            valid = in_range & (keys >= 0)
+            valid &= self.stamps[rows[:, None], np.maximum(keys, 0)] == window
+            found = valid.any(axis=1)
+            first = valid.argmax(axis=1)
+
+            done = rows[found]
+            victim_positions = window[found, first[found]]
+            self.stamps[done, self.trace_keys[victim_positions]] = -1
+            self.heads[done] = victim_positions + 1
+
+            self.heads[rows[~found]] += VICTIM_SCAN_WINDOW
+            rows = rows[~found]
+
+def stamp_dtype(total_operations):
+    # Stamps are trace positions, so short traces halve the state with 32-bit stamps
+    return np.int32 if total_operations < np.iinfo(np.int32).max else np.int64
+
+def configs_per_batch(key_count, total_operations, memory_bytes=BATCH_MEMORY_BYTES):
+    # At least one configuration per batch, even when a single row is over the budget
+    row_bytes = max(key_count, 1) * np.dtype(stamp_dtype(total_operations)).itemsize
+    return max(memory_bytes // row_bytes, 1)
+
+def replay_batch(ops, keys, key_count, policies, capacities):
+    engine = BatchedCacheEngine(policies, capacities, key_count, keys)
+    get = engine.get
+    put = engine.put
+    for position, (op, key) in enumerate(zip(ops.tolist(), keys.tolist())):
+        if op == OP_GET:
+            get(position, key)
+        elif op == OP_PUT:
+            put(position, key)
+    return engine.hits.tolist(), engine.misses.tolist()
+
+def simulate_batched(cpu_operations, policies, capacities, memory_bytes=BATCH_MEMORY_BYTES):
+    ops, keys, key_count = compile_operations(cpu_operations)
+    total_operations = len(ops)
+    # Each batch replays the whole trace, so a larger budget means fewer passes
+    batch_size = configs_per_batch(key_count, total_operations, memory_bytes)
     results = []
-
-    start_time = time.time()
-
-    with open(output_filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
-
-        for i, operation in enumerate(cpu_operations):
-            op_type, *op_args = operation
-
-            if op_type == 'get':
-                key = op_args[0]
-                result = cache.get(key)
-                results.append(result)
-                cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, result])
-
-            elif op_type == 'put':
-                key, value = op_args
-                cache.put(key, value)
-                cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, 'N/A'])
-
-            elif op_type == 'compute':
-                print(f"Operation {i + 1}: Compute Task Executed")
-
-            else:
-                print(f"Operation {i + 1}: Unknown Operation")
-
-    end_time = time.time()
-    total_execution_time = end_time - start_time
-
-    print("\nCache Simulation Metrics:")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
-
+    for start in range(0, len(capacities), batch_size):
+        batch_policies = policies[start:start + batch_size]
+        batch_capacities = capacities[start:start + batch_size]
+        batch_hits, batch_misses = replay_batch(ops, keys, key_count, batch_policies, batch_capacities)
+        for policy, capacity, hits, misses in zip(batch_policies, batch_capacities, batch_hits, batch_misses):
+            miss_rate = misses / total_operations if total_operations > 0 else 0.0
+            results.append((policy, capacity, hits, misses, miss_rate))
     return results
 
-def simulate_sequential(cpu_operations, cache_types, cache_capacity, output_filenames):
-    for cache_type, output_filename in zip(cache_types, output_filenames):
-        simulate(cpu_operations, cache_type, cache_capacity, output_filename)
-
-def simulate_parallel(cpu_operations, cache_types, cache_capacity, output_filenames):
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(simulate, cpu_operations, cache_type, cache_capacity, output_filename)
-                   for cache_type, output_filename in zip(cache_types, output_filenames)]
-        concurrent.futures.wait(futures)
-
-def simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename):
-    cache_hits = 0
-    cache_misses = 0
+def cross_check(cpu_operations, results):
+    # Replays the matching single-configuration cache class and returns the configurations that disagree
+    cache_simulation = importlib.import_module('01_cache_simulation')
+    mismatches = []
+    for policy, capacity, hits, misses, _ in results:
+        cache_hits, cache_misses, _ = cache_simulation.simulate_with_metrics(cpu_operations, policy, capacity, None,
+                                                                             VERBOSITY_SILENT)
+        if (cache_hits, cache_misses) != (hits, misses):
+            mismatches.append((policy, capacity, (hits, misses), (cache_hits, cache_misses)))
+    return mismatches
+
+def parse_capacities(text):
+    # "10,20,50-60" -> [10, 20, 50, 51, ..., 60]
+    capacities = []
+    for part in text.split(','):
+        if '-' in part:
+            start, stop = part.split('-')
+            capacities.extend(range(int(start), int(stop) + 1))
+        else:
+            capacities.append(int(part))
+    return capacities
 
-    if cache_type == 'AdaptiveFIFO':
-        cache = AdaptiveFIFOCache(cache_capacity, decay_factor=0.5)
-    elif cache_type == 'AdaptiveLRU':
-        cache = AdaptiveLRUCache(cache_capacity, decay_factor=0.5)
-    elif cache_type == 'AdaptiveLFU':
-        cache = AdaptiveLFUCache(cache_capacity, decay_factor=0.5)
-    else:
-        raise ValueError("Invalid cache type. Choose from 'AdaptiveFIFO', 'AdaptiveLRU', or 'AdaptiveLFU'.")
-
-    with open(output_filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
-
-        for i, operation in enumerate(cpu_operations):
-            op_type, *op_args = operation
-
-            if op_type == 'get':
-                key = op_args[0]
-                result = cache.get(key)
-                cache_size = len(cache.cache)
-                if result != -1:
-                    cache_hits += 1
-                else:
-                    cache_misses += 1
-
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, result])
-
-            elif op_type == 'put':
-                key, value = op_args
-                cache.put(key, value)
-                cache_size = len(cache.cache)
-                print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
-                csvwriter.writerow([f'Operation {i + 1}', cache_size, 'N/A'])
-
-            elif op_type == 'compute':
-                print(f"Operation {i + 1}: Compute Task Executed")
-
-            else:
-                print(f"Operation {i + 1}: Unknown Operation")
-
-    total_operations = len(cpu_operations)
-    miss_rate = cache_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = cache_hits / total_operations if total_operations > 0 else 0.0
-
-    print("\nCache Simulation Metrics:")
-    print(f"Total Hits: {cache_hits}")
-    print(f"Total Misses: {cache_misses}")
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-
-    return cache_hits, cache_misses, miss_rate
-
-def simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames):
-    total_hits = 0
-    total_misses = 0
-
-    start_time = time.time()
-
-    for cache_type, output_filename in zip(cache_types, output_filenames):
-        cache_hits, cache_misses, _ = simulate_with_metrics(cpu_operations, cache_type, cache_capacity, output_filename)
-        total_hits += cache_hits
-        total_misses += cache_misses
-
-    end_time = time.time()
-    total_execution_time = end_time - start_time
-
-    print("\nTotal Metrics (Sequential):")
-    print(f"Total Hits: {total_hits}")
-    print(f"Total Misses: {total_misses}")
-    total_operations = len(cpu_operations) * len(cache_types)
-    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
+def main():
+    trace_filename = sys.argv[1] if len(sys.argv) > 1 else "00_cpu_operations.txt"
+    cpu_operations = list(TraceFile(trace_filename))
 
-def simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames):
-    total_hits = 0
-    total_misses = 0
+    capacities = parse_capacities(input("Enter cache sizes (e.g. 10,20,50-100): "))
+    policies = [policy for policy in POLICY_CODES for _ in capacities]
+    capacities = capacities * len(POLICY_CODES)
 
     start_time = time.time()
+    results = simulate_batched(cpu_operations, policies, capacities)
+    total_execution_time = time.time() - start_time
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(simulate_with_metrics, cpu_operations, cache_type, cache_capacity, output_filename)
-                   for cache_type, output_filename in zip(cache_types, output_filenames)]
-        concurrent.futures.wait(futures)
-
-        for future in futures:
-            cache_hits, cache_misses, _ = future.result()
-            total_hits += cache_hits
-            total_misses += cache_misses
-
-    end_time = time.time()
-    total_execution_time = end_time - start_time
-
-    print("\nTotal Metrics (Parallel):")
-    print(f"Total Hits: {total_hits}")
-    print(f"Total Misses: {total_misses}")
-    total_operations = len(cpu_operations) * len(cache_types)
-    miss_rate = total_misses / total_operations if total_operations > 0 else 0.0
-    hit_rate = total_hits / total_operations if total_operations > 0 else 0.0
-    print(f"Miss Rate: {miss_rate * 100:.2f}%")
-    print(f"Hit Rate: {hit_rate * 100:.2f}%")
-    print(f"Total Execution Time: {total_execution_time:.2f} seconds")
-
-def main():
-    with open("cpu_operations.txt", "r") as file:
-        cpu_operations = [tuple(line.strip().split()) for line in file]
-
-    cache_types = ['AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU']
-    cache_capacity = int(input("Enter cache size: "))
-
-    output_filenames_sequential = [f'{cache_type}_sequential_results.csv' for cache_type in cache_types]
-    simulate_sequential_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_sequential)
+    with open('batched_results.csv', 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(['Policy', 'Capacity', 'Hits', 'Misses', 'Miss Rate'])
+        for policy, capacity, hits, misses, miss_rate in results:
+            csvwriter.writerow([policy, capacity, hits, misses, f'{miss_rate:.6f}'])
+            print(f"{policy} {capacity}: Hits: {hits}, Misses: {misses}, Miss Rate: {miss_rate * 100:.2f}%")
 
-    output_filenames_parallel = [f'{cache_type}_parallel_results.csv' for cache_type in cache_types]
-    simulate_parallel_with_metrics(cpu_operations, cache_types, cache_capacity, output_filenames_parallel)
+    print(f"\n{len(results)} configurations, Total Execution Time: {total_execution_time:.2f} seconds")
 
-if _name_ == "_main_":
-    main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+from sweep import ONLINE_POLICIES, POLICY_MODULES, create_policy_cache
+from trace_io import TraceFile, compile_trace, iter_chunks
+from workload import WorkloadGenerator
+
+BENCHMARK_BASELINE = 'benchmark_baseline.json'
+BENCHMARK_WORKLOADS = ('zipf', 'uniform', 'scan')
+BENCHMARK_CAPACITIES = (100, 10_000)
+BENCHMARK_OPERATIONS = 200_000
+BENCHMARK_REPEATS = 5
+# A hot path may get this much slower (as a fraction) before the gate fails
+REGRESSION_THRESHOLD = 0.10
+# Compared by --hit-path unless --policies says otherwise
+HIT_PATH_POLICIES = ('LRU', 'FIFO', 'CLOCK', 'S3FIFO')
+
+def benchmark_keys(workload, operations, key_space, seed=0):
+    generator = WorkloadGenerator(workload, operations, key_space, seed, get_ratio=1, put_ratio=0, compute_ratio=0)
+    return [key for batch in generator.batches() for key in batch['key'].tolist()]
+
+def time_puts(policy, capacity, keys):
+    cache = create_policy_cache(policy, capacity)
+    put = cache.put
+    start = time.perf_counter_ns()
+    for key in keys:
+        put(key, key)
+    return time.perf_counter_ns() - start
+
+def time_gets(policy, capacity, keys):
+    # The cache is warmed with the same keys first, so gets see the workload's steady-state hit ratio
+    cache = create_policy_cache(policy, capacity)
+    for key in keys:
+        cache.put(key, key)
+    get = cache.get
+    start = time.perf_counter_ns()
+    for key in keys:
+        get(key)
+    return time.perf_counter_ns() - start
+
+def run_benchmarks(policies=tuple(ONLINE_POLICIES), workloads=BENCHMARK_WORKLOADS, capacities=BENCHMARK_CAPACITIES,
+                   operations=BENCHMARK_OPERATIONS, repeats=BENCHMARK_REPEATS):
+    results = {}
+    for workload in workloads:
+        for capacity in capacities:
+            # Twice as many keys as slots, so every capacity keeps evicting
+            keys = benchmark_keys(workload, operations, capacity * 2)
+            for policy in policies:
+                for operation, timer in (('put', time_puts), ('get', time_gets)):
+                    # Best of several runs, which filters out scheduling noise better than the mean
+                    elapsed = min(timer(policy, capacity, keys) for _ in range(repeats))
+                    ns_per_op = elapsed / len(keys)
+                    name = f'{policy}/{workload}/{capacity}/{operation}'
+                    results[name] = ns_per_op
+                    print(f"{name:<36}{ns_per_op:>10.1f} ns/op{1e9 / ns_per_op:>14,.0f} ops/sec")
+    return results
+
+def time_string_replay(module, cache, operations):
+    start = time.perf_counter_ns()
+    for chunk in iter_chunks(operations):
+        module.count_operations(cache, chunk)
+    return time.perf_counter_ns() - start
+
+def time_compiled_replay(module, cache, trace):
+    start = time.perf_counter_ns()
+    for _, ops, keys, values in trace.chunks():
+        module.count_compiled_operations(cache, ops, keys, values)
+    return time.perf_counter_ns() - start
+
+def compare_trace_paths(trace_filename, capacities=BENCHMARK_CAPACITIES, policies=tuple(ONLINE_POLICIES),
+                        repeats=BENCHMARK_REPEATS):
+    # Replays a real trace as string tuples and as a compiled trace; parsing and compiling are not timed
+    operations = list(TraceFile(trace_filename))
+    start = time.perf_counter_ns()
+    trace = compile_trace(operations)
+    compile_time = time.perf_counter_ns() - start
+    print(f"Compiled {len(trace)} operations ({len(trace.key_names)} keys) in {compile_time / 1e9:.2f} seconds")
+
+    key_names = trace.key_names
+    speedups = {}
+    for capacity in capacities:
+        for policy in policies:
+            module = importlib.import_module(POLICY_MODULES[policy])
+            string_time = min(time_string_replay(module, create_policy_cache(policy, capacity), operations)
+                              for _ in range(repeats))
+            compiled_time = min(
+                time_compiled_replay(module, create_policy_cache(policy, capacity, key_names=key_names), trace)
+                for _ in range(repeats))
+            speedup = string_time / compiled_time if compiled_time > 0 else 0.0
+            speedups[f'{policy}/{capacity}'] = speedup
+            print(f"{policy + '/' + str(capacity):<24}{string_time / len(trace):>10.1f} ns/op strings"
+                  f"{compiled_time / len(trace):>10.1f} ns/op compiled{speedup:>8.2f}x")
+    return speedups
+
+def time_hit_path(cache, hit_keys, rounds):
+    get = cache.get
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for key in hit_keys:
+            get(key)
+    return time.perf_counter_ns() - start
+
+def compare_hit_paths(trace_filename, capacities=BENCHMARK_CAPACITIES, policies=HIT_PATH_POLICIES,
+                      repeats=BENCHMARK_REPEATS):
+    # Replays the trace, then times gets on the keys left resident: the pure hit path, which for the
+    # reference-bit policies is one index lookup and one byte store instead of a list reordering
+    trace = compile_trace(TraceFile(trace_filename))
+    print(f"{'Policy':<20}{'Miss Rate':>10}{'Replay ns/op':>14}{'Hit ns/op':>12}{'Hits/sec':>14}")
+    results = {}
+    for capacity in capacities:
+        for policy in policies:
+            module = importlib.import_module(POLICY_MODULES[policy])
+            best_replay = None
+            for _ in range(repeats):
+                cache = create_policy_cache(policy, capacity, key_names=trace.key_names)
+                start = time.perf_counter_ns()
+                cache_misses = 0
+                for _, ops, keys, values in trace.chunks():
+                    cache_misses += module.count_compiled_operations(cache, ops, keys, values)[1]
+                elapsed = time.perf_counter_ns() - start
+                best_replay = elapsed if best_replay is None else min(best_replay, elapsed)
+
+            hit_keys = list(cache.cache)
+            if not hit_keys:
+                continue
+            rounds = max(len(trace) // len(hit_keys), 1)
+            hit_time = min(time_hit_path(cache, hit_keys, rounds) for _ in range(repeats))
+            hit_ns = hit_time / (rounds * len(hit_keys))
+            replay_ns = best_replay / len(trace)
+            miss_rate = cache_misses / len(trace)
+            results[f'{policy}/{capacity}'] = (miss_rate, replay_ns, hit_ns)
+            print(f"{policy + '/' + str(capacity):<20}{miss_rate * 100:>9.2f}%{replay_ns:>14.1f}{hit_ns:>12.1f}"
+                  f"{1e9 / hit_ns:>14,.0f}")
+    return results
+
+def save_baseline(results, baseline_filename):
+    baseline = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    with open(baseline_filename, 'w') as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+
+def compare_to_baseline(results, baseline_filename, threshold=REGRESSION_THRESHOLD):
+    with open(baseline_filename) as file:
+        baseline = json.load(file)['results']
+
+    regressions = []
+    for name, ns_per_op in results.items():
+        if name not in baseline:
+            continue
+        change = ns_per_op / baseline[name] - 1
+        status = 'REGRESSION' if change > threshold else 'ok'
+        print(f"{name:<36}{baseline[name]:>10.1f} -> {ns_per_op:>8.1f} ns/op {change * 100:>+7.1f}%  {status}")
+        if change > threshold:
+            regressions.append((name, baseline[name], ns_per_op))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get/put throughput of every cache class")
+    parser.add_argument('--baseline', default=BENCHMARK_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown as a fraction before failing (default: %(default)s)")
+    parser.add_argument('--policies', nargs='+', choices=ONLINE_POLICIES,
+                        help="default: every policy, or LRU FIFO CLOCK S3FIFO with --hit-path")
+    parser.add_argument('--workloads', nargs='+', default=list(BENCHMARK_WORKLOADS))
+    parser.add_argument('--capacities', nargs='+', type=int, default=list(BENCHMARK_CAPACITIES))
+    parser.add_argument('--operations', type=int, default=BENCHMARK_OPERATIONS)
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS)
+    parser.add_argument('--compare-trace', metavar='TRACE',
+                        help="instead, time string against compiled replay of this text trace")
+    parser.add_argument('--hit-path', metavar='TRACE',
+                        help="instead, replay this text trace and time gets on the keys left resident")
+    args = parser.parse_args()
+
+    if args.hit_path:
+        compare_hit_paths(args.hit_path, args.capacities, args.policies or HIT_PATH_POLICIES, args.repeats)
+        return
+
+    policies = args.policies or ONLINE_POLICIES
+    if args.compare_trace:
+        compare_trace_paths(args.compare_trace, args.capacities, policies, args.repeats)
+        return
+
+    results = run_benchmarks(policies, args.workloads, args.capacities, args.operations, args.repeats)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        # Timings are machine-specific, so no baseline is committed; each machine records its own
+        print(f"\nNo baseline at {args.baseline}, skipping the regression check. "
+              f"Run with --save-baseline to record one.")
+        return
+
+    print(f"\nComparing against {args.baseline} (threshold {args.threshold * 100:.0f}%):")
+    regressions = compare_to_baseline(results, args.baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} hot paths regressed by more than {args.threshold * 100:.0f}%")
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
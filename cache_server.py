@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import os
+import time
+
+from latency import LatencyHistogram
+from sweep import ONLINE_POLICIES, create_policy_cache
+from trace_io import TraceFile
+
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 11311
+LOAD_CONNECTIONS = 4
+# Requests a connection may have in flight before the client waits for responses
+LOAD_PIPELINE_DEPTH = 64
+
+class CacheServer:
+    # A subset of the memcached text protocol: get (one or more keys), set, stats and quit. Keys and values
+    # are stored as str, so a served trace behaves exactly like a replayed text trace.
+    def __init__(self, cache):
+        self.cache = cache
+        self.service_times = LatencyHistogram()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.connections = 0
+        self.start_time = time.perf_counter()
+
+    async def handle_client(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.split()
+                if not parts:
+                    continue
+                command = parts[0]
+                start = time.perf_counter_ns()
+
+                if command == b'get' and len(parts) > 1:
+                    response = []
+                    for key in parts[1:]:
+                        value = self.cache.get(key.decode())
+                        if value != -1:
+                            self.hits += 1
+                            data = str(value).encode()
+                            response.append(b'VALUE %s 0 %d\r\n%s\r\n' % (key, len(data), data))
+                        else:
+                            self.misses += 1
+                    response.append(b'END\r\n')
+                    writer.write(b''.join(response))
+                elif command == b'set' and len(parts) >= 5:
+                    data = await reader.readexactly(int(parts[4]) + 2)
+                    # The payload read is network time, not cache time
+                    start = time.perf_counter_ns()
+                    self.cache.put(parts[1].decode(), data[:-2].decode())
+                    if parts[-1] != b'noreply':
+                        writer.write(b'STORED\r\n')
+                elif command == b'stats':
+                    writer.write(self.stats_response())
+                elif command == b'quit':
+                    break
+                else:
+                    writer.write(b'ERROR\r\n')
+
+                self.service_times.record(time.perf_counter_ns() - start)
+                self.requests += 1
+                # Returns at once unless the client is not reading; pipelined responses batch up meanwhile
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def stats(self):
+        uptime = time.perf_counter() - self.start_time
+        return {
+            'uptime': f'{uptime:.3f}',
+            'requests': self.requests,
+            'requests_per_sec': f'{self.requests / uptime:.0f}' if uptime > 0 else '0',
+            'get_hits': self.hits,
+            'get_misses': self.misses,
+            'curr_items': len(self.cache.cache),
+            'curr_connections': self.connections,
+            'service_p50_ns': self.service_times.percentile(50),
+            'service_p99_ns': self.service_times.percentile(99),
+            'service_max_ns': self.service_times.max,
+        }
+
+    def stats_response(self):
+        lines = [f'STAT {name} {value}\r\n' for name, value in self.stats().items()]
+        return (''.join(lines) + 'END\r\n').encode()
+
+async def start_server(server, host=SERVER_HOST, port=SERVER_PORT, unix_path=None):
+    if unix_path is not None:
+        return await asyncio.start_unix_server(server.handle_client, path=unix_path)
+    return await asyncio.start_server(server.handle_client, host, port)
+
+async def serve(cache, host=SERVER_HOST, port=SERVER_PORT, unix_path=None, duration=None):
+    server = CacheServer(cache)
+    listener = await start_server(server, host, port, unix_path)
+    print(f"Serving {type(cache).__name__} on {unix_path or f'{host}:{port}'}")
+    try:
+        async with listener:
+            if duration is None:
+                await listener.serve_forever()
+            else:
+                await asyncio.sleep(duration)
+    finally:
+        if unix_path is not None and os.path.exists(unix_path):
+            os.remove(unix_path)
+        print_server_report(server)
+    return server
+
+def print_server_report(server):
+    stats = server.stats()
+    print(f"\nRequests: {stats['requests']} ({stats['requests_per_sec']} req/sec), "
+          f"Hits: {stats['get_hits']}, Misses: {stats['get_misses']}")
+    print_latency_line("Service time", server.service_times)
+
+def print_latency_line(label, histogram):
+    print(f"{label} (us): p50 {histogram.percentile(50) / 1e3:.1f}, p99 {histogram.percentile(99) / 1e3:.1f}, "
+          f"p99.9 {histogram.percentile(99.9) / 1e3:.1f}, max {histogram.max / 1e3:.1f}")
+
+def encode_request(operation):
+    op_type, *op_args = operation
+    if op_type == 'get':
+        return b'get %s\r\n' % op_args[0].encode()
+    elif op_type == 'put':
+        data = str(op_args[1]).encode()
+        return b'set %s 0 0 %d\r\n%s\r\n' % (str(op_args[0]).encode(), len(data), data)
+    # compute and unknown operations never reach the cache, so they are not sent
+    return None
+
+async def read_response(reader):
+    # Returns whether a get hit; a set answers with a single STORED line
+    line = await reader.readline()
+    if line.startswith(b'VALUE'):
+        await reader.readexactly(int(line.split()[3]) + 2)
+        await reader.readline()
+        return True
+    if not line:
+        raise ConnectionError("Server closed the connection")
+    return False
+
+async def open_connection(host, port, unix_path):
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+async def replay_connection(requests, host, port, unix_path, rate, pipeline_depth, latencies, counters):
+    # Open loop: with a target rate, request i is due at start + i / rate and its latency counts from that
+    # moment, so a slow server cannot hide queueing delay by slowing the client down (coordinated omission)
+    reader, writer = await open_connection(host, port, unix_path)
+    in_flight = asyncio.Queue()
+    slots = asyncio.Semaphore(pipeline_depth)
+    clock = time.perf_counter_ns
+
+    async def receive():
+        for _ in range(len(requests)):
+            due, is_get = await in_flight.get()
+            hit = await read_response(reader)
+            latencies.record(max(clock() - due, 0))
+            slots.release()
+            if is_get:
+                counters['hits' if hit else 'misses'] += 1
+            counters['completed'] += 1
+
+    receiver = asyncio.ensure_future(receive())
+    start = clock()
+    interval = 1e9 / rate if rate > 0 else 0
+    for index, (request, is_get) in enumerate(requests):
+        if rate > 0:
+            due = start + int(index * interval)
+            delay = due - clock()
+            if delay > 0:
+                await writer.drain()
+                await asyncio.sleep(delay / 1e9)
+            await slots.acquire()
+        else:
+            await slots.acquire()
+            due = clock()
+        in_flight.put_nowait((due, is_get))
+        # Buffered requests go out whenever the sender waits, so a full pipeline is written in one go
+        writer.write(request)
+    await writer.drain()
+    await receiver
+    writer.write(b'quit\r\n')
+    writer.close()
+
+async def run_load(cpu_operations, host=SERVER_HOST, port=SERVER_PORT, unix_path=None, rate=0,
+                   connections=LOAD_CONNECTIONS, pipeline_depth=LOAD_PIPELINE_DEPTH):
+    requests = []
+    for operation in cpu_operations:
+        request = encode_request(operation)
+        if request is not None:
+            requests.append((request, operation[0] == 'get'))
+
+    latencies = LatencyHistogram()
+    counters = {'hits': 0, 'misses': 0, 'completed': 0}
+    # Requests are dealt round-robin, so each connection carries an even share of the target rate
+    start_time = time.perf_counter()
+    await asyncio.gather(*(replay_connection(requests[index::connections], host, port, unix_path,
+                                             rate / connections, pipeline_depth, latencies, counters)
+                           for index in range(connections)))
+    execution_time = time.perf_counter() - start_time
+    return counters, latencies, execution_time
+
+async def fetch_stats(host=SERVER_HOST, port=SERVER_PORT, unix_path=None):
+    reader, writer = await open_connection(host, port, unix_path)
+    writer.write(b'stats\r\nquit\r\n')
+    stats = {}
+    while True:
+        line = (await reader.readline()).decode().split()
+        if not line or line[0] == 'END':
+            break
+        stats[line[1]] = line[2]
+    writer.close()
+    return stats
+
+def print_load_report(counters, latencies, execution_time, rate):
+    throughput = counters['completed'] / execution_time if execution_time > 0 else 0.0
+    target = f"{rate:,.0f} req/sec target" if rate > 0 else "unpaced"
+    print(f"Requests: {counters['completed']} in {execution_time:.2f} seconds, {throughput:,.0f} req/sec ({target})")
+    print(f"Get Hits: {counters['hits']}, Get Misses: {counters['misses']}")
+    print_latency_line("Latency", latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a cache policy over a memcached-like protocol, or load it")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--unix', help="use this Unix socket instead of TCP")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="run the cache server")
+    serve_parser.add_argument('--policy', default='LRU', choices=ONLINE_POLICIES)
+    serve_parser.add_argument('--capacity', type=int, default=1000)
+    serve_parser.add_argument('--decay-factor', type=float)
+    serve_parser.add_argument('--duration', type=float, help="stop after this many seconds")
+
+    load_parser = subparsers.add_parser('load', help="replay a trace file against a running server")
+    load_parser.add_argument('trace')
+    load_parser.add_argument('--rate', type=float, default=0, help="target requests/sec (default: unpaced)")
+    load_parser.add_argument('--connections', type=int, default=LOAD_CONNECTIONS)
+    load_parser.add_argument('--pipeline', type=int, default=LOAD_PIPELINE_DEPTH)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        cache = create_policy_cache(args.policy, args.capacity, args.decay_factor)
+        try:
+            asyncio.run(serve(cache, args.host, args.port, args.unix, args.duration))
+        except KeyboardInterrupt:
+            pass
+    else:
+        cpu_operations = list(TraceFile(args.trace))
+        counters, latencies, execution_time = asyncio.run(
+            run_load(cpu_operations, args.host, args.port, args.unix, args.rate, args.connections, args.pipeline))
+        print_load_report(counters, latencies, execution_time, args.rate)
+        stats = asyncio.run(fetch_stats(args.host, args.port, args.unix))
+        print(f"Server: {stats.get('requests_per_sec')} req/sec over its uptime, service time "
+              f"p50 {int(stats.get('service_p50_ns', 0)) / 1e3:.1f} us, "
+              f"p99 {int(stats.get('service_p99_ns', 0)) / 1e3:.1f} us")
+
+if __name__ == "__main__":
+    main()
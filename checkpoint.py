@@ -0,0 +1,174 @@
+import argparse
+import importlib
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from itertools import islice
+
+from result_io import VERBOSITY_SILENT, VERBOSITY_SUMMARY, open_result_writer
+from sweep import ONLINE_POLICIES, POLICY_MODULES, create_policy_cache
+from trace_io import TraceFile, iter_chunks, read_trace_chunks_at
+
+CHECKPOINT_MAGIC = b'SIMCKPT1'
+# Operations replayed between snapshots
+CHECKPOINT_EVERY = 1_000_000
+
+def trace_identity(cpu_operations):
+    # Enough to notice a resume against a different or modified trace file, without hashing it
+    if isinstance(cpu_operations, TraceFile):
+        stat = os.stat(cpu_operations.filename)
+        return f'{os.path.abspath(cpu_operations.filename)}:{stat.st_size}:{stat.st_mtime_ns}'
+    return None
+
+def save_checkpoint(checkpoint_filename, state):
+    # Pickled cache state, zlib-compressed, written to a temporary file and renamed so a crash mid-write
+    # leaves the previous snapshot intact
+    data = CHECKPOINT_MAGIC + zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+    directory = os.path.dirname(checkpoint_filename) or '.'
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, checkpoint_filename)
+    return len(data)
+
+def load_checkpoint(checkpoint_filename):
+    with open(checkpoint_filename, 'rb') as file:
+        data = file.read()
+    if not data.startswith(CHECKPOINT_MAGIC):
+        raise ValueError(f"{checkpoint_filename} is not a simulation checkpoint.")
+    return pickle.loads(zlib.decompress(data[len(CHECKPOINT_MAGIC):]))
+
+def new_state(policy, capacity, decay_factor, trace, cache):
+    # position is the byte offset in a trace file just past operation `offset`
+    return {'policy': policy, 'capacity': capacity, 'decay_factor': decay_factor, 'trace': trace, 'offset': 0,
+            'position': 0, 'hits': 0, 'misses': 0, 'output_bytes': None, 'finished': False, 'cache': cache}
+
+def check_state(state, policy, capacity, decay_factor, trace=None):
+    expected = (policy, capacity, decay_factor)
+    found = (state['policy'], state['capacity'], state['decay_factor'])
+    if found != expected:
+        raise ValueError(f"Checkpoint is for {found}, not {expected}.")
+    if trace is not None and state['trace'] is not None and state['trace'] != trace:
+        raise ValueError(f"Checkpoint was taken on a different trace ({state['trace']}).")
+
+def check_output(state, output_filename):
+    # A checkpoint taken without a CSV has no rows to append to; resuming would write the tail under a fresh header
+    if state['offset'] > 0 and output_filename is not None and state['output_bytes'] is None:
+        raise ValueError(f"Checkpoint was taken without an output CSV, so it cannot resume into {output_filename}.")
+
+def remaining_chunks(cpu_operations, state):
+    # Yields (chunk, byte position after it). A trace file is resumed with a seek to the saved position;
+    # anything else is iterated again up to the saved offset.
+    position = state.get('position')
+    if isinstance(cpu_operations, TraceFile) and (state['offset'] == 0 or position is not None):
+        yield from read_trace_chunks_at(cpu_operations.filename, position or 0, cpu_operations.chunk_bytes)
+        return
+    for chunk in iter_chunks(islice(iter(cpu_operations), state['offset'], None)):
+        yield chunk, None
+
+def simulate_with_checkpoints(cpu_operations, policy, capacity, checkpoint_filename, output_filename=None,
+                              checkpoint_every=CHECKPOINT_EVERY, verbosity=VERBOSITY_SUMMARY, decay_factor=None,
+                              warm_start=None):
+    # Resumes from checkpoint_filename when it exists; otherwise starts cold, or from a warm_start snapshot
+    module = importlib.import_module(POLICY_MODULES[policy])
+    trace = trace_identity(cpu_operations)
+    if os.path.exists(checkpoint_filename):
+        state = load_checkpoint(checkpoint_filename)
+        check_state(state, policy, capacity, decay_factor, trace)
+        check_output(state, output_filename)
+        if state.get('finished'):
+            # Replaying nothing and rewriting the checkpoint would look like a finished run; say so instead
+            if verbosity >= VERBOSITY_SUMMARY:
+                print(f"{checkpoint_filename} already covers the whole trace ({state['offset']} operations); "
+                      f"delete it to run again")
+            miss_rate = module.print_metrics(state['hits'], state['misses'], state['offset'], verbosity)
+            return state['hits'], state['misses'], miss_rate
+        if verbosity >= VERBOSITY_SUMMARY:
+            print(f"Resuming from operation {state['offset'] + 1}")
+    else:
+        cache = create_policy_cache(policy, capacity, decay_factor)
+        if warm_start is not None:
+            warm_state = load_checkpoint(warm_start)
+            check_state(warm_state, policy, capacity, decay_factor)
+            cache = warm_state['cache']
+        state = new_state(policy, capacity, decay_factor, trace, cache)
+
+    cache = state['cache']
+    last_saved = state['offset']
+    resume_at = state['output_bytes'] if state['offset'] > 0 else None
+    with open_result_writer(output_filename, resume_at=resume_at) as writer:
+        for chunk, position in remaining_chunks(cpu_operations, state):
+            hits, misses = module.run_operations(cache, chunk, state['offset'], writer, verbosity)
+            state['hits'] += hits
+            state['misses'] += misses
+            state['offset'] += len(chunk)
+            state['position'] = position
+            if state['offset'] - last_saved >= checkpoint_every:
+                # The CSV is synced first, so it never lags behind the snapshot that describes it
+                state['output_bytes'] = writer.sync() if writer is not None else None
+                save_checkpoint(checkpoint_filename, state)
+                last_saved = state['offset']
+        state['output_bytes'] = writer.sync() if writer is not None else None
+    state['finished'] = True
+    save_checkpoint(checkpoint_filename, state)
+
+    miss_rate = module.print_metrics(state['hits'], state['misses'], state['offset'], verbosity)
+    return state['hits'], state['misses'], miss_rate
+
+def create_warm_snapshot(cpu_operations, policy, capacity, warmup_operations, snapshot_filename,
+                         decay_factor=None):
+    # Replays the cold-start phase once; experiments then start from the snapshot with zeroed counters
+    module = importlib.import_module(POLICY_MODULES[policy])
+    cache = create_policy_cache(policy, capacity, decay_factor)
+    for chunk in iter_chunks(islice(iter(cpu_operations), warmup_operations)):
+        module.run_operations(cache, chunk, 0, None, VERBOSITY_SILENT)
+    return save_checkpoint(snapshot_filename, new_state(policy, capacity, decay_factor, None, cache))
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpointed, resumable and warm-started simulation runs")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="replay a trace, resuming from the checkpoint if it exists")
+    run_parser.add_argument('trace')
+    run_parser.add_argument('--policy', default='LRU', choices=ONLINE_POLICIES)
+    run_parser.add_argument('--capacity', type=int, required=True)
+    run_parser.add_argument('--decay-factor', type=float)
+    run_parser.add_argument('--checkpoint', required=True)
+    run_parser.add_argument('--every', type=int, default=CHECKPOINT_EVERY)
+    run_parser.add_argument('--output', help="per-operation CSV")
+    run_parser.add_argument('--warm-start', help="snapshot to start from instead of an empty cache")
+
+    warm_parser = subparsers.add_parser('warm', help="replay the first operations and save a warm cache snapshot")
+    warm_parser.add_argument('trace')
+    warm_parser.add_argument('snapshot')
+    warm_parser.add_argument('--policy', default='LRU', choices=ONLINE_POLICIES)
+    warm_parser.add_argument('--capacity', type=int, required=True)
+    warm_parser.add_argument('--decay-factor', type=float)
+    warm_parser.add_argument('--operations', type=int, required=True)
+
+    show_parser = subparsers.add_parser('show', help="describe a checkpoint or snapshot")
+    show_parser.add_argument('checkpoint')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        start_time = time.perf_counter()
+        simulate_with_checkpoints(TraceFile(args.trace), args.policy, args.capacity, args.checkpoint, args.output,
+                                  args.every, VERBOSITY_SUMMARY, args.decay_factor, args.warm_start)
+        print(f"Total Execution Time: {time.perf_counter() - start_time:.2f} seconds")
+    elif args.command == 'warm':
+        size = create_warm_snapshot(TraceFile(args.trace), args.policy, args.capacity, args.operations,
+                                    args.snapshot, args.decay_factor)
+        print(f"Saved warm {args.policy} snapshot after {args.operations} operations to {args.snapshot} "
+              f"({size} bytes)")
+    else:
+        state = load_checkpoint(args.checkpoint)
+        print(f"Policy: {state['policy']}, Capacity: {state['capacity']}, Decay Factor: {state['decay_factor']}")
+        print(f"Offset: {state['offset']}, Hits: {state['hits']}, Misses: {state['misses']}, "
+              f"Cached Items: {len(state['cache'].cache)}, Finished: {state.get('finished', False)}")
+
+if __name__ == "__main__":
+    main()
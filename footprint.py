@@ -0,0 +1,75 @@
+import argparse
+import importlib
+import tracemalloc
+
+from sweep import ONLINE_POLICIES, POLICY_MODULES, create_policy_cache
+from trace_io import TraceFile, compile_trace
+
+FOOTPRINT_ENTRIES = 100_000
+# These can also index dense integer keys with a flat array instead of a dict
+DIRECT_INDEX_POLICIES = ('ArrayLRU', 'ArrayFIFO')
+
+def create_footprint_cache(policy, capacity, direct_index=False):
+    if direct_index:
+        return importlib.import_module(POLICY_MODULES[policy]).create_cache(policy, capacity, capacity)
+    return create_policy_cache(policy, capacity)
+
+def measure_bytes_per_entry(policy, entries=FOOTPRINT_ENTRIES, direct_index=False):
+    # Keys and values exist before tracing starts, so only the cache's own structures are counted
+    keys = list(range(entries))
+    tracemalloc.start()
+    try:
+        cache = create_footprint_cache(policy, entries, direct_index)
+        for key in keys:
+            cache.put(key, key)
+        bytes_used, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return bytes_used / entries, peak_bytes / entries
+
+def measure_run_peak(trace, policy, capacity):
+    # The trace is compiled before tracing starts, so the peak is the cache plus the replay loop
+    module = importlib.import_module(POLICY_MODULES[policy])
+    tracemalloc.start()
+    try:
+        cache = create_policy_cache(policy, capacity)
+        for _, ops, keys, values in trace.chunks():
+            module.count_compiled_operations(cache, ops, keys, values)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_bytes, len(cache.cache)
+
+def footprint_rows(policies):
+    for policy in policies:
+        yield policy, False
+        if policy in DIRECT_INDEX_POLICIES:
+            yield policy, True
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory footprint of every cache class")
+    parser.add_argument('trace', nargs='?', help="also report the peak memory of a replay of this trace")
+    parser.add_argument('--entries', type=int, default=FOOTPRINT_ENTRIES)
+    parser.add_argument('--capacity', type=int, default=FOOTPRINT_ENTRIES, help="cache size for the replay")
+    parser.add_argument('--policies', nargs='+', default=ONLINE_POLICIES, choices=ONLINE_POLICIES)
+    args = parser.parse_args()
+
+    print(f"Filled with {args.entries} entries:")
+    print(f"{'Policy':<34}{'Bytes/entry':>14}{'Peak/entry':>14}")
+    for policy, direct_index in footprint_rows(args.policies):
+        bytes_per_entry, peak_per_entry = measure_bytes_per_entry(policy, args.entries, direct_index)
+        label = policy + (' (direct index)' if direct_index else '')
+        print(f"{label:<34}{bytes_per_entry:>14.1f}{peak_per_entry:>14.1f}")
+
+    if args.trace is None:
+        return
+
+    trace = compile_trace(TraceFile(args.trace))
+    print(f"\nReplaying {args.trace} ({len(trace)} operations) at capacity {args.capacity}:")
+    print(f"{'Policy':<34}{'Entries':>10}{'Peak (MiB)':>14}")
+    for policy in args.policies:
+        peak_bytes, entries = measure_run_peak(trace, policy, args.capacity)
+        print(f"{policy:<34}{entries:>10}{peak_bytes / (1 << 20):>14.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import time
+
+from result_io import VERBOSITY_SUMMARY
+from sweep import ADAPTIVE_POLICIES, ONLINE_POLICIES, create_policy_cache
+from trace_io import TraceFile, iter_chunks
+
+HIERARCHY_MODES = ('inclusive', 'exclusive', 'nine')
+HIERARCHY_LEVELS = ('LRU:64', 'LRU:1024', 'LRU:16384')
+DEFAULT_DECAY_FACTOR = 0.5
+
+class CacheLevel:
+    def __init__(self, name, policy, capacity, decay_factor=None):
+        self.name = name
+        self.policy = policy
+        self.capacity = capacity
+        self.cache = create_policy_cache(policy, capacity, decay_factor)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Copies dropped because a lower level evicted them (inclusive mode only)
+        self.invalidations = 0
+
+    def put(self, key, value):
+        evicted = self.cache.put(key, value)
+        if evicted is not None:
+            self.evictions += 1
+        return evicted
+
+    def remove(self, key):
+        return self.cache.remove(key)
+
+class CacheHierarchy:
+    # A stack of levels, L1 first. A get is looked up level by level until one hits; only the levels it
+    # missed see it, as in a real hierarchy. Puts write through to the levels the mode allows.
+    #   inclusive: every key in a level is also in all levels below it; a lower-level eviction
+    #              back-invalidates the copies above
+    #   exclusive: a key lives in one level only; hits move up to L1 and victims move one level down
+    #   nine:      non-inclusive non-exclusive; levels fill on misses and evict independently
+    def __init__(self, levels, mode='inclusive', decay_factor=DEFAULT_DECAY_FACTOR):
+        if mode not in HIERARCHY_MODES:
+            raise ValueError(f"Invalid mode '{mode}'. Choose from {', '.join(HIERARCHY_MODES)}.")
+        self.mode = mode
+        self.levels = []
+        for index, (policy, capacity) in enumerate(levels):
+            level = CacheLevel(f'L{index + 1}', policy, capacity,
+                               decay_factor if policy in ADAPTIVE_POLICIES else None)
+            if mode != 'nine' and not hasattr(level.cache, 'remove'):
+                raise ValueError(f"{policy} cannot remove a given key, so it can only be used in 'nine' mode.")
+            self.levels.append(level)
+
+    def get(self, key):
+        for index, level in enumerate(self.levels):
+            value = level.cache.get(key)
+            if value != -1:
+                level.hits += 1
+                if index > 0:
+                    self._promote(index, key, value)
+                return value
+            level.misses += 1
+        return -1
+
+    def put(self, key, value):
+        if self.mode == 'exclusive':
+            for level in self.levels[1:]:
+                level.remove(key)
+            self._fill_exclusive(key, value)
+        elif self.mode == 'inclusive':
+            # Bottom up, so a back-invalidation never removes the copy being written
+            for index in range(len(self.levels) - 1, -1, -1):
+                if not self._fill_inclusive(index, key, value):
+                    break
+        else:
+            for level in self.levels:
+                level.put(key, value)
+
+    def _promote(self, index, key, value):
+        if self.mode == 'exclusive':
+            self.levels[index].remove(key)
+            self._fill_exclusive(key, value)
+        else:
+            for upper in range(index - 1, -1, -1):
+                if self.mode == 'inclusive':
+                    if not self._fill_inclusive(upper, key, value):
+                        break
+                else:
+                    self.levels[upper].put(key, value)
+
+    def _fill_inclusive(self, index, key, value):
+        # Returns whether the key stayed; a level that turns it away (W-TinyLFU admission) keeps it out above
+        evicted = self.levels[index].put(key, value)
+        if evicted is None:
+            return True
+        victim = evicted[0]
+        for upper in self.levels[:index]:
+            if upper.remove(victim) != -1:
+                upper.invalidations += 1
+        return victim != key
+
+    def _fill_exclusive(self, key, value):
+        # Each level's victim is written into the next one; the last level's victim leaves the hierarchy
+        for level in self.levels:
+            evicted = level.put(key, value)
+            if evicted is None:
+                return
+            key, value = evicted
+
+    def level_stats(self):
+        return [(level.name, level.policy, level.capacity, level.hits, level.misses, level.evictions,
+                 level.invalidations) for level in self.levels]
+
+def simulate_hierarchy(cpu_operations, levels, mode='inclusive', decay_factor=DEFAULT_DECAY_FACTOR,
+                       verbosity=VERBOSITY_SUMMARY):
+    # One pass over the trace drives the whole stack
+    hierarchy = CacheHierarchy(levels, mode, decay_factor)
+    get = hierarchy.get
+    put = hierarchy.put
+    cache_hits = 0
+    cache_misses = 0
+    total_operations = 0
+    for chunk in iter_chunks(cpu_operations):
+        total_operations += len(chunk)
+        for op_type, *op_args in chunk:
+            if op_type == 'get':
+                if get(op_args[0]) != -1:
+                    cache_hits += 1
+                else:
+                    cache_misses += 1
+            elif op_type == 'put':
+                put(op_args[0], op_args[1])
+
+    if verbosity >= VERBOSITY_SUMMARY:
+        print_hierarchy_report(hierarchy, cache_hits, cache_misses, total_operations)
+    return hierarchy, cache_hits, cache_misses, total_operations
+
+def print_hierarchy_report(hierarchy, cache_hits, cache_misses, total_operations):
+    print(f"\n{hierarchy.mode.capitalize()} hierarchy:")
+    print(f"{'Level':<6}{'Policy':<22}{'Capacity':>10}{'Hits':>10}{'Misses':>10}{'Local Hit':>11}"
+          f"{'Evictions':>11}{'Invalidated':>13}")
+    for name, policy, capacity, hits, misses, evictions, invalidations in hierarchy.level_stats():
+        accesses = hits + misses
+        local_hit_rate = hits / accesses if accesses > 0 else 0.0
+        print(f"{name:<6}{policy:<22}{capacity:>10}{hits:>10}{misses:>10}{local_hit_rate * 100:>10.2f}%"
+              f"{evictions:>11}{invalidations:>13}")
+    miss_rate = cache_misses / total_operations if total_operations > 0 else 0.0
+    print(f"Total Hits: {cache_hits}, Total Misses: {cache_misses}, Miss Rate: {miss_rate * 100:.2f}%")
+
+def parse_level(spec):
+    policy, _, capacity = spec.rpartition(':')
+    if policy not in ONLINE_POLICIES or not capacity.isdigit():
+        raise argparse.ArgumentTypeError(f"'{spec}' is not POLICY:CAPACITY with POLICY one of "
+                                         f"{', '.join(ONLINE_POLICIES)}")
+    return policy, int(capacity)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a trace through a multi-level cache hierarchy")
+    parser.add_argument('trace', nargs='?', default="00_cpu_operations.txt")
+    parser.add_argument('--levels', nargs='+', type=parse_level,
+                        default=[parse_level(spec) for spec in HIERARCHY_LEVELS],
+                        help=f"POLICY:CAPACITY per level, L1 first (default: {' '.join(HIERARCHY_LEVELS)})")
+    parser.add_argument('--modes', nargs='+', default=list(HIERARCHY_MODES), choices=HIERARCHY_MODES)
+    parser.add_argument('--decay-factor', type=float, default=DEFAULT_DECAY_FACTOR)
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        try:
+            CacheHierarchy(args.levels, mode, args.decay_factor)
+        except ValueError as error:
+            parser.error(str(error))
+
+    cpu_operations = TraceFile(args.trace)
+    for mode in args.modes:
+        start_time = time.perf_counter()
+        simulate_hierarchy(cpu_operations, args.levels, mode, args.decay_factor)
+        print(f"Total Execution Time: {time.perf_counter() - start_time:.2f} seconds")
+
+if __name__ == "__main__":
+    main()
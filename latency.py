@@ -0,0 +1,206 @@
+import importlib
+import random
+import sys
+import time
+
+from result_io import VERBOSITY_PER_OP, VERBOSITY_SILENT
+from sweep import POLICY_MODULES, create_policy_cache
+from trace_io import TraceFile, iter_chunks
+
+# Every value is kept to within 2**-(bits - 1) of its true size, HDR-histogram style
+LATENCY_SUB_BUCKET_BITS = 7
+# On average one operation in this many is timed
+LATENCY_SAMPLE_EVERY = 64
+# Replays per policy when measuring the overhead of the instrumentation itself
+LATENCY_OVERHEAD_REPEATS = 5
+LATENCY_CATEGORIES = ('get', 'put-hit', 'put-miss', 'put-miss-evict', 'decay', 'output')
+
+class LatencyHistogram:
+    # Log-linear buckets: values below 2**bits are exact, larger ones share a bucket with values that
+    # have the same leading bits, so memory stays small however wide the range of latencies
+    def __init__(self, sub_bucket_bits=LATENCY_SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        magnitude = max(value.bit_length() - self.sub_bucket_bits, 0)
+        index = (magnitude << self.sub_bucket_bits) | (value >> magnitude)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def bucket_upper(self, index):
+        magnitude = index >> self.sub_bucket_bits
+        sub_bucket = index & ((1 << self.sub_bucket_bits) - 1)
+        return ((sub_bucket + 1) << magnitude) - 1
+
+    def percentile(self, percent):
+        if self.count == 0:
+            return 0
+        target = max(int(self.count * percent / 100 + 0.5), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self.bucket_upper(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count > 0 else 0.0
+
+class LatencyRecorder:
+    # Passed to run_operations as recorder=...; only sampled operations pay for the clock reads
+    def __init__(self, sample_every=LATENCY_SAMPLE_EVERY, seed=0):
+        self.sample_every = sample_every
+        self.histograms = {category: LatencyHistogram() for category in LATENCY_CATEGORIES}
+        self.operations = 0
+        # Randomized gaps keep periodic traces (scans, loops) from lining up with the sample points
+        self._random = random.Random(seed)
+        self._countdown = self._next_gap()
+
+    def _next_gap(self):
+        return self._random.randint(1, 2 * self.sample_every - 1)
+
+    def record(self, category, elapsed):
+        self.histograms[category].record(elapsed)
+
+    def run_operations(self, cache, operations, start, writer, verbosity, run_untimed):
+        # The operations between two samples go through the caller's own uninstrumented loop in one slice,
+        # so unsampled operations cost exactly what they cost without a recorder
+        cache_hits = 0
+        cache_misses = 0
+        position = 0
+        total = len(operations)
+
+        while position < total:
+            sample_at = position + self._countdown - 1
+            if sample_at >= total:
+                sample_at = total
+            if sample_at > position:
+                segment = operations if position == 0 and sample_at == total else operations[position:sample_at]
+                hits, misses = run_untimed(cache, segment, start + position, writer, verbosity)
+                cache_hits += hits
+                cache_misses += misses
+                self._countdown -= sample_at - position
+            if sample_at == total:
+                break
+
+            self._countdown = self._next_gap()
+            hits, misses = self._run_sampled(cache, operations[sample_at], start + sample_at, writer, verbosity)
+            cache_hits += hits
+            cache_misses += misses
+            position = sample_at + 1
+
+        self.operations += total
+        return cache_hits, cache_misses
+
+    def _run_sampled(self, cache, operation, i, writer, verbosity):
+        clock = time.perf_counter_ns
+        per_op = verbosity >= VERBOSITY_PER_OP
+        op_type, *op_args = operation
+        cache_hits = 0
+        cache_misses = 0
+
+        if op_type == 'get':
+            key = op_args[0]
+            op_start = clock()
+            result = cache.get(key)
+            self.record('get', clock() - op_start)
+            if result != -1:
+                cache_hits += 1
+            else:
+                cache_misses += 1
+            output_start = clock()
+            cache_size = len(cache.cache)
+            if per_op:
+                print(f"Operation {i + 1}: Cache Size: {cache_size}, Result: {result}")
+            if writer is not None:
+                writer.add(i + 1, cache_size, result)
+            if per_op or writer is not None:
+                self.record('output', clock() - output_start)
+
+        elif op_type == 'put':
+            key, value = op_args
+            decay_frequencies = getattr(cache, 'decay_frequencies', None)
+            if decay_frequencies is not None:
+                # The adaptive caches call self.decay_frequencies, so an instance attribute times it in place
+                def timed_decay_frequencies(current_key):
+                    decay_start = clock()
+                    decay_frequencies(current_key)
+                    self.record('decay', clock() - decay_start)
+                cache.decay_frequencies = timed_decay_frequencies
+            if key in cache.cache:
+                category = 'put-hit'
+            elif len(cache.cache) >= cache.capacity > 0:
+                category = 'put-miss-evict'
+            else:
+                category = 'put-miss'
+            op_start = clock()
+            cache.put(key, value)
+            self.record(category, clock() - op_start)
+            if decay_frequencies is not None:
+                del cache.decay_frequencies
+            output_start = clock()
+            cache_size = len(cache.cache)
+            if per_op:
+                print(f"Operation {i + 1}: Cache Size: {cache_size}, Cache Updated: {cache.cache}")
+            if writer is not None:
+                writer.add(i + 1, cache_size, 'N/A')
+            if per_op or writer is not None:
+                self.record('output', clock() - output_start)
+
+        elif op_type == 'compute':
+            # Simulate a CPU compute operation (no effect on cache in this example)
+            if per_op:
+                print(f"Operation {i + 1}: Compute Task Executed")
+
+        elif per_op:
+            print(f"Operation {i + 1}: Unknown Operation")
+
+        return cache_hits, cache_misses
+
+def print_latency_report(recorder):
+    print(f"\nLatency (ns, ~1 in {recorder.sample_every} of {recorder.operations} operations sampled):")
+    print(f"{'Operation':<16}{'Samples':>10}{'Mean':>10}{'p50':>10}{'p99':>10}{'Max':>12}")
+    for category, histogram in recorder.histograms.items():
+        if histogram.count == 0:
+            continue
+        print(f"{category:<16}{histogram.count:>10}{histogram.mean():>10.0f}{histogram.percentile(50):>10}"
+              f"{histogram.percentile(99):>10}{histogram.max:>12}")
+
+def timed_replay(module, policy, cache_capacity, cpu_operations, recorder=None):
+    cache = create_policy_cache(policy, cache_capacity, trace=cpu_operations)
+    start_time = time.perf_counter()
+    for chunk in iter_chunks(cpu_operations):
+        module.run_operations(cache, chunk, 0, None, VERBOSITY_SILENT, recorder)
+    return time.perf_counter() - start_time
+
+def main():
+    trace_filename = sys.argv[1] if len(sys.argv) > 1 else "00_cpu_operations.txt"
+    cpu_operations = list(TraceFile(trace_filename))
+    cache_capacity = int(input("Enter the cache size: "))
+
+    for policy in POLICY_MODULES:
+        module = importlib.import_module(POLICY_MODULES[policy])
+        # Plain and instrumented replays alternate, and the best of each is compared to show what sampling costs
+        plain_times = []
+        instrumented_times = []
+        for _ in range(LATENCY_OVERHEAD_REPEATS):
+            plain_times.append(timed_replay(module, policy, cache_capacity, cpu_operations))
+            recorder = LatencyRecorder()
+            instrumented_times.append(timed_replay(module, policy, cache_capacity, cpu_operations, recorder))
+        plain_time = min(plain_times)
+        instrumented_time = min(instrumented_times)
+
+        overhead = instrumented_time / plain_time - 1 if plain_time > 0 else 0.0
+        print(f"\n{policy}: {plain_time:.3f}s plain, {instrumented_time:.3f}s instrumented "
+              f"({overhead * 100:+.1f}% overhead)")
+        print_latency_report(recorder)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from trace_io import BinaryTrace, TraceFile, iter_chunks
+
+# Bump whenever a policy or the replay loop changes, so stale results are never served
+ENGINE_VERSION = 2
+RESULT_CACHE_DIR = '.sim_cache'
+RESULT_CACHE_MAX_BYTES = 256 << 20
+HASH_CHUNK_BYTES = 1 << 20
+
+class ResultCache:
+    def __init__(self, cache_dir=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.entries_dir = os.path.join(cache_dir, 'entries')
+        self.fingerprints_path = os.path.join(cache_dir, 'fingerprints.json')
+        self._fingerprints = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Worker processes get their own lock and reload the fingerprint index on demand
+        return {'cache_dir': self.cache_dir, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state['cache_dir'], state['max_bytes'])
+
+    def trace_fingerprint(self, cpu_operations):
+        # Parsed operations are hashed, so a text trace, its list, its shared-memory copy and its compiled form
+        # share entries. That is only sound because every policy replays a compiled trace to the same results:
+        # key ids keep the keys' sort order for tie-breaks, and WTinyLFU hashes the original keys.
+        fingerprint = getattr(cpu_operations, 'fingerprint', None)
+        if fingerprint is not None:
+            return fingerprint
+        elif isinstance(cpu_operations, TraceFile):
+            return self._file_fingerprint(cpu_operations)
+        elif isinstance(cpu_operations, BinaryTrace) and not cpu_operations.text_keys:
+            return _hash_records(cpu_operations.records)
+        elif iter(cpu_operations) is cpu_operations:
+            # A one-shot iterator would be consumed by hashing, so it is never cached
+            return None
+        return _hash_operations(cpu_operations)
+
+    def _file_fingerprint(self, trace):
+        # Text traces are hashed once per (path, size, mtime) and remembered on disk
+        filename = trace.filename
+        stat = os.stat(filename)
+        index_key = f'{os.path.abspath(filename)}:{stat.st_size}:{stat.st_mtime_ns}'
+        with self._lock:
+            fingerprints = self._load_fingerprints()
+            fingerprint = fingerprints.get(index_key)
+        if fingerprint is not None:
+            return fingerprint
+
+        fingerprint = _hash_operations(trace)
+
+        with self._lock:
+            fingerprints = self._load_fingerprints()
+            fingerprints[index_key] = fingerprint
+            _write_atomic(self.fingerprints_path, json.dumps(fingerprints).encode())
+        return fingerprint
+
+    def _load_fingerprints(self):
+        if self._fingerprints is None:
+            try:
+                with open(self.fingerprints_path) as file:
+                    self._fingerprints = json.load(file)
+            except (OSError, ValueError):
+                self._fingerprints = {}
+        return self._fingerprints
+
+    def entry_key(self, fingerprint, policy, capacity, params):
+        description = json.dumps({'trace': fingerprint, 'policy': policy, 'capacity': capacity,
+                                  'params': params, 'engine_version': ENGINE_VERSION}, sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def lookup(self, cpu_operations, policy, capacity, params, output_filename=None):
+        fingerprint = self.trace_fingerprint(cpu_operations)
+        if fingerprint is None:
+            return None
+        key = self.entry_key(fingerprint, policy, capacity, params)
+        metadata_path = os.path.join(self.entries_dir, f'{key}.json')
+        results_path = os.path.join(self.entries_dir, f'{key}.csv.gz')
+        try:
+            with open(metadata_path) as file:
+                metadata = json.load(file)
+            if output_filename is not None:
+                with gzip.open(results_path, 'rb') as source, open(output_filename, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                os.utime(results_path)
+            os.utime(metadata_path)
+        except (OSError, ValueError):
+            return None
+        return metadata['hits'], metadata['misses'], metadata['total_operations']
+
+    def store(self, cpu_operations, policy, capacity, params, output_filename, hits, misses, total_operations):
+        fingerprint = self.trace_fingerprint(cpu_operations)
+        if fingerprint is None:
+            return
+        key = self.entry_key(fingerprint, policy, capacity, params)
+        os.makedirs(self.entries_dir, exist_ok=True)
+        if output_filename is not None:
+            with open(output_filename, 'rb') as file:
+                _write_atomic(os.path.join(self.entries_dir, f'{key}.csv.gz'), gzip.compress(file.read()))
+        metadata = {'trace': fingerprint, 'policy': policy, 'capacity': capacity, 'params': params,
+                    'engine_version': ENGINE_VERSION, 'hits': hits, 'misses': misses,
+                    'total_operations': total_operations}
+        # Metadata goes last: an entry only becomes visible once its results are complete
+        _write_atomic(os.path.join(self.entries_dir, f'{key}.json'), json.dumps(metadata).encode())
+        self.evict()
+
+    def entries(self):
+        try:
+            names = os.listdir(self.entries_dir)
+        except OSError:
+            return []
+        return [os.path.join(self.entries_dir, name) for name in names if not name.startswith('.')]
+
+    def size(self):
+        return sum(os.path.getsize(path) for path in self.entries())
+
+    def evict(self):
+        # Least recently used entries go first; lookups refresh the file times
+        with self._lock:
+            entries = {}
+            for path in self.entries():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = os.path.basename(path).split('.', 1)[0]
+                last_used, size, paths = entries.get(key, (0, 0, []))
+                entries[key] = (max(last_used, stat.st_mtime_ns), size + stat.st_size, paths + [path])
+            total = sum(size for _, size, _ in entries.values())
+            for _, size, paths in sorted(entries.values()):
+                if total <= self.max_bytes:
+                    break
+                for path in paths:
+                    _remove(path)
+                total -= size
+
+    def invalidate(self, trace_filename=None, policy=None):
+        fingerprint = self.trace_fingerprint(TraceFile(trace_filename)) if trace_filename is not None else None
+        removed = 0
+        for path in self.entries():
+            if not path.endswith('.json'):
+                continue
+            try:
+                with open(path) as file:
+                    metadata = json.load(file)
+            except (OSError, ValueError):
+                metadata = {}
+            if fingerprint is not None and metadata.get('trace') != fingerprint:
+                continue
+            if policy is not None and metadata.get('policy') != policy:
+                continue
+            _remove(path)
+            _remove(path[:-len('.json')] + '.csv.gz')
+            removed += 1
+        return removed
+
+def _hash_operations(cpu_operations):
+    # repr keeps string and integer keys apart, since they order differently in tie-breaks
+    digest = hashlib.sha256(b'operations:')
+    for chunk in iter_chunks(cpu_operations):
+        digest.update(''.join(f'{operation!r}\n' for operation in chunk).encode())
+    return digest.hexdigest()
+
+def _hash_records(records):
+    # Integer-keyed binary traces are hashed as raw records, without decoding them
+    digest = hashlib.sha256(b'records:')
+    step = max(HASH_CHUNK_BYTES // records.itemsize, 1)
+    for start in range(0, len(records), step):
+        digest.update(records[start:start + step].tobytes())
+    return digest.hexdigest()
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the on-disk simulation result cache")
+    parser.add_argument('--cache-dir', default=RESULT_CACHE_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    invalidate_parser = subparsers.add_parser('invalidate', help="remove cached results")
+    invalidate_parser.add_argument('--trace', help="only results for this trace file")
+    invalidate_parser.add_argument('--policy', help="only results for this policy")
+    subparsers.add_parser('stats', help="show the number and size of cached results")
+    args = parser.parse_args()
+
+    result_cache = ResultCache(args.cache_dir)
+    if args.command == 'invalidate':
+        removed = result_cache.invalidate(args.trace, args.policy)
+        print(f"Removed {removed} cached results")
+    else:
+        count = sum(1 for path in result_cache.entries() if path.endswith('.json'))
+        print(f"Cached results: {count}, Size: {result_cache.size() / (1 << 20):.2f} MiB")
+
+if __name__ == "__main__":
+    main()
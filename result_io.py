@@ -0,0 +1,60 @@
+import csv
+import os
+from contextlib import nullcontext
+
+# Verbosity levels for the simulate loops
+VERBOSITY_SILENT = 0
+VERBOSITY_SUMMARY = 1
+VERBOSITY_PER_OP = 2
+
+# Rows buffered before a writerows() call
+RESULT_BATCH_SIZE = 8192
+# Bytes of OS-level buffering for result files
+RESULT_BUFFER_BYTES = 1 << 20
+
+class BatchedResultWriter:
+    def __init__(self, output_filename, batch_size=RESULT_BATCH_SIZE, resume_at=None):
+        if resume_at is None:
+            self.csvfile = open(output_filename, 'w', newline='', buffering=RESULT_BUFFER_BYTES)
+            self.csvwriter = csv.writer(self.csvfile)
+            self.csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
+        else:
+            # Resuming a checkpointed run: rows written after the checkpoint are dropped, then appended again
+            os.truncate(output_filename, resume_at)
+            self.csvfile = open(output_filename, 'a', newline='', buffering=RESULT_BUFFER_BYTES)
+            self.csvwriter = csv.writer(self.csvfile)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def add(self, operation_number, cache_size, result):
+        # The 'Operation N' label is only formatted when the batch is flushed
+        self.rows.append((operation_number, cache_size, result))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.csvwriter.writerows([(f'Operation {number}', cache_size, result)
+                                  for number, cache_size, result in self.rows])
+        self.rows.clear()
+
+    def sync(self):
+        # Everything added so far reaches the OS; returns the file size, which a checkpoint can resume at
+        self.flush()
+        self.csvfile.flush()
+        return os.fstat(self.csvfile.fileno()).st_size
+
+    def close(self):
+        self.flush()
+        self.csvfile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def open_result_writer(output_filename, batch_size=RESULT_BATCH_SIZE, resume_at=None):
+    # No output file means a metrics-only run: nothing is buffered or written per operation
+    if output_filename is None:
+        return nullcontext()
+    return BatchedResultWriter(output_filename, batch_size, resume_at)
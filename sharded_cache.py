@@ -0,0 +1,150 @@
+import argparse
+import sys
+import threading
+import time
+
+from sweep import ONLINE_POLICIES, create_policy_cache
+from trace_io import OP_GET, OP_PUT, TraceFile, compile_trace
+
+SHARD_COUNT = 16
+THREAD_COUNTS = (1, 2, 4, 8)
+
+def effective_shards(capacity, shards):
+    # Every shard needs at least one slot, so a cache smaller than the shard count gets fewer shards
+    return max(min(shards, capacity), 1)
+
+class ShardedCache:
+    # Lock striping: keys are spread over independent caches, each behind its own lock, so threads only
+    # contend when they touch the same shard. Each shard runs the policy on its share of the capacity,
+    # which makes the whole an approximation of the policy (exact with a single shard).
+    def __init__(self, policy, capacity, shards=SHARD_COUNT, decay_factor=None, key_names=None):
+        self.policy = policy
+        self.capacity = capacity
+        shards = effective_shards(capacity, shards)
+        # The remainder goes to the first shards, so the shard capacities add up to the total
+        self.shards = [create_policy_cache(policy, capacity // shards + (index < capacity % shards), decay_factor,
+                                           key_names=key_names)
+                       for index in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        # Per-shard counters, only updated while holding that shard's lock
+        self.contended = [0] * shards
+        self.wait_ns = [0] * shards
+
+    def _acquire(self, index):
+        lock = self.locks[index]
+        if lock.acquire(blocking=False):
+            return lock
+        # Only the contended path reads the clock
+        start = time.perf_counter_ns()
+        lock.acquire()
+        self.wait_ns[index] += time.perf_counter_ns() - start
+        self.contended[index] += 1
+        return lock
+
+    def get(self, key):
+        index = hash(key) % len(self.shards)
+        lock = self._acquire(index)
+        try:
+            return self.shards[index].get(key)
+        finally:
+            lock.release()
+
+    def put(self, key, value):
+        index = hash(key) % len(self.shards)
+        lock = self._acquire(index)
+        try:
+            self.shards[index].put(key, value)
+        finally:
+            lock.release()
+
+    def __len__(self):
+        return sum(len(shard.cache) for shard in self.shards)
+
+    def lock_wait(self):
+        return sum(self.wait_ns), sum(self.contended)
+
+def replay_slice(cache, ops, keys, values, start_barrier, results, errors, index):
+    cache_hits = 0
+    cache_misses = 0
+    get = cache.get
+    put = cache.put
+    start_barrier.wait()
+    try:
+        for op, key, value in zip(ops, keys, values):
+            if op == OP_GET:
+                if get(key) != -1:
+                    cache_hits += 1
+                else:
+                    cache_misses += 1
+            elif op == OP_PUT:
+                put(key, value)
+    except Exception as error:
+        # Handed back to replay_concurrent, which re-raises it in the calling thread
+        errors[index] = error
+        return
+    results[index] = (cache_hits, cache_misses)
+
+def replay_concurrent(trace, policy, capacity, threads, shards=SHARD_COUNT, decay_factor=None):
+    # Thread t replays operations t, t + threads, t + 2 * threads, ... of the trace against the one shared cache
+    cache = ShardedCache(policy, capacity, shards, decay_factor, trace.key_names)
+    results = [None] * threads
+    errors = [None] * threads
+    start_barrier = threading.Barrier(threads + 1)
+    workers = [threading.Thread(target=replay_slice,
+                                args=(cache, trace.ops[index::threads].tolist(), trace.keys[index::threads].tolist(),
+                                      trace.values[index::threads], start_barrier, results, errors, index))
+               for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    start_barrier.wait()
+    start_time = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    execution_time = time.perf_counter() - start_time
+    for error in errors:
+        if error is not None:
+            raise error
+
+    cache_hits = sum(hits for hits, _ in results)
+    cache_misses = sum(misses for _, misses in results)
+    wait_ns, contended = cache.lock_wait()
+    return cache_hits, cache_misses, execution_time, wait_ns, contended
+
+def gil_status():
+    # sys._is_gil_enabled only exists on 3.13+, where free-threaded builds can run without the GIL
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    if is_gil_enabled is None:
+        return "GIL (no free-threaded support)"
+    return "GIL enabled" if is_gil_enabled() else "free-threaded (GIL disabled)"
+
+def measure_thread_scaling(trace, policy, capacity, thread_counts=THREAD_COUNTS, shards=SHARD_COUNT):
+    scaling = []
+    for threads in thread_counts:
+        cache_hits, cache_misses, execution_time, wait_ns, contended = replay_concurrent(trace, policy, capacity,
+                                                                                          threads, shards)
+        throughput = len(trace) / execution_time if execution_time > 0 else 0.0
+        speedup = throughput / scaling[0][2] if scaling and scaling[0][2] > 0 else 1.0
+        miss_rate = cache_misses / len(trace) if len(trace) > 0 else 0.0
+        scaling.append((threads, execution_time, throughput, wait_ns, contended, miss_rate))
+        print(f"{policy:<10}{threads:>8}{throughput:>14,.0f}{speedup:>9.2f}x{wait_ns / 1e6:>14.2f}{contended:>12}"
+              f"{miss_rate * 100:>10.2f}%")
+    return scaling
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay one trace from many threads against a shared sharded cache")
+    parser.add_argument('trace', nargs='?', default="00_cpu_operations.txt")
+    parser.add_argument('--policies', nargs='+', default=['LRU', 'LFU'], choices=ONLINE_POLICIES)
+    parser.add_argument('--capacity', type=int, default=1000)
+    parser.add_argument('--threads', nargs='+', type=int, default=list(THREAD_COUNTS))
+    parser.add_argument('--shards', type=int, default=SHARD_COUNT)
+    args = parser.parse_args()
+
+    trace = compile_trace(TraceFile(args.trace))
+    print(f"{len(trace)} operations, {effective_shards(args.capacity, args.shards)} shards, {gil_status()}")
+    print(f"{'Policy':<10}{'Threads':>8}{'Ops/sec':>14}{'Speedup':>10}{'Lock wait ms':>14}{'Contended':>12}"
+          f"{'Miss Rate':>11}")
+    for policy in args.policies:
+        measure_thread_scaling(trace, policy, args.capacity, args.threads, args.shards)
+
+if __name__ == "__main__":
+    main()
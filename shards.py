@@ -0,0 +1,138 @@
+import argparse
+import importlib
+import time
+import zlib
+
+from result_io import VERBOSITY_SILENT
+from sweep import POLICY_MODULES, create_policy_cache
+from trace_io import TraceFile, compile_trace, iter_chunks
+
+# Key hashes are spread over [0, SHARDS_MODULUS); a key is sampled when its hash is below rate * modulus
+SHARDS_MODULUS = 1 << 24
+SHARDS_RATE = 0.01
+# Below this many sampled slots the scaled cache is too coarse to stand in for the full one
+SHARDS_MIN_SCALED_CAPACITY = 32
+
+def shards_hash(key, seed=0):
+    # Stable across processes, unlike hash() on str, so a sample can be reproduced. CRC-32 is cheap enough to
+    # run on every operation; the murmur3 finaliser then mixes its bits, which CRC alone leaves linear in the key.
+    h = zlib.crc32(str(key).encode(), seed)
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+    return h % SHARDS_MODULUS
+
+def sample_trace(cpu_operations, rate=SHARDS_RATE, seed=0):
+    # Spatial sampling: every access to a sampled key is kept, so reuse between kept keys is preserved.
+    # The hash test is recomputed for every operation rather than remembered per key, so memory is bounded
+    # by the sample, not by the trace's key count. The whole trace is still parsed and hashed in Python,
+    # which dominates: on a 2M-operation trace the sampled estimate is only about 3x faster than one exact
+    # run, and the saving comes from replaying the small sample for each policy and capacity.
+    threshold = int(rate * SHARDS_MODULUS)
+    sampled = []
+    total_operations = 0
+    total_gets = 0
+    for chunk in iter_chunks(cpu_operations):
+        total_operations += len(chunk)
+        for operation in chunk:
+            op_type = operation[0]
+            if op_type == 'get':
+                total_gets += 1
+            elif op_type != 'put':
+                continue
+            if shards_hash(operation[1], seed) < threshold:
+                sampled.append(operation)
+    return sampled, total_operations, total_gets
+
+def scale_capacity(capacity, rate):
+    return max(round(capacity * rate), 1)
+
+def scaled_capacity_note(capacity, rate):
+    scaled = scale_capacity(capacity, rate)
+    if scaled < SHARDS_MIN_SCALED_CAPACITY:
+        return f"  (only {scaled} sampled slots, raise --rate)"
+    return ""
+
+def estimate(sampled_misses, rate, total_operations, total_gets):
+    # Misses are scaled up by the sampling rate and hits are whatever remains of the trace's known get count.
+    # This is the SHARDS-adj correction: when the sample holds more (or fewer) references than rate predicts,
+    # almost always because one very hot key fell in (or out of) it, the difference lands on the hits,
+    # which is where a hot key's references go. Dividing by the sampled get count instead would let a
+    # single sampled hot key swing the miss ratio.
+    misses = min(round(sampled_misses / rate), total_gets)
+    miss_rate = misses / total_operations if total_operations > 0 else 0.0
+    return total_gets - misses, misses, miss_rate
+
+def sampled_miss_ratio_curve(cpu_operations, policy, capacities, rate=SHARDS_RATE, seed=0, decay_factor=None):
+    # (capacity, estimated hits, estimated misses, estimated miss_rate), like the exact curves
+    # The sample is small enough that replaying it once per capacity is cheap for every policy
+    sampled, total_operations, total_gets = sample_trace(cpu_operations, rate, seed)
+    curve = []
+    module = importlib.import_module(POLICY_MODULES[policy])
+    trace = compile_trace(sampled)
+    for capacity in capacities:
+        cache = create_policy_cache(policy, scale_capacity(capacity, rate), decay_factor, trace,
+                                    trace.key_names)
+        misses = 0
+        for _, ops, keys, values in trace.chunks():
+            misses += module.count_compiled_operations(cache, ops, keys, values)[1]
+        curve.append((capacity, *estimate(misses, rate, total_operations, total_gets)))
+    return curve, len(sampled), total_operations
+
+def exact_miss_rates(cpu_operations, policy, capacities):
+    module = importlib.import_module(POLICY_MODULES[policy])
+    return [module.simulate_with_metrics(cpu_operations, policy, capacity, None, VERBOSITY_SILENT)[2]
+            for capacity in capacities]
+
+def compare_to_exact(cpu_operations, policies, capacities, rate=SHARDS_RATE, seed=0):
+    results = []
+    for policy in policies:
+        start_time = time.perf_counter()
+        curve, sampled_operations, total_operations = sampled_miss_ratio_curve(cpu_operations, policy, capacities,
+                                                                               rate, seed)
+        sampled_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        exact = exact_miss_rates(cpu_operations, policy, capacities)
+        exact_time = time.perf_counter() - start_time
+
+        print(f"\n{policy}: {sampled_operations} of {total_operations} operations sampled, "
+              f"{sampled_time:.2f}s sampled vs {exact_time:.2f}s exact")
+        print(f"{'Capacity':>10}{'Estimated':>12}{'Exact':>10}{'Error':>10}")
+        for (capacity, _, _, estimated_rate), exact_rate in zip(curve, exact):
+            error = estimated_rate - exact_rate
+            print(f"{capacity:>10}{estimated_rate * 100:>11.2f}%{exact_rate * 100:>9.2f}%{error * 100:>+9.2f}%"
+                  f"{scaled_capacity_note(capacity, rate)}")
+            results.append((policy, capacity, estimated_rate, exact_rate, error))
+    if results:
+        mean_error = sum(abs(error) for *_, error in results) / len(results)
+        print(f"\nMean absolute error: {mean_error * 100:.3f} percentage points")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate miss-ratio curves from a spatially sampled trace")
+    parser.add_argument('trace', nargs='?', default="00_cpu_operations.txt")
+    parser.add_argument('--rate', type=float, default=SHARDS_RATE, help="fraction of keys to keep")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policies', nargs='+', default=['LRU', 'LFU', 'FIFO'], choices=list(POLICY_MODULES))
+    parser.add_argument('--capacities', nargs='+', type=int, default=[100, 1000, 10000])
+    parser.add_argument('--exact', action='store_true', help="also run the exact simulation and report the error")
+    args = parser.parse_args()
+
+    cpu_operations = TraceFile(args.trace)
+    if args.exact:
+        compare_to_exact(cpu_operations, args.policies, args.capacities, args.rate, args.seed)
+        return
+
+    for policy in args.policies:
+        curve, sampled_operations, total_operations = sampled_miss_ratio_curve(cpu_operations, policy,
+                                                                               args.capacities, args.rate, args.seed)
+        print(f"\n{policy}: {sampled_operations} of {total_operations} operations sampled")
+        for capacity, hits, misses, miss_rate in curve:
+            print(f"Capacity {capacity}: Hits: {hits}, Misses: {misses}, Miss Rate: {miss_rate * 100:.2f}%"
+                  f"{scaled_capacity_note(capacity, args.rate)}")
+
+if __name__ == "__main__":
+    main()
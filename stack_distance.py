@@ -0,0 +1,256 @@
+import csv
+import importlib
+import random
+import sys
+
+from result_io import VERBOSITY_SILENT
+from trace_io import TraceFile
+
+INFINITY = float('inf')
+
+class StackNode:
+    __slots__ = ('key', 'last_access', 'priority', 'left', 'right', 'parent',
+                 'size', 'min_access', 'first_access', 'last_access_in_tree', 'decreasing')
+
+    def __init__(self, key, last_access):
+        self.key = key
+        self.last_access = last_access
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.size = 1
+        self.min_access = last_access
+        self.first_access = last_access
+        self.last_access_in_tree = last_access
+        self.decreasing = True
+
+def _update(node):
+    left = node.left
+    right = node.right
+    size = 1
+    min_access = first_access = last_access = node.last_access
+    decreasing = True
+    if left is not None:
+        left.parent = node
+        size += left.size
+        min_access = min(min_access, left.min_access)
+        first_access = left.first_access
+        decreasing = left.decreasing and left.last_access_in_tree > node.last_access
+    if right is not None:
+        right.parent = node
+        size += right.size
+        min_access = min(min_access, right.min_access)
+        last_access = right.last_access_in_tree
+        decreasing = decreasing and right.decreasing and node.last_access > right.first_access
+    node.size = size
+    node.min_access = min_access
+    node.first_access = first_access
+    node.last_access_in_tree = last_access
+    node.decreasing = decreasing
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+def _split(node, count):
+    # First `count` stack entries go left, the rest go right
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left is not None else 0
+    if count <= left_size:
+        first, node.left = _split(node.left, count)
+        _update(node)
+        if first is not None:
+            first.parent = None
+        return first, node
+    node.right, rest = _split(node.right, count - left_size - 1)
+    _update(node)
+    if rest is not None:
+        rest.parent = None
+    return node, rest
+
+def _rank(node):
+    rank = node.left.size if node.left is not None else 0
+    while node.parent is not None:
+        parent = node.parent
+        if parent.right is node:
+            rank += 1 + (parent.left.size if parent.left is not None else 0)
+        node = parent
+    return rank
+
+def _first_ascent(node):
+    # Index of the first entry accessed more recently than the entry above it
+    previous = INFINITY
+    offset = 0
+    while node is not None:
+        left = node.left
+        if left is not None:
+            if previous < left.first_access or not left.decreasing:
+                node = left
+                continue
+            previous = left.last_access_in_tree
+            offset += left.size
+        if previous < node.last_access:
+            return offset
+        previous = node.last_access
+        offset += 1
+        node = node.right
+    return None
+
+def _first_older(node, threshold):
+    # Index of the first entry whose last access is older than threshold
+    offset = 0
+    while node is not None:
+        left = node.left
+        if left is not None and left.min_access < threshold:
+            node = left
+            continue
+        left_size = left.size if left is not None else 0
+        if node.last_access < threshold:
+            return offset + left_size
+        offset += left_size + 1
+        node = node.right
+        if node is None or node.min_access >= threshold:
+            return None
+    return None
+
+class LRUStackDistance:
+    # Mattson stack for LRUCache semantics: puts move a key to the top, gets only refresh its last access.
+    # Because a get miss does not install the key, the stack is not ordered purely by recency: on a put,
+    # each prefix-minimum (oldest-so-far) entry above the put key slides below the run of newer entries
+    # that follows it. Runs with nothing to slide past are skipped in O(log n), so a put costs
+    # O((g + 1) log n) where g is the number of entries that actually move.
+    def __init__(self):
+        self.root = None
+        self.nodes = {}
+        self.time = 0
+        # depth_counts[d] = number of gets that found their key at stack depth d
+        self.depth_counts = {}
+        self.cold_misses = 0
+        self.total_operations = 0
+
+    def get(self, key):
+        self.time += 1
+        node = self.nodes.get(key)
+        if node is None:
+            self.cold_misses += 1
+            return None
+        depth = _rank(node) + 1
+        self.depth_counts[depth] = self.depth_counts.get(depth, 0) + 1
+        node.last_access = self.time
+        while node is not None:
+            _update(node)
+            node = node.parent
+        return depth
+
+    def put(self, key):
+        self.time += 1
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = StackNode(key, self.time)
+            above, below = self.root, None
+        else:
+            above, rest = _split(self.root, _rank(node))
+            node, below = _split(rest, 1)
+            node.last_access = self.time
+            _update(node)
+        self.root = _merge(_merge(node, self._slide_oldest(above)), below)
+        self.root.parent = None
+
+    def _slide_oldest(self, stack):
+        result = None
+        while stack is not None:
+            ascent = _first_ascent(stack)
+            if ascent is None:
+                return _merge(result, stack)
+            run, stack = _split(stack, ascent - 1)
+            oldest, stack = _split(stack, 1)
+            older = _first_older(stack, oldest.last_access)
+            if older is None:
+                newer, stack = stack, None
+            else:
+                newer, stack = _split(stack, older)
+            result = _merge(_merge(_merge(result, run), newer), oldest)
+        return result
+
+    def process(self, cpu_operations):
+        for operation in cpu_operations:
+            op_type, *op_args = operation
+            self.total_operations += 1
+            if op_type == 'get':
+                self.get(op_args[0])
+            elif op_type == 'put':
+                self.put(op_args[0])
+        return self
+
+    def max_depth(self):
+        return max(self.depth_counts, default=0)
+
+    def miss_ratio_curve(self, capacities=None):
+        # (capacity, hits, misses, miss_rate) with rates over all operations, as in simulate_with_metrics
+        if capacities is None:
+            capacities = range(1, self.max_depth() + 1)
+        total_gets = self.cold_misses + sum(self.depth_counts.values())
+        hits_at = {}
+        hits = 0
+        for depth in range(1, self.max_depth() + 1):
+            hits += self.depth_counts.get(depth, 0)
+            hits_at[depth] = hits
+
+        curve = []
+        for capacity in capacities:
+            hits = hits_at.get(min(capacity, self.max_depth()), 0)
+            misses = total_gets - hits
+            miss_rate = misses / self.total_operations if self.total_operations > 0 else 0.0
+            curve.append((capacity, hits, misses, miss_rate))
+        return curve
+
+def lru_miss_ratio_curve(cpu_operations, capacities=None):
+    return LRUStackDistance().process(cpu_operations).miss_ratio_curve(capacities)
+
+def cross_check_lru(cpu_operations, curve):
+    # Replays LRUCache at each capacity of the curve and returns the capacities that disagree
+    cache_simulation = importlib.import_module('01_cache_simulation')
+    mismatches = []
+    for capacity, hits, misses, _ in curve:
+        cache_hits, cache_misses, _ = cache_simulation.simulate_with_metrics(cpu_operations, 'LRU', capacity, None,
+                                                                             VERBOSITY_SILENT)
+        if (cache_hits, cache_misses) != (hits, misses):
+            mismatches.append((capacity, (hits, misses), (cache_hits, cache_misses)))
+    return mismatches
+
+def write_miss_ratio_curve(curve, output_filename):
+    with open(output_filename, 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(['Capacity', 'Hits', 'Misses', 'Miss Rate'])
+        for capacity, hits, misses, miss_rate in curve:
+            csvwriter.writerow([capacity, hits, misses, f'{miss_rate:.6f}'])
+
+def main():
+    trace_filename = sys.argv[1] if len(sys.argv) > 1 else "00_cpu_operations.txt"
+    cpu_operations = TraceFile(trace_filename)
+
+    curve = lru_miss_ratio_curve(cpu_operations)
+    for capacity, hits, misses, miss_rate in curve:
+        print(f"Capacity: {capacity}, Hits: {hits}, Misses: {misses}, Miss Rate: {miss_rate * 100:.2f}%")
+    write_miss_ratio_curve(curve, 'LRU_miss_ratio_curve.csv')
+
+    mismatches = cross_check_lru(cpu_operations, curve)
+    if mismatches:
+        for capacity, expected, actual in mismatches:
+            print(f"Mismatch at capacity {capacity}: stack distance {expected}, LRUCache {actual}")
+        sys.exit(1)
+    print(f"Cross-check against LRUCache passed for {len(curve)} capacities")
+
+if __name__ == "__main__":
+    main()
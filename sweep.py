@@ -0,0 +1,156 @@
+import concurrent.futures
+import csv
+import importlib
+import sys
+import time
+from contextlib import nullcontext
+from itertools import product
+
+from trace_io import SharedTrace, TraceFile, compile_trace, share_trace
+
+POLICY_MODULES = {
+    'LRU': '01_cache_simulation',
+    'LFU': '01_cache_simulation',
+    'FIFO': '01_cache_simulation',
+    'ArrayLRU': '01_cache_simulation',
+    'ArrayFIFO': '01_cache_simulation',
+    'ARC': '01_cache_simulation',
+    '2Q': '01_cache_simulation',
+    'WTinyLFU': '01_cache_simulation',
+    'CLOCK': '01_cache_simulation',
+    'S3FIFO': '01_cache_simulation',
+    'OPT': '01_cache_simulation',
+    'AdaptiveFIFO': '02_adapted_simulation',
+    'AdaptiveLRU': '02_adapted_simulation',
+    'AdaptiveLFU': '02_adapted_simulation',
+    'CompactAdaptiveFIFO': '02_adapted_simulation',
+    'CompactAdaptiveLRU': '02_adapted_simulation',
+    'CompactAdaptiveLFU': '02_adapted_simulation',
+}
+# Offline policies need the whole trace up front, so they cannot serve live or synthetic requests
+OFFLINE_POLICIES = {'OPT'}
+ONLINE_POLICIES = [policy for policy in POLICY_MODULES if policy not in OFFLINE_POLICIES]
+ADAPTIVE_POLICIES = {'AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU', 'CompactAdaptiveFIFO', 'CompactAdaptiveLRU',
+                     'CompactAdaptiveLFU'}
+
+# Compiled traces kept per worker process, so each worker decodes a shared trace once for all its runs
+_worker_traces = {}
+
+def build_sweep_grid(policies, capacities, decay_factors):
+    # decay_factor only applies to the adaptive policies; the others get a single None entry
+    configs = []
+    for policy, capacity in product(policies, capacities):
+        if policy not in POLICY_MODULES:
+            raise ValueError(f"Invalid cache type '{policy}'. Choose from {', '.join(POLICY_MODULES)}.")
+        if policy in ADAPTIVE_POLICIES:
+            configs.extend((policy, capacity, decay_factor) for decay_factor in decay_factors)
+        else:
+            configs.append((policy, capacity, None))
+    return configs
+
+def create_policy_cache(policy, capacity, decay_factor=None, trace=None, key_names=None):
+    # key_names: the original keys, when the cache is replayed on the key ids of a compiled trace
+    module = importlib.import_module(POLICY_MODULES[policy])
+    if policy in OFFLINE_POLICIES:
+        return module.create_cache(policy, capacity, trace=trace)
+    if policy not in ADAPTIVE_POLICIES:
+        return module.create_cache(policy, capacity, key_names=key_names)
+    if decay_factor is None:
+        return module.create_cache(policy, capacity)
+    return module.create_cache(policy, capacity, decay_factor=decay_factor)
+
+def _load_trace(cpu_operations):
+    if not isinstance(cpu_operations, SharedTrace):
+        return cpu_operations
+    trace = _worker_traces.get(cpu_operations.shm_name)
+    if trace is None:
+        trace = _worker_traces[cpu_operations.shm_name] = compile_trace(cpu_operations)
+    return trace
+
+def run_sweep_config(cpu_operations, policy, capacity, decay_factor):
+    trace = _load_trace(cpu_operations)
+    cache = create_policy_cache(policy, capacity, decay_factor, trace, trace.key_names)
+    module = importlib.import_module(POLICY_MODULES[policy])
+
+    cache_hits = 0
+    cache_misses = 0
+    total_operations = 0
+    start_time = time.perf_counter()
+    for _, ops, keys, values in trace.chunks():
+        hits, misses = module.count_compiled_operations(cache, ops, keys, values)
+        cache_hits += hits
+        cache_misses += misses
+        total_operations += len(ops)
+    execution_time = time.perf_counter() - start_time
+
+    miss_rate = cache_misses / total_operations if total_operations > 0 else 0.0
+    hit_rate = cache_hits / total_operations if total_operations > 0 else 0.0
+    return policy, capacity, decay_factor, cache_hits, cache_misses, miss_rate, hit_rate, execution_time
+
+def run_sweep(cpu_operations, policies, capacities, decay_factors=(0.5,), backend='process', max_workers=None):
+    configs = build_sweep_grid(policies, capacities, decay_factors)
+
+    if backend == 'process':
+        # The trace is parsed once into shared memory and decoded at most once per worker
+        trace_context = share_trace(cpu_operations)
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+    elif backend == 'thread':
+        trace_context = nullcontext(compile_trace(cpu_operations))
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+    else:
+        raise ValueError("Invalid backend. Choose from 'thread' or 'process'.")
+
+    with trace_context as trace, executor:
+        futures = [executor.submit(run_sweep_config, trace, *config) for config in configs]
+        return [future.result() for future in futures]
+
+def print_sweep_results(results):
+    print(f"{'Policy':<22}{'Capacity':>10}{'Decay':>8}{'Hits':>10}{'Misses':>10}{'Miss Rate':>11}{'Hit Rate':>10}"
+          f"{'Time (s)':>10}")
+    for policy, capacity, decay_factor, hits, misses, miss_rate, hit_rate, execution_time in results:
+        decay = '-' if decay_factor is None else f'{decay_factor:g}'
+        print(f"{policy:<22}{capacity:>10}{decay:>8}{hits:>10}{misses:>10}{miss_rate * 100:>10.2f}%"
+              f"{hit_rate * 100:>9.2f}%{execution_time:>10.3f}")
+
+def print_opt_gap(results):
+    # Each policy's hits as a share of OPT's at the same capacity. OPT is Belady's MIN, an offline reference
+    # rather than a bound (see BeladyCache), so a share above 100% is possible.
+    best_hits = {capacity: hits for policy, capacity, _, hits, *_ in results if policy == 'OPT'}
+    if not best_hits:
+        return
+    print(f"\n{'Policy':<22}{'Capacity':>10}{'Decay':>8}{'Of OPT hits':>13}")
+    for policy, capacity, decay_factor, hits, *_ in results:
+        if policy == 'OPT' or capacity not in best_hits:
+            continue
+        decay = '-' if decay_factor is None else f'{decay_factor:g}'
+        share = hits / best_hits[capacity] if best_hits[capacity] > 0 else 1.0
+        print(f"{policy:<22}{capacity:>10}{decay:>8}{share * 100:>12.1f}%")
+
+def write_sweep_results(results, output_filename):
+    with open(output_filename, 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(['Policy', 'Capacity', 'Decay Factor', 'Hits', 'Misses', 'Miss Rate', 'Hit Rate',
+                            'Execution Time'])
+        for policy, capacity, decay_factor, hits, misses, miss_rate, hit_rate, execution_time in results:
+            csvwriter.writerow([policy, capacity, '' if decay_factor is None else decay_factor, hits, misses,
+                                f'{miss_rate:.6f}', f'{hit_rate:.6f}', f'{execution_time:.6f}'])
+
+def main():
+    trace_filename = sys.argv[1] if len(sys.argv) > 1 else "00_cpu_operations.txt"
+    cpu_operations = TraceFile(trace_filename)
+
+    policies = list(POLICY_MODULES)
+    capacities = [int(size) for size in input("Enter cache sizes (comma separated): ").split(',')]
+    decay_factors = [float(factor) for factor in input("Enter decay factors (comma separated): ").split(',')]
+
+    start_time = time.perf_counter()
+    results = run_sweep(cpu_operations, policies, capacities, decay_factors)
+    total_execution_time = time.perf_counter() - start_time
+
+    print_sweep_results(results)
+    print_opt_gap(results)
+    write_sweep_results(results, 'sweep_results.csv')
+    print(f"\n{len(results)} runs, Total Execution Time: {total_execution_time:.2f} seconds")
+
+if __name__ == "__main__":
+    main()
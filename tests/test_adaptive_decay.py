@@ -0,0 +1,119 @@
+import importlib
+import random
+
+import pytest
+
+adapted_simulation = importlib.import_module('02_adapted_simulation')
+
+ADAPTIVE_CACHES = ('AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU',
+                   'CompactAdaptiveFIFO', 'CompactAdaptiveLRU', 'CompactAdaptiveLFU')
+
+class PerStepDecayCache:
+    # The adaptive caches before the lazy scale: every other count is multiplied on every put-hit, and the
+    # victim is min() over (count, key). FIFO neither increments nor reorders on a hit.
+    def __init__(self, capacity, decay_factor, counts_hits):
+        self.capacity = capacity
+        self.decay_factor = decay_factor
+        self.counts_hits = counts_hits
+        self.cache = {}
+        self.frequency = {}
+
+    def get(self, key):
+        if key not in self.cache:
+            return -1
+        if self.counts_hits:
+            self.frequency[key] += 1
+            self.cache[key] = self.cache.pop(key)
+        return self.cache[key]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        if key in self.cache:
+            if self.counts_hits:
+                self.frequency[key] += 1
+                self.cache.pop(key)
+            self.cache[key] = value
+            for other in self.frequency:
+                if other != key:
+                    self.frequency[other] *= self.decay_factor
+        else:
+            if len(self.cache) >= self.capacity:
+                min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
+                del self.cache[min_key]
+                del self.frequency[min_key]
+            self.cache[key] = value
+            self.frequency[key] = 1
+
+def replay(cache, operations):
+    results = []
+    for op_type, *op_args in operations:
+        if op_type == 'get':
+            results.append(cache.get(op_args[0]))
+        else:
+            cache.put(op_args[0], op_args[1])
+    return results, list(cache.cache.items())
+
+def hot_key_trace(seed, length=8000, keys=30):
+    # Most operations rewrite one hot key, so cold keys sit through well over the ~1075 halvings that
+    # underflow a count to 0.0 before they are touched again
+    rng = random.Random(seed)
+    operations = []
+    for _ in range(length):
+        if rng.random() < 0.9:
+            operations.append(('put', 0, rng.randrange(10)))
+        elif rng.random() < 0.5:
+            operations.append(('put', rng.randrange(1, keys), rng.randrange(10)))
+        else:
+            operations.append(('get', rng.randrange(1, keys)))
+    return operations
+
+def random_trace(seed, length=300):
+    # Few keys and small caches, so evictions keep choosing between counts a handful of decays apart
+    rng = random.Random(seed)
+    keys = rng.randrange(3, 12)
+    operations = []
+    for _ in range(length):
+        if rng.random() < 0.7:
+            operations.append(('put', rng.randrange(keys), rng.randrange(10)))
+        else:
+            operations.append(('get', rng.randrange(keys)))
+    return operations
+
+@pytest.mark.parametrize('cache_type', ADAPTIVE_CACHES)
+def test_underflowed_counts_tie_on_key(cache_type):
+    cache = adapted_simulation.create_cache(cache_type, 3, 0.5)
+    cache.put('A', 1)
+    cache.get('A')
+    cache.put('B', 1)
+    for _ in range(1101):
+        cache.put('X', 1)
+    cache.put('C', 1)
+    # A and B both decayed to 0.0, so the smaller key goes
+    assert sorted(cache.cache) == ['B', 'C', 'X']
+
+@pytest.mark.parametrize('cache_type', ['AdaptiveFIFO', 'CompactAdaptiveFIFO'])
+def test_rounded_decay_ties_break_on_key(cache_type):
+    # At 0.9 every FIFO count is 0.9 multiplied in n times; keys decayed equally often tie exactly and the
+    # smaller key goes, which a count rescaled by 0.9 ** n gets wrong by an ulp
+    cache = adapted_simulation.create_cache(cache_type, 4, 0.9)
+    for key in [0, 1, 1, 5, 0, 3, 0, 5, 5, 5, 0, 1, 4, 5, 0, 4, 0, 3, 3, 5, 5, 2, 2, 1, 0, 5, 4]:
+        cache.put(key, key)
+    assert list(cache.cache) == [2, 1, 5, 4]
+
+@pytest.mark.parametrize('decay_factor', [0.9, 0.75, 0.3, 0.1])
+@pytest.mark.parametrize('cache_type', ADAPTIVE_CACHES)
+def test_matches_per_step_decay_on_random_traces(cache_type, decay_factor):
+    for seed in range(100):
+        operations = random_trace(seed)
+        capacity = seed % 5 + 1
+        expected = replay(PerStepDecayCache(capacity, decay_factor, not cache_type.endswith('FIFO')), operations)
+        assert replay(adapted_simulation.create_cache(cache_type, capacity, decay_factor), operations) == expected
+
+@pytest.mark.parametrize('decay_factor', [0.9, 0.75, 0.5, 0.3, 0.25, 0.0, 1.0])
+@pytest.mark.parametrize('cache_type', ADAPTIVE_CACHES)
+@pytest.mark.parametrize('capacity', [1, 3, 25])
+def test_matches_per_step_decay(cache_type, capacity, decay_factor):
+    operations = hot_key_trace(capacity)
+    expected = replay(PerStepDecayCache(capacity, decay_factor, not cache_type.endswith('FIFO')), operations)
+    assert replay(adapted_simulation.create_cache(cache_type, capacity, decay_factor), operations) == expected
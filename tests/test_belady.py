@@ -0,0 +1,19 @@
+import importlib
+
+import pytest
+
+from result_io import VERBOSITY_SILENT
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+OPERATIONS = [('put', '1', '1'), ('put', '2', '2'), ('get', '1'), ('put', '3', '3'), ('get', '2'), ('get', '1')]
+
+def test_opt_rejects_a_one_shot_trace():
+    with pytest.raises(ValueError, match="not an iterator"):
+        cache_simulation.create_cache('OPT', 2, trace=iter(OPERATIONS))
+    with pytest.raises(ValueError, match="not an iterator"):
+        cache_simulation.simulate_with_metrics((operation for operation in OPERATIONS), 'OPT', 2, None)
+
+def test_opt_replays_a_list():
+    cache_hits, cache_misses, _ = cache_simulation.simulate_with_metrics(OPERATIONS, 'OPT', 2, None, VERBOSITY_SILENT)
+    assert (cache_hits, cache_misses) == (3, 0)
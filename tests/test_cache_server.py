@@ -0,0 +1,47 @@
+import asyncio
+import importlib
+import random
+
+import cache_server
+from result_io import VERBOSITY_SILENT
+from sweep import create_policy_cache
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+def random_operations(seed, length=3000):
+    rng = random.Random(seed)
+    operations = []
+    for step in range(length):
+        key = str(int(rng.paretovariate(1.0)) % 60)
+        draw = rng.random()
+        operations.append(('get', key) if draw < 0.6 else ('put', key, f'value-{step}') if draw < 0.95
+                          else ('compute',))
+    return operations
+
+async def serve_and_load(policy, capacity, operations, connections, pipeline_depth):
+    server = cache_server.CacheServer(create_policy_cache(policy, capacity))
+    listener = await cache_server.start_server(server, port=0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        counters, _, _ = await cache_server.run_load(operations, port=port, connections=connections,
+                                                     pipeline_depth=pipeline_depth)
+        stats = await cache_server.fetch_stats(port=port)
+    return server, counters, stats
+
+def test_single_connection_replay_matches_the_simulation():
+    # One connection keeps the trace order, so a pipelined replay must see exactly the simulated hits
+    operations = random_operations(0)
+    for policy in ['LRU', 'LFU', 'ARC']:
+        server, counters, stats = asyncio.run(serve_and_load(policy, 10, operations, 1, 64))
+        hits, misses, _ = cache_simulation.simulate_with_metrics(operations, policy, 10, None, VERBOSITY_SILENT)
+        assert (counters['hits'], counters['misses']) == (hits, misses)
+        assert (int(stats['get_hits']), int(stats['get_misses'])) == (hits, misses)
+        assert counters['completed'] == sum(1 for operation in operations if operation[0] != 'compute')
+
+def test_concurrent_connections_answer_every_request():
+    operations = random_operations(1)
+    server, counters, _ = asyncio.run(serve_and_load('LRU', 10, operations, 4, 8))
+    gets = sum(1 for operation in operations if operation[0] == 'get')
+    assert counters['hits'] + counters['misses'] == gets == server.hits + server.misses
+    assert counters['completed'] == sum(1 for operation in operations if operation[0] != 'compute')
+    assert server.service_times.count == server.requests
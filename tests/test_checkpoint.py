@@ -0,0 +1,72 @@
+import importlib
+import random
+
+import pytest
+
+import checkpoint
+from result_io import VERBOSITY_SILENT
+from trace_io import TraceFile
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+def write_trace(path, length=3000, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(length):
+        key = rng.randrange(50)
+        lines.append(f'put {key} {rng.randrange(100)}\n' if rng.random() < 0.4 else f'get {key}\n')
+    path.write_text(''.join(lines))
+    return lines
+
+def test_resume_seeks_to_the_saved_position(tmp_path, monkeypatch):
+    trace_path = tmp_path / 'trace.txt'
+    lines = write_trace(trace_path)
+    # Small read chunks, so the run is checkpointed many times before it is interrupted
+    trace = TraceFile(str(trace_path), chunk_bytes=256)
+    expected = checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'full.ckpt'),
+                                                    str(tmp_path / 'full.csv'), 1, VERBOSITY_SILENT)
+
+    run_operations = cache_simulation.run_operations
+    calls = []
+    def interrupted(*args, **kwargs):
+        calls.append(1)
+        if len(calls) > 40:
+            raise KeyboardInterrupt
+        return run_operations(*args, **kwargs)
+    monkeypatch.setattr(cache_simulation, 'run_operations', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'run.ckpt'),
+                                             str(tmp_path / 'run.csv'), 1, VERBOSITY_SILENT)
+    monkeypatch.undo()
+
+    state = checkpoint.load_checkpoint(str(tmp_path / 'run.ckpt'))
+    assert 0 < state['offset'] < len(lines)
+    assert state['position'] == sum(len(line) for line in lines[:state['offset']])
+
+    resumed = checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'run.ckpt'),
+                                                   str(tmp_path / 'run.csv'), 1, VERBOSITY_SILENT)
+    assert resumed == expected
+    assert (tmp_path / 'run.csv').read_text() == (tmp_path / 'full.csv').read_text()
+
+def test_resume_rejects_an_output_the_checkpoint_lacks(tmp_path):
+    trace_path = tmp_path / 'trace.txt'
+    write_trace(trace_path)
+    trace = TraceFile(str(trace_path))
+    checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'run.ckpt'), None, 1, VERBOSITY_SILENT)
+    with pytest.raises(ValueError, match="without an output CSV"):
+        checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'run.ckpt'),
+                                             str(tmp_path / 'run.csv'), 1, VERBOSITY_SILENT)
+
+def test_resuming_a_finished_checkpoint_reports_it(tmp_path, capsys):
+    trace_path = tmp_path / 'trace.txt'
+    write_trace(trace_path)
+    trace = TraceFile(str(trace_path))
+    expected = checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'run.ckpt'),
+                                                    str(tmp_path / 'run.csv'), 1000, VERBOSITY_SILENT)
+    assert checkpoint.load_checkpoint(str(tmp_path / 'run.ckpt'))['finished']
+    output = (tmp_path / 'run.csv').read_text()
+
+    assert checkpoint.simulate_with_checkpoints(trace, 'LRU', 20, str(tmp_path / 'run.ckpt'),
+                                                str(tmp_path / 'run.csv')) == expected
+    assert 'already covers the whole trace (3000 operations)' in capsys.readouterr().out
+    assert (tmp_path / 'run.csv').read_text() == output
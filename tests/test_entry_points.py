@@ -0,0 +1,42 @@
+import os
+import shutil
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADAPTIVE_CACHES = ('AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU')
+
+def run_script(script, tmp_path, stdin):
+    # Run from a scratch directory holding a copy of the committed trace, so the tracked CSVs are left alone
+    shutil.copy(os.path.join(REPO, '00_cpu_operations.txt'), tmp_path)
+    return subprocess.run([sys.executable, os.path.join(REPO, script)], input=stdin, cwd=tmp_path,
+                          capture_output=True, text=True, timeout=300)
+
+def test_adapted_simulation_main(tmp_path):
+    completed = run_script('02_adapted_simulation.py', tmp_path, '5\n')
+    assert completed.returncode == 0, completed.stderr
+
+    with open(tmp_path / '00_cpu_operations.txt') as trace:
+        operations = sum(1 for line in trace if line.strip())
+    for cache_type in ADAPTIVE_CACHES:
+        sequential = (tmp_path / f'{cache_type}_sequential_results.csv').read_text()
+        parallel = (tmp_path / f'{cache_type}_parallel_results.csv').read_text()
+        assert len(sequential.splitlines()) == operations + 1
+        assert parallel == sequential
+
+def test_benchmark_without_baseline(tmp_path):
+    completed = subprocess.run([sys.executable, os.path.join(REPO, 'benchmark.py'), '--policies', 'LRU',
+                                '--workloads', 'uniform', '--capacities', '10', '--operations', '200',
+                                '--repeats', '1', '--baseline', str(tmp_path / 'missing.json')],
+                               cwd=tmp_path, capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr
+    assert 'skipping the regression check' in completed.stdout
+
+def test_cache_simulation_shared_and_scaling_flags(tmp_path):
+    shutil.copy(os.path.join(REPO, '00_cpu_operations.txt'), tmp_path)
+    completed = subprocess.run([sys.executable, os.path.join(REPO, '01_cache_simulation.py'), '--shared', '--scaling'],
+                               input='5\n', cwd=tmp_path, capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr
+    assert 'Parallel scaling (process backend):' in completed.stdout
+    assert 'Workers: 1,' in completed.stdout
+    assert completed.stdout.count('\nFIFO:') == 1
@@ -0,0 +1,30 @@
+import importlib
+import random
+
+import pytest
+
+import footprint
+from result_io import VERBOSITY_SILENT
+
+adapted_simulation = importlib.import_module('02_adapted_simulation')
+
+@pytest.mark.parametrize('policy', ['AdaptiveFIFO', 'AdaptiveLRU', 'AdaptiveLFU'])
+def test_compact_caches_replay_like_the_originals(tmp_path, policy):
+    rng = random.Random(0)
+    operations = [('get', str(rng.randrange(40))) if rng.random() < 0.5 else ('put', str(rng.randrange(40)), '1')
+                  for _ in range(3000)]
+    expected = adapted_simulation.simulate_with_metrics(operations, policy, 10, str(tmp_path / 'plain.csv'),
+                                                        VERBOSITY_SILENT)
+    assert adapted_simulation.simulate_with_metrics(operations, f'Compact{policy}', 10,
+                                                    str(tmp_path / 'compact.csv'), VERBOSITY_SILENT) == expected
+    assert (tmp_path / 'compact.csv').read_text() == (tmp_path / 'plain.csv').read_text()
+
+@pytest.mark.parametrize('policy, smaller, direct_index', [('AdaptiveLRU', 'CompactAdaptiveLRU', False),
+                                                           ('AdaptiveLFU', 'CompactAdaptiveLFU', False),
+                                                           ('LRU', 'ArrayLRU', True),
+                                                           ('FIFO', 'ArrayFIFO', True)])
+def test_footprint_reports_the_smaller_layouts(policy, smaller, direct_index):
+    # Measured at 20000 entries: about 340 vs 170 bytes for the adaptive pairs, 85 vs 32 and 75 vs 24 otherwise
+    bytes_per_entry, _ = footprint.measure_bytes_per_entry(policy, 20000)
+    smaller_bytes_per_entry, _ = footprint.measure_bytes_per_entry(smaller, 20000, direct_index)
+    assert smaller_bytes_per_entry < 0.6 * bytes_per_entry
@@ -0,0 +1,32 @@
+import importlib
+
+import numpy as np
+
+gpu_simulation = importlib.import_module('06_gpu_simulation')
+
+def random_trace(seed, length=2000, key_space=60):
+    rng = np.random.default_rng(seed)
+    operations = []
+    for op, key in zip(rng.integers(0, 10, size=length).tolist(), rng.zipf(1.3, size=length).tolist()):
+        key = str(key % key_space)
+        operations.append(('get', key) if op < 6 else ('put', key, key) if op < 9 else ('compute',))
+    return operations
+
+def test_batched_results_match_the_cache_classes():
+    operations = random_trace(0)
+    policies = ['FIFO', 'LRU'] * 6
+    capacities = [1, 1, 2, 2, 5, 5, 10, 10, 30, 30, 100, 100]
+    results = gpu_simulation.simulate_batched(operations, policies, capacities)
+    assert gpu_simulation.cross_check(operations, results) == []
+
+def test_configs_over_the_memory_budget_run_in_batches():
+    operations = random_trace(1)
+    _, _, key_count = gpu_simulation.compile_operations(operations)
+    policies = ['FIFO', 'LRU'] * 5
+    capacities = [3, 3, 7, 7, 12, 12, 20, 20, 40, 40]
+    # Room for three stamp rows at a time
+    memory_bytes = 3 * key_count * 4
+    assert gpu_simulation.configs_per_batch(key_count, len(operations), memory_bytes) == 3
+    batched = gpu_simulation.simulate_batched(operations, policies, capacities, memory_bytes)
+    assert batched == gpu_simulation.simulate_batched(operations, policies, capacities)
+    assert gpu_simulation.configs_per_batch(key_count, len(operations), 1) == 1
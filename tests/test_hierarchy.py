@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from hierarchy import CacheHierarchy
+
+LEVELS = [('LRU', 4), ('ARC', 8), ('2Q', 16)]
+
+def random_operations(seed, length=3000, key_space=60):
+    rng = random.Random(seed)
+    for _ in range(length):
+        key = int(rng.paretovariate(0.8)) % key_space
+        yield ('put', key) if rng.random() < 0.4 else ('get', key)
+
+def replay(hierarchy, operations):
+    for op_type, key in operations:
+        if op_type == 'get':
+            hierarchy.get(key)
+        else:
+            hierarchy.put(key, key)
+        yield [set(level.cache.cache) for level in hierarchy.levels]
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_inclusive_levels_stay_subsets(seed):
+    hierarchy = CacheHierarchy(LEVELS, 'inclusive')
+    for contents in replay(hierarchy, random_operations(seed)):
+        for upper, lower in zip(contents, contents[1:]):
+            assert upper <= lower
+    assert all(level.invalidations > 0 for level in hierarchy.levels[:-1])
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_exclusive_levels_never_share_a_key(seed):
+    hierarchy = CacheHierarchy(LEVELS, 'exclusive')
+    for contents in replay(hierarchy, random_operations(seed)):
+        assert sum(len(keys) for keys in contents) == len(set().union(*contents))
+    assert all(level.evictions > 0 for level in hierarchy.levels)
+
+def test_inclusive_back_invalidation_counts():
+    hierarchy = CacheHierarchy([('LRU', 2), ('LRU', 2)], 'inclusive')
+    # The get hits L1 only, so L2 still has a as its oldest key: putting c evicts a from L2 and with it
+    # from L1. b, refreshed in L1 but oldest in L2, is invalidated the same way by d.
+    operations = [('put', 'a'), ('put', 'b'), ('get', 'a'), ('put', 'c'), ('get', 'b'), ('put', 'd')]
+    list(replay(hierarchy, operations))
+    l1, l2 = hierarchy.levels
+    assert (l1.invalidations, l1.evictions, l2.invalidations, l2.evictions) == (2, 0, 0, 2)
+    assert list(l1.cache.cache) == ['c', 'd'] and list(l2.cache.cache) == ['c', 'd']
+    assert (l1.hits, l2.hits) == (2, 0)
@@ -0,0 +1,52 @@
+import importlib
+import random
+
+import pytest
+
+from latency import LATENCY_CATEGORIES, LatencyHistogram, LatencyRecorder
+from result_io import VERBOSITY_SILENT
+
+def nearest_rank(values, percent):
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * percent / 100 + 0.5), 1) - 1]
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert [histogram.percentile(percent) for percent in (1, 50, 99, 100)] == [1, 50, 99, 100]
+    assert histogram.mean() == 50.5
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_percentiles_stay_within_the_bucket_precision(seed):
+    rng = random.Random(seed)
+    values = [int(rng.lognormvariate(8, 2)) + 1 for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    for percent in (50, 90, 99, 99.9):
+        exact = nearest_rank(values, percent)
+        assert exact <= histogram.percentile(percent) <= exact * (1 + 2 ** -6)
+    assert histogram.percentile(100) == histogram.max == max(values)
+
+@pytest.mark.parametrize('module_name, policy', [('01_cache_simulation', 'LRU'),
+                                                 ('02_adapted_simulation', 'AdaptiveLFU')])
+def test_recorder_leaves_the_replay_unchanged(tmp_path, module_name, policy):
+    module = importlib.import_module(module_name)
+    rng = random.Random(0)
+    operations = [('get', str(rng.randrange(30))) if rng.random() < 0.5 else ('put', str(rng.randrange(30)), '1')
+                  for _ in range(20000)]
+    expected = module.simulate_with_metrics(operations, policy, 8, str(tmp_path / 'plain.csv'), VERBOSITY_SILENT)
+    recorder = LatencyRecorder(seed=1)
+    assert module.simulate_with_metrics(operations, policy, 8, str(tmp_path / 'timed.csv'), VERBOSITY_SILENT,
+                                        recorder=recorder) == expected
+    assert (tmp_path / 'timed.csv').read_text() == (tmp_path / 'plain.csv').read_text()
+
+    histograms = recorder.histograms
+    sampled = sum(histograms[category].count for category in ('get', 'put-hit', 'put-miss', 'put-miss-evict'))
+    assert recorder.operations == len(operations)
+    assert len(operations) / 64 * 0.8 < sampled < len(operations) / 64 * 1.2
+    assert histograms['output'].count == sampled
+    assert set(LATENCY_CATEGORIES) == set(histograms)
+    if policy.startswith('Adaptive'):
+        assert histograms['decay'].count > 0
@@ -0,0 +1,55 @@
+import importlib
+import random
+
+import pytest
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+class ScanLFU:
+    # The original LFUCache: a full scan for the smallest (frequency, key) on every eviction
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.cache = {}
+        self.frequency = {}
+
+    def get(self, key):
+        if key in self.cache:
+            self.frequency[key] += 1
+            return self.cache[key]
+        return -1
+
+    def put(self, key, value):
+        evicted = None
+        if key in self.cache:
+            self.cache[key] = value
+            self.frequency[key] += 1
+        else:
+            if len(self.cache) >= self.capacity:
+                min_key = min(self.frequency, key=lambda k: (self.frequency[k], k))
+                evicted = min_key, self.cache.pop(min_key)
+                del self.frequency[min_key]
+            self.cache[key] = value
+            self.frequency[key] = 1
+        return evicted
+
+    def remove(self, key):
+        if key not in self.cache:
+            return -1
+        del self.frequency[key]
+        return self.cache.pop(key)
+
+@pytest.mark.parametrize('seed, capacity', [(0, 1), (1, 4), (2, 16), (3, 50)])
+def test_buckets_evict_like_the_full_scan(seed, capacity):
+    rng = random.Random(seed)
+    cache = cache_simulation.LFUCache(capacity)
+    reference = ScanLFU(capacity)
+    for step in range(5000):
+        key = str(int(rng.paretovariate(0.9)) % 120)
+        draw = rng.random()
+        if draw < 0.5:
+            assert cache.get(key) == reference.get(key)
+        elif draw < 0.95:
+            assert cache.put(key, step) == reference.put(key, step)
+        else:
+            assert cache.remove(key) == reference.remove(key)
+    assert cache.cache == reference.cache and cache.frequency == reference.frequency
@@ -0,0 +1,39 @@
+import importlib
+
+from result_io import VERBOSITY_SILENT
+from trace_io import share_trace
+
+simulation = importlib.import_module('01_cache_simulation')
+
+def mixed_key_trace():
+    # Non-numeric keys, and keys that only differ by leading zeros
+    operations = []
+    for step in range(200):
+        key = ['007', '7', 'a', 'b:1', '07', 'x'][step * 7 % 6]
+        operations.append(('put', key, f'v{step}') if step % 3 else ('get', key))
+        if step % 11 == 0:
+            operations.append(('compute',))
+    return operations
+
+def test_shared_trace_decodes_to_the_original_operations():
+    operations = mixed_key_trace() + [('bogus', 'op')]
+    with share_trace(operations) as trace:
+        assert list(trace) == operations
+
+def test_process_backend_matches_sequential_on_text_keys(tmp_path):
+    operations = mixed_key_trace()
+    cache_types = ['LRU', 'LFU', 'FIFO']
+    sequential = [str(tmp_path / f'{cache_type}_sequential.csv') for cache_type in cache_types]
+    parallel = [str(tmp_path / f'{cache_type}_parallel.csv') for cache_type in cache_types]
+    expected = simulation.simulate_sequential_with_metrics(operations, cache_types, 3, sequential, VERBOSITY_SILENT)
+    actual = simulation.simulate_parallel_with_metrics(operations, cache_types, 3, parallel, VERBOSITY_SILENT,
+                                                       backend='process')
+    assert actual[:2] == expected[:2]
+    for sequential_filename, parallel_filename in zip(sequential, parallel):
+        with open(sequential_filename) as expected_file, open(parallel_filename) as actual_file:
+            assert actual_file.read() == expected_file.read()
+
+def test_measure_parallel_scaling_reports_each_worker_count():
+    scaling = simulation.measure_parallel_scaling(mixed_key_trace(), ['LRU', 'FIFO'], 3, worker_counts=[1, 2])
+    assert [workers for workers, _, _ in scaling] == [1, 2]
+    assert scaling[0][2] == 1.0
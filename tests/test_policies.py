@@ -0,0 +1,48 @@
+import importlib
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+def evictions(cache, operations):
+    # Keys in the order put() evicted them
+    evicted_keys = []
+    for op_type, key in operations:
+        if op_type == 'get':
+            cache.get(key)
+        else:
+            evicted = cache.put(key, key)
+            if evicted is not None:
+                evicted_keys.append(evicted[0])
+    return evicted_keys
+
+def puts(*keys):
+    return [('put', key) for key in keys]
+
+def test_arc_ghost_hits_move_the_target():
+    cache = cache_simulation.ARCCache(2)
+    # b leaves the recency list as a ghost; its return grows the target, so the frequency list gives up a,
+    # whose return as a frequency ghost shrinks the target again and evicts c from the recency list
+    operations = puts('a', 'b') + [('get', 'a')] + puts('c', 'b', 'a')
+    assert evictions(cache, operations) == ['b', 'a', 'c']
+    assert cache.target == 0
+    assert list(cache.frequent) == ['b', 'a'] and not cache.recent
+
+def test_two_queue_only_admits_ghost_hits_to_the_main_list():
+    cache = cache_simulation.TwoQueueCache(4)
+    # The incoming FIFO drains first while it holds more than one key; 1 and 2 come back from the ghosts into
+    # the main LRU list, where the get refreshes 1 so 2 is the first main-list victim
+    operations = puts(1, 2, 3, 4, 5, 1, 6, 2, 7) + [('get', 1)] + puts(4, 5)
+    assert evictions(cache, operations) == [1, 2, 3, 4, 5, 6, 2]
+    assert list(cache.main) == [1, 4, 5]
+
+def test_clock_gives_referenced_slots_a_second_chance():
+    # 0 is referenced, so the hand clears its bit and takes 1; 0 goes once the hand comes round again
+    operations = puts(0, 1, 2) + [('get', 0)] + puts(3, 4) + [('get', 3)] + puts(5, 6)
+    for key_space in (None, 16):
+        assert evictions(cache_simulation.ClockCache(3, key_space), operations) == [1, 2, 0, 4]
+
+def test_s3fifo_promotes_hit_and_ghost_keys_to_the_main_ring():
+    # 9 leaves the small ring unhit and returns from the ghosts into the main ring; 11 is hit in the small
+    # ring and moves to the main ring; 3's counter spares it once from the main ring's hand
+    operations = puts(*range(10)) + [('get', 3)] + puts(10, 9, 11) + [('get', 11)] + puts(12, 13, 12, 10)
+    for key_space in (None, 16):
+        assert evictions(cache_simulation.S3FIFOCache(10, key_space), operations) == [9, 0, 10, 1, 12, 2, 4]
@@ -0,0 +1,34 @@
+import importlib
+import random
+
+import pytest
+
+from result_cache import ResultCache
+from result_io import VERBOSITY_SILENT
+from trace_io import TraceFile, compile_trace
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+@pytest.fixture
+def text_trace(tmp_path):
+    rng = random.Random(9)
+    filename = tmp_path / 'trace.txt'
+    with open(filename, 'w') as file:
+        for _ in range(20000):
+            key = min(int(rng.paretovariate(0.8)), 3000)
+            file.write(f"get {key}\n" if rng.random() < 0.6 else f"put {key} {rng.randrange(100)}\n")
+    return TraceFile(filename)
+
+def test_compiled_trace_shares_the_text_fingerprint(text_trace, tmp_path):
+    result_cache = ResultCache(tmp_path / 'cache')
+    assert result_cache.trace_fingerprint(compile_trace(text_trace)) == result_cache.trace_fingerprint(text_trace)
+
+@pytest.mark.parametrize('policy', ['WTinyLFU', 'LFU', 'ArrayLRU', 'S3FIFO'])
+def test_cached_result_matches_a_compiled_replay(text_trace, tmp_path, policy):
+    # A result stored from the text trace is served for its compiled form, so the two replays must agree
+    result_cache = ResultCache(tmp_path / 'cache')
+    compiled = compile_trace(text_trace)
+    cached = cache_simulation.simulate_with_metrics(text_trace, policy, 20, None, VERBOSITY_SILENT,
+                                                    result_cache=result_cache)
+    assert result_cache.lookup(compiled, policy, 20, {}) is not None
+    assert cache_simulation.simulate_with_metrics(compiled, policy, 20, None, VERBOSITY_SILENT) == cached
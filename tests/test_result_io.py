@@ -0,0 +1,57 @@
+import csv
+import importlib
+
+from result_io import VERBOSITY_PER_OP, VERBOSITY_SILENT, VERBOSITY_SUMMARY, BatchedResultWriter
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+def rows(count):
+    return [(number, number % 7, 'N/A' if number % 3 else str(number)) for number in range(1, count + 1)]
+
+def test_batched_writer_matches_row_by_row_writes(tmp_path):
+    with open(tmp_path / 'expected.csv', 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(['Operation', 'Cache Size', 'Result'])
+        for number, cache_size, result in rows(1000):
+            csvwriter.writerow([f'Operation {number}', cache_size, result])
+    expected = (tmp_path / 'expected.csv').read_text()
+
+    for batch_size in (1, 3, 1000, 8192):
+        with BatchedResultWriter(str(tmp_path / 'batched.csv'), batch_size) as writer:
+            for row in rows(1000):
+                writer.add(*row)
+        assert (tmp_path / 'batched.csv').read_text() == expected
+
+def test_resumed_writer_drops_rows_after_the_sync(tmp_path):
+    filename = str(tmp_path / 'results.csv')
+    with BatchedResultWriter(filename, 16) as writer:
+        for row in rows(500):
+            writer.add(*row)
+    expected = (tmp_path / 'results.csv').read_text()
+
+    with BatchedResultWriter(filename, 16) as writer:
+        for row in rows(200):
+            writer.add(*row)
+        synced = writer.sync()
+        writer.add(999, 0, 'lost')
+    with BatchedResultWriter(filename, 16, resume_at=synced) as writer:
+        for row in rows(500)[200:]:
+            writer.add(*row)
+    assert (tmp_path / 'results.csv').read_text() == expected
+
+def test_verbosity_only_changes_what_is_printed(tmp_path, capsys):
+    operations = [('put', str(key % 5), str(key)) if key % 3 else ('get', str(key % 7)) for key in range(60)]
+    operations.append(('compute',))
+    results = {}
+    for verbosity in (VERBOSITY_SILENT, VERBOSITY_SUMMARY, VERBOSITY_PER_OP):
+        output_filename = tmp_path / f'{verbosity}.csv'
+        results[verbosity] = cache_simulation.simulate_with_metrics(operations, 'LRU', 3, str(output_filename),
+                                                                    verbosity)
+        assert output_filename.read_text() == (tmp_path / '0.csv').read_text()
+        printed = capsys.readouterr().out
+        assert ('Total Hits' in printed) == (verbosity >= VERBOSITY_SUMMARY)
+        assert printed.count('Operation ') == (len(operations) if verbosity == VERBOSITY_PER_OP else 0)
+    # Without a CSV or per-op output the counting fast path runs instead
+    results['counted'] = cache_simulation.simulate_with_metrics(operations, 'LRU', 3, None, VERBOSITY_SILENT)
+    assert capsys.readouterr().out == ''
+    assert len(set(results.values())) == 1
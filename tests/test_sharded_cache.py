@@ -0,0 +1,20 @@
+import pytest
+
+import sharded_cache
+from trace_io import compile_trace
+
+def small_trace():
+    return compile_trace([('put', str(key % 5), str(key)) if key % 3 else ('get', str(key % 5)) for key in range(60)])
+
+def test_capacity_below_shard_count():
+    trace = small_trace()
+    cache_hits, cache_misses, *_ = sharded_cache.replay_concurrent(trace, 'LRU', 8, 2)
+    assert cache_hits + cache_misses == sum(1 for op in trace.ops if op == sharded_cache.OP_GET)
+    assert len(sharded_cache.ShardedCache('LRU', 8).shards) == 8
+
+def test_worker_errors_reach_the_caller(monkeypatch):
+    def failing_get(self, key):
+        raise RuntimeError("shard failed")
+    monkeypatch.setattr(sharded_cache.ShardedCache, 'get', failing_get)
+    with pytest.raises(RuntimeError, match="shard failed"):
+        sharded_cache.replay_concurrent(small_trace(), 'LRU', 100, 2)
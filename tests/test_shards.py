@@ -0,0 +1,29 @@
+import numpy as np
+
+import shards
+
+def test_hash_is_pinned():
+    # Samples must be reproducible across processes and releases, so the hash values themselves are fixed
+    assert [shards.shards_hash(key) for key in ['0', '1', '42', 'abc']] == [12149806, 5386670, 7471772, 15829809]
+    assert shards.shards_hash('0', seed=3) == 6408490
+    assert shards.shards_hash(42) == shards.shards_hash('42')
+
+def test_sample_keeps_every_access_to_a_sampled_key():
+    operations = [('put', str(key % 100), '1') if key % 4 else ('get', str(key % 100)) for key in range(4000)]
+    operations.append(('compute',))
+    sampled, total_operations, total_gets = shards.sample_trace(operations, rate=0.1, seed=3)
+    sampled_keys = ['5', '18', '21', '24', '27', '30', '35', '60', '70', '76', '86', '89', '93', '97']
+    assert sampled == [operation for operation in operations[:-1] if operation[1] in sampled_keys]
+    assert (total_operations, total_gets) == (4001, 1000)
+
+def test_estimate_tracks_the_exact_miss_ratio_curve():
+    rng = np.random.default_rng(0)
+    keys = (rng.zipf(1.2, size=100000) % 20000).tolist()
+    operations = [('get', str(key)) if draw < 0.7 else ('put', str(key), 'v')
+                  for key, draw in zip(keys, rng.random(100000).tolist())]
+    capacities = [500, 1000, 2000, 5000]
+    for policy in ['LRU', 'FIFO']:
+        curve, _, _ = shards.sampled_miss_ratio_curve(operations, policy, capacities, rate=0.1)
+        exact = shards.exact_miss_rates(operations, policy, capacities)
+        for (_, _, _, estimated_rate), exact_rate in zip(curve, exact):
+            assert abs(estimated_rate - exact_rate) < 0.03
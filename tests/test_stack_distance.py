@@ -0,0 +1,31 @@
+import importlib
+import random
+
+import pytest
+
+import stack_distance
+from result_io import VERBOSITY_SILENT
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+def random_trace(seed, length=3000, key_space=80, put_share=0.4):
+    rng = random.Random(seed)
+    operations = []
+    for _ in range(length):
+        key = str(int(rng.paretovariate(1.1)) % key_space)
+        draw = rng.random()
+        operations.append(('put', key, '1') if draw < put_share else ('get', key) if draw < 0.95 else ('compute',))
+    return operations
+
+@pytest.mark.parametrize('seed, put_share', [(0, 0.4), (1, 0.1), (2, 0.8)])
+def test_curve_matches_lru_cache(seed, put_share):
+    operations = random_trace(seed, put_share=put_share)
+    capacities = [1, 2, 3, 5, 8, 13, 30, 80, 200]
+    curve = stack_distance.lru_miss_ratio_curve(operations, capacities)
+    for capacity, hits, misses, miss_rate in curve:
+        expected = cache_simulation.simulate_with_metrics(operations, 'LRU', capacity, None, VERBOSITY_SILENT)
+        assert (hits, misses, miss_rate) == expected
+
+def test_every_depth_agrees_with_the_cross_check():
+    operations = random_trace(3, length=1500, key_space=40)
+    assert stack_distance.cross_check_lru(operations, stack_distance.lru_miss_ratio_curve(operations)) == []
@@ -0,0 +1,48 @@
+import importlib
+import random
+
+import pytest
+
+from result_io import VERBOSITY_SILENT
+from sweep import ADAPTIVE_POLICIES, ONLINE_POLICIES, create_policy_cache, print_sweep_results, run_sweep
+
+adapted_simulation = importlib.import_module('02_adapted_simulation')
+
+@pytest.mark.parametrize('policy', ONLINE_POLICIES)
+def test_create_policy_cache_takes_a_decay_factor(policy):
+    # A decay factor reaches the adaptive caches and is ignored by the rest, rather than landing in key_space
+    cache = create_policy_cache(policy, 4, 0.25)
+    for key in range(8):
+        cache.put(key, key)
+    assert cache.get(7) == 7
+    if policy in ADAPTIVE_POLICIES:
+        assert cache.decay_factor == 0.25
+
+@pytest.fixture
+def operations():
+    rng = random.Random(2)
+    return [('put', str(rng.randrange(40)), '1') if rng.random() < 0.7 else ('get', str(rng.randrange(40)))
+            for _ in range(3000)]
+
+def test_adaptive_runners_pass_the_decay_factor(operations):
+    cache_types = ['AdaptiveFIFO', 'CompactAdaptiveLRU']
+    expected = [adapted_simulation.simulate_with_metrics(operations, cache_type, 8, None, VERBOSITY_SILENT, 0.9)[0]
+                for cache_type in cache_types]
+    assert expected != [adapted_simulation.simulate_with_metrics(operations, cache_type, 8, None, VERBOSITY_SILENT)[0]
+                        for cache_type in cache_types]
+    outputs = [None] * len(cache_types)
+    shared = adapted_simulation.simulate_shared_with_metrics(operations, cache_types, 8, outputs, VERBOSITY_SILENT,
+                                                             decay_factor=0.9)
+    assert [hits for hits, _, _ in shared] == expected
+    sequential = adapted_simulation.simulate_sequential_with_metrics(operations, cache_types, 8, outputs,
+                                                                     VERBOSITY_SILENT, decay_factor=0.9)
+    assert sequential[0] == sum(expected)
+    parallel = adapted_simulation.simulate_parallel_with_metrics(operations, cache_types, 8, outputs,
+                                                                 VERBOSITY_SILENT, decay_factor=0.9)
+    assert parallel[0] == sum(expected)
+
+def test_sweep_table_columns_line_up(operations, capsys):
+    results = run_sweep(operations, ['LRU', 'CompactAdaptiveLFU'], [8], backend='thread')
+    print_sweep_results(results)
+    header, *rows = capsys.readouterr().out.splitlines()
+    assert {len(row) for row in rows} == {len(header)}
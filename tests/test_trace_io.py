@@ -0,0 +1,84 @@
+import importlib
+import random
+
+from result_io import VERBOSITY_SILENT
+from trace_io import BinaryTrace, TraceFile, compile_trace, convert_text_trace, iter_chunks, read_trace
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+CACHE_TYPES = ['LRU', 'LFU', 'FIFO']
+
+def write_trace(path, length=2000, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(length):
+        key = int(rng.paretovariate(1.0)) % 40
+        draw = rng.random()
+        lines.append(f'get {key}\n' if draw < 0.5 else f'put {key} {rng.randrange(100)}\n' if draw < 0.95
+                     else 'compute\n')
+    path.write_text(''.join(lines))
+    return [tuple(line.split()) for line in lines]
+
+def test_chunked_reads_give_every_operation_once(tmp_path):
+    operations = write_trace(tmp_path / 'trace.txt')
+    for chunk_bytes in (1, 100, 1 << 20):
+        assert list(read_trace(str(tmp_path / 'trace.txt'), chunk_bytes)) == operations
+    assert [len(chunk) for chunk in iter_chunks(operations, 750)] == [750, 750, 500]
+
+def test_streamed_replays_match_the_list(tmp_path):
+    operations = write_trace(tmp_path / 'trace.txt')
+    trace = TraceFile(str(tmp_path / 'trace.txt'), chunk_bytes=128)
+    for cache_type in CACHE_TYPES:
+        expected = cache_simulation.simulate_with_metrics(operations, cache_type, 10, str(tmp_path / 'list.csv'),
+                                                          VERBOSITY_SILENT)
+        assert cache_simulation.simulate_with_metrics(trace, cache_type, 10, str(tmp_path / 'file.csv'),
+                                                      VERBOSITY_SILENT) == expected
+        # A one-shot generator is consumed once, without being materialized
+        assert cache_simulation.simulate_with_metrics(iter(operations), cache_type, 10, None,
+                                                      VERBOSITY_SILENT) == expected
+        assert (tmp_path / 'file.csv').read_text() == (tmp_path / 'list.csv').read_text()
+
+def test_shared_pass_matches_separate_runs(tmp_path):
+    operations = write_trace(tmp_path / 'trace.txt')
+    shared_filenames = [str(tmp_path / f'{cache_type}_shared.csv') for cache_type in CACHE_TYPES]
+    shared = cache_simulation.simulate_shared_with_metrics(TraceFile(str(tmp_path / 'trace.txt')), CACHE_TYPES, 10,
+                                                           shared_filenames, VERBOSITY_SILENT)
+    for cache_type, result, shared_filename in zip(CACHE_TYPES, shared, shared_filenames):
+        separate_filename = str(tmp_path / f'{cache_type}.csv')
+        assert cache_simulation.simulate_with_metrics(operations, cache_type, 10, separate_filename,
+                                                      VERBOSITY_SILENT) == result
+        with open(shared_filename) as shared_file, open(separate_filename) as separate_file:
+            assert shared_file.read() == separate_file.read()
+
+def test_binary_and_compiled_traces_replay_like_the_text(tmp_path):
+    operations = write_trace(tmp_path / 'trace.txt', seed=1)
+    text_filename = str(tmp_path / 'trace.txt')
+    binary_filename = str(tmp_path / 'trace.npy')
+    assert convert_text_trace(text_filename, binary_filename) == len(operations)
+    assert list(BinaryTrace(binary_filename, text_keys=True)) == operations
+
+    for cache_type in CACHE_TYPES:
+        expected = cache_simulation.simulate_with_metrics(TraceFile(text_filename), cache_type, 10,
+                                                          str(tmp_path / 'text.csv'), VERBOSITY_SILENT)
+        for name, trace in [('binary', BinaryTrace(binary_filename, text_keys=True)),
+                            ('compiled', compile_trace(operations))]:
+            output_filename = tmp_path / f'{name}.csv'
+            assert cache_simulation.simulate_with_metrics(trace, cache_type, 10, str(output_filename),
+                                                          VERBOSITY_SILENT) == expected
+            assert output_filename.read_text() == (tmp_path / 'text.csv').read_text()
+
+    # Integer keys order differently from strings, which only the tie-breaks of LFU could notice
+    for cache_type in ['LRU', 'FIFO']:
+        assert (cache_simulation.simulate_with_metrics(BinaryTrace(binary_filename), cache_type, 10, None,
+                                                       VERBOSITY_SILENT)
+                == cache_simulation.simulate_with_metrics(operations, cache_type, 10, None, VERBOSITY_SILENT))
+
+def test_compiled_trace_packs_sorted_key_ids():
+    operations = [('put', 'b', '1'), ('get', 'a'), ('compute',), ('get', 'c'), ('put', 'a', '2'), ('bogus', 'x')]
+    trace = compile_trace(operations)
+    assert (trace.ops.typecode, trace.keys.typecode) == ('B', 'i')
+    assert trace.key_names == ['a', 'b', 'c']
+    assert list(trace.keys) == [1, 0, -1, 2, 0, -1]
+    assert list(trace) == operations
+    assert [chunk[1:3] for chunk in trace.chunks(4)] == [([1, 0, 2, 0], [1, 0, -1, 2]), ([1, 3], [0, -1])]
+    assert len(compile_trace([])) == 0
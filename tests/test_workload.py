@@ -0,0 +1,17 @@
+from workload import PATTERNS, WorkloadGenerator
+
+def keys(pattern, **options):
+    generator = WorkloadGenerator(pattern, 5000, 1000, seed=1, get_ratio=1, put_ratio=0, compute_ratio=0, **options)
+    return [key for batch in generator.batches() for key in batch['key'].tolist()]
+
+def test_every_pattern_gives_a_different_trace():
+    traces = [keys(pattern) for pattern in PATTERNS]
+    assert all(traces[i] != traces[j] for i in range(len(traces)) for j in range(i))
+
+def test_loop_cycles_over_a_short_working_set_and_scan_over_every_key():
+    assert keys('loop')[:250] == list(range(100)) * 2 + list(range(50))
+    assert keys('loop', loop_length=30)[:60] == list(range(30)) * 2
+    assert keys('scan')[:1200] == list(range(1000)) + list(range(200))
+
+def test_same_seed_same_trace():
+    assert keys('zipf') == keys('zipf')
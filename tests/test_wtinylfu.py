@@ -0,0 +1,39 @@
+import importlib
+import random
+
+import pytest
+
+import sweep
+from result_io import VERBOSITY_SILENT
+from trace_io import BinaryTrace, TraceFile, compile_trace, convert_text_trace
+
+cache_simulation = importlib.import_module('01_cache_simulation')
+
+@pytest.fixture
+def trace_files(tmp_path):
+    # Skewed enough that the sketch's admission decisions matter, with far more keys than slots
+    rng = random.Random(5)
+    text_filename = tmp_path / 'trace.txt'
+    with open(text_filename, 'w') as file:
+        for _ in range(20000):
+            key = min(int(rng.paretovariate(0.8)), 3000)
+            if rng.random() < 0.6:
+                file.write(f"get {key}\n")
+            else:
+                file.write(f"put {key} {rng.randrange(100)}\n")
+    binary_filename = tmp_path / 'trace.npy'
+    convert_text_trace(text_filename, binary_filename)
+    return text_filename, binary_filename
+
+def hits(cpu_operations, capacity):
+    return cache_simulation.simulate_with_metrics(cpu_operations, 'WTinyLFU', capacity, None, VERBOSITY_SILENT)[0]
+
+@pytest.mark.parametrize('capacity', [20, 200])
+def test_same_hits_from_every_trace_representation(trace_files, capacity):
+    text_filename, binary_filename = trace_files
+    expected = hits(TraceFile(text_filename), capacity)
+    assert hits(BinaryTrace(binary_filename), capacity) == expected
+    assert hits(BinaryTrace(binary_filename, text_keys=True), capacity) == expected
+    assert hits(compile_trace(TraceFile(text_filename)), capacity) == expected
+    assert hits(compile_trace(BinaryTrace(binary_filename)), capacity) == expected
+    assert sweep.run_sweep_config(compile_trace(TraceFile(text_filename)), 'WTinyLFU', capacity, None)[3] == expected
@@ -0,0 +1,276 @@
+import sys
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Bytes requested per read; only one chunk of parsed operations is held in memory at a time
+TRACE_CHUNK_BYTES = 1 << 20
+# Operations per chunk when re-chunking an already parsed stream
+OPERATION_CHUNK_SIZE = 4096
+
+# Fixed-width record for the binary trace format; keys and values must be integers
+TRACE_DTYPE = np.dtype([('op', np.uint8), ('key', np.int64), ('value', np.int64)])
+OP_GET = 0
+OP_PUT = 1
+OP_COMPUTE = 2
+OP_UNKNOWN = 3
+OP_CODES = {'get': OP_GET, 'put': OP_PUT, 'compute': OP_COMPUTE}
+OP_NAMES = ['get', 'put', 'compute', 'unknown']
+
+def read_trace_chunks(filename, chunk_bytes=TRACE_CHUNK_BYTES):
+    with open(filename, "r") as file:
+        while True:
+            lines = file.readlines(chunk_bytes)
+            if not lines:
+                break
+            yield [tuple(line.strip().split()) for line in lines]
+
+def read_trace_chunks_at(filename, position=0, chunk_bytes=TRACE_CHUNK_BYTES):
+    # read_trace_chunks from a byte position, also yielding the byte position after each chunk, so a replay
+    # can stop and later pick up with a seek instead of parsing everything before that point again
+    with open(filename, "rb") as file:
+        file.seek(position)
+        while True:
+            lines = file.readlines(chunk_bytes)
+            if not lines:
+                break
+            yield [tuple(line.decode().strip().split()) for line in lines], file.tell()
+
+def read_trace(filename, chunk_bytes=TRACE_CHUNK_BYTES):
+    for chunk in read_trace_chunks(filename, chunk_bytes):
+        yield from chunk
+
+def iter_chunks(cpu_operations, chunk_size=OPERATION_CHUNK_SIZE):
+    operations = iter(cpu_operations)
+    while True:
+        chunk = list(islice(operations, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
+class TraceFile:
+    # Re-iterable trace: every iteration streams the file again instead of keeping it in a list
+    def __init__(self, filename, chunk_bytes=TRACE_CHUNK_BYTES):
+        self.filename = filename
+        self.chunk_bytes = chunk_bytes
+
+    def __iter__(self):
+        return read_trace(self.filename, self.chunk_bytes)
+
+def encode_operations(operations):
+    ops = []
+    keys = []
+    values = []
+    for op_type, *op_args in operations:
+        op = OP_CODES.get(op_type, OP_UNKNOWN)
+        ops.append(op)
+        keys.append(int(op_args[0]) if op == OP_GET or op == OP_PUT else 0)
+        values.append(int(op_args[1]) if op == OP_PUT else 0)
+
+    records = np.empty(len(ops), dtype=TRACE_DTYPE)
+    records['op'] = ops
+    records['key'] = keys
+    records['value'] = values
+    return records
+
+def convert_text_trace(text_filename, binary_filename, chunk_bytes=TRACE_CHUNK_BYTES):
+    # Count first so the output can be written straight into a preallocated .npy memmap
+    with open(text_filename, "r") as file:
+        total_operations = sum(1 for _ in file)
+
+    records = np.lib.format.open_memmap(binary_filename, mode='w+', dtype=TRACE_DTYPE, shape=(total_operations,))
+    offset = 0
+    for chunk in read_trace_chunks(text_filename, chunk_bytes):
+        records[offset:offset + len(chunk)] = encode_operations(chunk)
+        offset += len(chunk)
+    records.flush()
+    del records
+
+    return total_operations
+
+def open_binary_trace(binary_filename):
+    # Memory-mapped and read-only: opening is O(1) and pages are loaded on demand
+    return np.load(binary_filename, mmap_mode='r')
+
+def decode_operations(ops, keys, values, text_keys=False):
+    # text_keys=True yields the same string tuples as the text reader, for byte-identical replays
+    convert = str if text_keys else int
+    for op, key, value in zip(ops, keys, values):
+        if op == OP_GET:
+            yield ('get', convert(key))
+        elif op == OP_PUT:
+            yield ('put', convert(key), convert(value))
+        else:
+            yield (OP_NAMES[op],)
+
+def iter_binary_trace(records, chunk_size=OPERATION_CHUNK_SIZE, text_keys=False):
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        yield from decode_operations(chunk['op'].tolist(), chunk['key'].tolist(), chunk['value'].tolist(), text_keys)
+
+class BinaryTrace:
+    def __init__(self, binary_filename, chunk_size=OPERATION_CHUNK_SIZE, text_keys=False):
+        self.records = open_binary_trace(binary_filename)
+        self.chunk_size = chunk_size
+        self.text_keys = text_keys
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter_binary_trace(self.records, self.chunk_size, self.text_keys)
+
+def compile_trace(cpu_operations):
+    # Opcodes become small ints and keys dense ids numbered in the keys' own sort order, so every
+    # comparison between keys (the LFU and adaptive tie-breaks) goes the same way as on the originals
+    if isinstance(cpu_operations, CompiledTrace):
+        return cpu_operations
+    ops = array('B')
+    # Keys are numbered in order of first use while reading, then renumbered once the sort order is known
+    first_ids = array('i')
+    key_ids = {}
+    values = []
+    for chunk in iter_chunks(cpu_operations):
+        for operation in chunk:
+            op = OP_CODES.get(operation[0], OP_UNKNOWN)
+            if op == OP_GET:
+                first_ids.append(key_ids.setdefault(operation[1], len(key_ids)))
+                values.append(None)
+            elif op == OP_PUT:
+                first_ids.append(key_ids.setdefault(operation[1], len(key_ids)))
+                values.append(operation[2])
+            else:
+                # Other operations keep their original tuple, so decoding gives back exactly what was read
+                first_ids.append(-1)
+                values.append(operation)
+            ops.append(op)
+
+    key_names = sorted(key_ids)
+    # One spare slot at the end maps the -1 of non-key operations to itself
+    sorted_ids = np.full(len(key_names) + 1, -1, dtype=np.intc)
+    sorted_ids[[key_ids[key] for key in key_names]] = np.arange(len(key_names), dtype=np.intc)
+    keys = array('i', sorted_ids[np.frombuffer(first_ids, dtype=np.intc)].tobytes())
+    return CompiledTrace(ops, keys, values, key_names)
+
+class CompiledTrace:
+    # Opcodes and key ids are packed arrays, a byte and four bytes per operation instead of an 8-byte list
+    # slot each. Values are kept as read: they are only stored and returned, and the output must not change.
+    def __init__(self, ops, keys, values, key_names):
+        self.ops = ops
+        self.keys = keys
+        self.values = values
+        self.key_names = key_names
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        key_names = self.key_names
+        for op, key, value in zip(self.ops, self.keys, self.values):
+            if op == OP_GET:
+                yield ('get', key_names[key])
+            elif op == OP_PUT:
+                yield ('put', key_names[key], value)
+            else:
+                yield value
+
+    def chunks(self, chunk_size=OPERATION_CHUNK_SIZE):
+        # Each chunk is unpacked to lists: the replay loops iterate lists faster than arrays, which box
+        # every element they yield
+        for start in range(0, len(self.ops), chunk_size):
+            stop = start + chunk_size
+            yield start, self.ops[start:stop].tolist(), self.keys[start:stop].tolist(), self.values[start:stop]
+
+    def decode_cache(self, cache):
+        # Same mapping type with the original keys, for per-operation output; the array-backed caches'
+        # views print as an OrderedDict
+        key_names = self.key_names
+        mapping_type = type(cache) if isinstance(cache, dict) else OrderedDict
+        return mapping_type((key_names[key], value) for key, value in cache.items())
+
+class SharedTrace:
+    # Only the block name, length and name tables are pickled; workers map the records instead of receiving a copy.
+    # With name tables, keys and values are ids into them; without, they are the integers of a binary trace.
+    def __init__(self, shm_name, length, chunk_size=OPERATION_CHUNK_SIZE, text_keys=True, key_names=None,
+                 value_names=None):
+        self.shm_name = shm_name
+        self.length = length
+        self.chunk_size = chunk_size
+        self.text_keys = text_keys
+        self.key_names = key_names
+        self.value_names = value_names
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        records = chunk = None
+        try:
+            records = np.ndarray((self.length,), dtype=TRACE_DTYPE, buffer=shm.buf)
+            for start in range(0, self.length, self.chunk_size):
+                chunk = records[start:start + self.chunk_size]
+                columns = chunk['op'].tolist(), chunk['key'].tolist(), chunk['value'].tolist()
+                if self.key_names is None:
+                    yield from decode_operations(*columns, self.text_keys)
+                else:
+                    yield from decode_interned_operations(*columns, self.key_names, self.value_names)
+        finally:
+            # Views into the block have to be released before it can be closed
+            records = chunk = None
+            shm.close()
+
+def decode_interned_operations(ops, keys, values, key_names, value_names):
+    for op, key, value in zip(ops, keys, values):
+        if op == OP_GET:
+            yield ('get', key_names[key])
+        elif op == OP_PUT:
+            yield ('put', key_names[key], value_names[value])
+        else:
+            yield value_names[value]
+
+def intern_trace(cpu_operations):
+    # Keys become the key ids of compile_trace and values (or a whole non-cache operation) ids into a table of
+    # distinct values, so any trace fits the binary records and decodes back to exactly what was read.
+    # Casting to int instead would reject non-numeric keys and merge '007' with '7'.
+    trace = compile_trace(cpu_operations)
+    value_ids = {}
+    value_column = [value_ids.setdefault(value, len(value_ids)) if op != OP_GET else 0
+                    for op, value in zip(trace.ops, trace.values)]
+    records = np.empty(len(trace), dtype=TRACE_DTYPE)
+    records['op'] = trace.ops
+    records['key'] = trace.keys
+    records['value'] = value_column
+    return records, trace.key_names, list(value_ids)
+
+@contextmanager
+def share_trace(cpu_operations):
+    # Copy the trace once into shared memory. Binary traces already are integer records and go as they are;
+    # any other trace is interned first.
+    if isinstance(cpu_operations, BinaryTrace):
+        records = cpu_operations.records
+        trace_kwargs = {'text_keys': cpu_operations.text_keys}
+    else:
+        records, key_names, value_names = intern_trace(cpu_operations)
+        trace_kwargs = {'key_names': key_names, 'value_names': value_names}
+    shm = shared_memory.SharedMemory(create=True, size=max(records.nbytes, 1))
+    try:
+        np.ndarray(records.shape, dtype=TRACE_DTYPE, buffer=shm.buf)[:] = records
+        yield SharedTrace(shm.name, len(records), **trace_kwargs)
+    finally:
+        shm.close()
+        shm.unlink()
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python trace_io.py <text trace> <binary trace .npy>")
+        sys.exit(1)
+    total_operations = convert_text_trace(sys.argv[1], sys.argv[2])
+    print(f"Converted {total_operations} operations to {sys.argv[2]}")
+
+if __name__ == "__main__":
+    main()
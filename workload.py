@@ -0,0 +1,127 @@
+import argparse
+import time
+
+import numpy as np
+
+from trace_io import OP_COMPUTE, OP_GET, OP_PUT, OPERATION_CHUNK_SIZE, TRACE_DTYPE, decode_operations
+
+PATTERNS = ('zipf', 'uniform', 'scan', 'loop', 'shifting')
+# Operations generated per vectorized batch
+WORKLOAD_BATCH_SIZE = 1 << 16
+# 'loop' cycles over this share of the key space unless loop_length is given; 'scan' sweeps all of it
+LOOP_FRACTION = 0.1
+
+class WorkloadGenerator:
+    # Seeded and re-iterable: every pass regenerates the same trace batch by batch, so nothing is stored
+    def __init__(self, pattern, total_operations, key_space, seed=0, get_ratio=0.6, put_ratio=0.35,
+                 compute_ratio=0.05, zipf_exponent=1.0, loop_length=None, hot_set_size=None, hot_fraction=0.9,
+                 shift_every=None, batch_size=WORKLOAD_BATCH_SIZE, text_keys=False):
+        if pattern not in PATTERNS:
+            raise ValueError(f"Invalid workload pattern. Choose from {', '.join(PATTERNS)}.")
+        total_ratio = get_ratio + put_ratio + compute_ratio
+        if total_ratio <= 0:
+            raise ValueError("At least one of get_ratio, put_ratio and compute_ratio must be positive.")
+        self.pattern = pattern
+        self.total_operations = total_operations
+        self.key_space = key_space
+        self.seed = seed
+        self.op_probabilities = np.array([get_ratio, put_ratio, compute_ratio]) / total_ratio
+        self.zipf_exponent = zipf_exponent
+        self.loop_length = loop_length or max(int(key_space * LOOP_FRACTION), 1)
+        self.hot_set_size = hot_set_size or max(key_space // 100, 1)
+        self.hot_fraction = hot_fraction
+        self.shift_every = shift_every or max(total_operations // 10, 1)
+        self.batch_size = batch_size
+        self.text_keys = text_keys
+        self._zipf_cdf = None
+
+    def __len__(self):
+        return self.total_operations
+
+    def __iter__(self):
+        for records in self.batches():
+            for chunk_start in range(0, len(records), OPERATION_CHUNK_SIZE):
+                chunk = records[chunk_start:chunk_start + OPERATION_CHUNK_SIZE]
+                yield from decode_operations(chunk['op'].tolist(), chunk['key'].tolist(), chunk['value'].tolist(),
+                                             self.text_keys)
+
+    def batches(self):
+        rng = np.random.default_rng(self.seed)
+        op_codes = np.array([OP_GET, OP_PUT, OP_COMPUTE], dtype=np.uint8)
+        for start in range(0, self.total_operations, self.batch_size):
+            count = min(self.batch_size, self.total_operations - start)
+            records = np.empty(count, dtype=TRACE_DTYPE)
+            ops = op_codes[rng.choice(3, size=count, p=self.op_probabilities)]
+            keys = self._keys(rng, start, count)
+            records['op'] = ops
+            records['key'] = np.where(ops == OP_COMPUTE, 0, keys)
+            records['value'] = np.where(ops == OP_PUT, keys * 10, 0)
+            yield records
+
+    def _keys(self, rng, start, count):
+        positions = np.arange(start, start + count, dtype=np.int64)
+        if self.pattern == 'uniform':
+            return rng.integers(0, self.key_space, size=count)
+        elif self.pattern == 'zipf':
+            return self._zipf(rng, count, self.key_space)
+        elif self.pattern == 'scan':
+            # One sweep over the whole key space, only repeating once every key has been touched
+            return positions % self.key_space
+        elif self.pattern == 'loop':
+            # A short working set touched over and over, the classic LRU pathology once it outgrows the cache
+            return positions % self.loop_length
+        # shifting: a hot window of keys that moves along the key space every shift_every operations
+        hot_base = (positions // self.shift_every) * self.hot_set_size
+        hot_keys = (hot_base + rng.integers(0, self.hot_set_size, size=count)) % self.key_space
+        cold_keys = rng.integers(0, self.key_space, size=count)
+        return np.where(rng.random(count) < self.hot_fraction, hot_keys, cold_keys)
+
+    def _zipf(self, rng, count, key_space):
+        # Bounded Zipf by inverse-CDF lookup; unlike numpy's sampler this also accepts exponents <= 1
+        if self._zipf_cdf is None:
+            weights = 1.0 / np.arange(1, key_space + 1, dtype=np.float64) ** self.zipf_exponent
+            self._zipf_cdf = np.cumsum(weights)
+            self._zipf_cdf /= self._zipf_cdf[-1]
+        ranks = np.searchsorted(self._zipf_cdf, rng.random(count), side='right')
+        return np.minimum(ranks, key_space - 1)
+
+def write_binary_trace(generator, binary_filename):
+    records = np.lib.format.open_memmap(binary_filename, mode='w+', dtype=TRACE_DTYPE,
+                                        shape=(generator.total_operations,))
+    offset = 0
+    for batch in generator.batches():
+        records[offset:offset + len(batch)] = batch
+        offset += len(batch)
+    records.flush()
+    del records
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic binary trace")
+    parser.add_argument('pattern', choices=PATTERNS)
+    parser.add_argument('output', help="binary trace (.npy) to write")
+    parser.add_argument('--operations', type=int, default=1_000_000)
+    parser.add_argument('--key-space', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--get-ratio', type=float, default=0.6)
+    parser.add_argument('--put-ratio', type=float, default=0.35)
+    parser.add_argument('--compute-ratio', type=float, default=0.05)
+    parser.add_argument('--zipf-exponent', type=float, default=1.0)
+    parser.add_argument('--loop-length', type=int, help="keys 'loop' cycles over (default: a tenth of --key-space)")
+    parser.add_argument('--hot-set-size', type=int)
+    parser.add_argument('--hot-fraction', type=float, default=0.9)
+    parser.add_argument('--shift-every', type=int)
+    args = parser.parse_args()
+
+    generator = WorkloadGenerator(args.pattern, args.operations, args.key_space, args.seed, args.get_ratio,
+                                  args.put_ratio, args.compute_ratio, args.zipf_exponent, args.loop_length,
+                                  args.hot_set_size, args.hot_fraction, args.shift_every)
+    start_time = time.perf_counter()
+    write_binary_trace(generator, args.output)
+    total_execution_time = time.perf_counter() - start_time
+
+    rate = args.operations / total_execution_time if total_execution_time > 0 else 0.0
+    print(f"Wrote {args.operations} operations to {args.output} in {total_execution_time:.2f} seconds "
+          f"({rate / 1e6:.1f}M ops/sec)")
+
+if __name__ == "__main__":
+    main()